@@ -0,0 +1,59 @@
+from django.urls import reverse
+from rest_framework import serializers
+from taggit.models import Tag
+
+from blog.models import Post
+from home.models import Event
+
+
+class SparseFieldsMixin:
+    """
+    ``?fields=slug,title`` trims the representation to those fields, so
+    clients only pay for what they render. Unknown names are ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        requested = request.query_params.get("fields") if request is not None else None
+        if requested:
+            wanted = {name.strip() for name in requested.split(",")}
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+class PostListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Translated fields (title, slug, ...) resolve to the request language
+    author = serializers.CharField(source="author.name")
+    tags = serializers.SerializerMethodField()
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = ["id", "slug", "title", "teaser_text", "image", "author", "tags", "url", "created_on", "updated_on"]
+
+    def get_tags(self, post) -> list[str]:
+        # Prefetched by the view
+        return sorted(tag.name for tag in post.tags.all())
+
+    def get_url(self, post) -> str:
+        return self.context["request"].build_absolute_uri(reverse("post_detail", kwargs={"slug": post.slug}))
+
+
+class PostDetailSerializer(PostListSerializer):
+    class Meta(PostListSerializer.Meta):
+        fields = PostListSerializer.Meta.fields + ["content"]
+
+
+class EventSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Event
+        fields = ["id", "title", "description", "place", "date", "time", "image"]
+
+
+class TagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Tag
+        fields = ["name", "slug", "count"]
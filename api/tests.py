@@ -0,0 +1,94 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from blog.models import Profile
+from blog.tests import make_post
+from home.models import Event
+from mysite import edge_cache
+
+from .views import ContentAPIView
+
+
+class ContentAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Profile.objects.create(name="Author", bio="", image="images/author.jpg")
+        cls.posts = [make_post(cls.author, i) for i in range(3)]
+        cls.draft = make_post(cls.author, 9, status=0)
+        cls.posts[0].tags.add("winter", "kids")
+        cls.posts[1].tags.add("winter")
+        cls.draft.tags.add("kids", "draft-only")
+        Event.objects.create(
+            title_uk="Збір", title_en="Drive", description_uk="Опис", description_en="About",
+            date=timezone.localdate() + datetime.timedelta(days=2), image="images/event.jpg",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_post_list_is_localized_and_cursor_paginated(self):
+        page = self.client.get("/en/api/posts/?page_size=2").json()
+        self.assertEqual([p["title"] for p in page["results"]], ["Post 2", "Post 1"])
+        self.assertEqual(page["results"][0]["url"], "http://testserver/en/post-2/")
+        rest = self.client.get(page["next"]).json()
+        self.assertEqual([p["title"] for p in rest["results"]], ["Post 0"])
+        self.assertIsNone(rest["next"])
+
+        uk = self.client.get("/uk/api/posts/?tag=kids").json()
+        self.assertEqual([p["title"] for p in uk["results"]], ["Допис 0"])
+        self.assertEqual(uk["results"][0]["tags"], ["kids", "winter"])
+
+    def test_sparse_fieldsets(self):
+        page = self.client.get("/en/api/posts/?fields=slug,title").json()
+        self.assertEqual(set(page["results"][0]), {"slug", "title"})
+        detail = self.client.get("/en/api/posts/post-1/?fields=content").json()
+        self.assertEqual(detail, {"content": "Text"})
+
+    def test_post_detail_by_language_slug(self):
+        self.assertEqual(self.client.get("/uk/api/posts/dopys-1/").json()["title"], "Допис 1")
+        self.assertEqual(self.client.get("/en/api/posts/dopys-1/").status_code, 404)
+        self.assertEqual(self.client.get("/en/api/posts/post-9/").status_code, 404)  # draft
+
+    def test_tags_count_published_posts_only(self):
+        tags = self.client.get("/en/api/tags/").json()
+        self.assertEqual(tags, [
+            {"name": "winter", "slug": "winter", "count": 2},
+            {"name": "kids", "slug": "kids", "count": 1},
+        ])
+
+    def test_upcoming_events(self):
+        events = self.client.get("/en/api/events/").json()
+        self.assertEqual([e["title"] for e in events], ["Drive"])
+
+    def test_cached_until_content_changes_and_revalidates(self):
+        response = self.client.get("/en/api/posts/")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/en/api/posts/").json(), response.json())
+            revalidated = self.client.get("/en/api/posts/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+        self.posts[2].title_en = "Renamed"
+        self.posts[2].save()
+        fresh = self.client.get("/en/api/posts/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh.json()["results"][0]["title"], "Renamed")
+
+    @override_settings(EDGE_CACHE_URL="http://nginx")
+    def test_unread_query_params_share_the_cache_entry(self):
+        response = self.client.get("/en/api/posts/?page_size=2&fields=slug")
+        with self.assertNumQueries(0):
+            junk = self.client.get("/en/api/posts/?junk=1&fields=slug&page_size=2")
+        self.assertEqual(junk.json(), response.json())
+        self.assertEqual(junk["X-Accel-Expires"], "0")
+        self.assertNotIn("Surrogate-Key", junk)
+        self.assertEqual(edge_cache.urls_for("posts"), ["/en/api/posts/?page_size=2&fields=slug"])
+
+        page = self.client.get("/en/api/posts/?page_size=2&utm_source=x").json()
+        self.assertNotIn("utm_source", page["next"])
+
+    def test_base_view_cannot_be_routed(self):
+        with self.assertRaises(TypeError):
+            ContentAPIView.as_view()
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('posts/', views.PostListAPI.as_view(), name='api_posts'),
+    path('posts/popular/', views.PopularPostsAPI.as_view(), name='api_posts_popular'),
+    path('posts/<slug:slug>/', views.PostDetailAPI.as_view(), name='api_post_detail'),
+    path('events/', views.UpcomingEventsAPI.as_view(), name='api_events'),
+    path('tags/', views.TagListAPI.as_view(), name='api_tags'),
+]
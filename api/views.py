@@ -0,0 +1,183 @@
+import hashlib
+from abc import ABCMeta, abstractmethod
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.http import Http404
+from django.utils import timezone
+from django.utils.translation import get_language
+from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework import generics
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from taggit.models import Tag
+
+from blog.models import Post
+from blog.popularity import popular_posts
+from home.events import upcoming_events
+from mysite.conditional import conditional_page
+from mysite.content_versions import get_versions
+from mysite.edge_cache import edge_cache
+from mysite.metrics import CACHED_VIEW_REQUESTS
+
+from .serializers import EventSerializer, PostDetailSerializer, PostListSerializer, TagSerializer
+
+
+class PostCursorPagination(CursorPagination):
+    """Stable pages under inserts; ``?cursor=`` comes from ``next``/``previous``."""
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-created_on"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = super().paginate_queryset(queryset, request, view)
+        if view is not None:
+            # Links carry only the parameters the view reads, like its cache key
+            self.base_url = view.canonical_url(request)
+        return page
+
+
+class ContentAPIView(generics.GenericAPIView, metaclass=ABCMeta):
+    """
+    Read-only JSON endpoint whose output depends only on ``content`` (content
+    version names, see mysite.content_versions), the language, the path and
+    ``query_params``. Subclasses implement ``build``.
+
+    The serialized payload is cached under a key carrying those versions,
+    so a warm request runs no queries and publishing anything retires it.
+    Other query parameters are ignored, so they can't mint cache entries.
+    The dispatch decorators added by ``as_view`` also give every response
+    an ETag/Last-Modified (304 on revalidation) and nginx edge caching.
+    """
+    content = ()
+    # Query parameters the output depends on (sparse fieldsets everywhere)
+    query_params = ("fields",)
+    # Output also rolls over at local midnight (upcoming events)
+    daily = False
+    renderer_classes = [JSONRenderer]
+    # Public and anonymous: no session or user lookups per request
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    query_budget = 3
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        if cls.__abstractmethods__:
+            missing = ", ".join(sorted(cls.__abstractmethods__))
+            raise TypeError(f"{cls.__name__} can't be routed: it doesn't implement {missing}")
+        view = super().as_view(**initkwargs)
+        view = conditional_page(*cls.content, daily=cls.daily)(view)
+        return edge_cache(*cls.content, query_params=cls.query_params)(view)
+
+    def canonical_url(self, request):
+        """The absolute URL with only ``query_params``, sorted."""
+        query = urlencode([
+            (name, value)
+            for name in sorted(set(request.query_params) & set(self.query_params))
+            for value in request.query_params.getlist(name)
+        ])
+        url = request.build_absolute_uri(request.path)
+        return f"{url}?{query}" if query else url
+
+    def cache_key(self, request):
+        versions = get_versions(*self.content)
+        parts = [type(self).__name__, get_language() or "", self.canonical_url(request)]
+        parts += [str(versions[name]) for name in self.content]
+        if self.daily:
+            parts.append(timezone.localdate().isoformat())
+        return "api:" + hashlib.md5(":".join(parts).encode(), usedforsecurity=False).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        key = self.cache_key(request)
+        data = cache.get(key)
+        view_name = f"api.{type(self).__name__}"
+        if data is not None:
+            CACHED_VIEW_REQUESTS.labels(view=view_name, result="hit").inc()
+            return Response(data)
+        CACHED_VIEW_REQUESTS.labels(view=view_name, result="miss").inc()
+        data = self.build(request, *args, **kwargs)
+        cache.set(key, data, settings.API_CACHE_TTL)
+        return Response(data)
+
+    @abstractmethod
+    def build(self, request, *args, **kwargs):
+        """The response payload (serialized data), cached by ``get``."""
+
+
+@extend_schema_view(get=extend_schema(operation_id="posts_list", responses=PostListSerializer(many=True)))
+class PostListAPI(ContentAPIView):
+    """Published posts, newest first. ``?tag=<slug>`` filters by tag."""
+    content = ("posts",)
+    query_params = ("cursor", "fields", "page_size", "tag")
+    serializer_class = PostListSerializer
+    pagination_class = PostCursorPagination
+
+    def get_queryset(self):
+        queryset = Post.objects.filter(status=1).select_related("author").prefetch_related("tags")
+        tag = self.request.query_params.get("tag")
+        if tag:
+            queryset = queryset.filter(tags__slug=tag)
+        return queryset
+
+    def build(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(self.get_serializer(page, many=True).data).data
+
+
+@extend_schema_view(get=extend_schema(operation_id="posts_popular", responses=PostListSerializer(many=True)))
+class PopularPostsAPI(ContentAPIView):
+    """Most viewed published posts in the request language over the last POPULAR_POSTS_DAYS days."""
+    content = ("posts", "popular")
+    serializer_class = PostListSerializer
+
+    def build(self, request, *args, **kwargs):
+        language = (get_language() or "uk").split("-")[0]
+        queryset = Post.objects.select_related("author").prefetch_related("tags")
+        return self.get_serializer(popular_posts(language, queryset), many=True).data
+
+
+@extend_schema_view(get=extend_schema(operation_id="posts_retrieve", responses=PostDetailSerializer))
+class PostDetailAPI(ContentAPIView):
+    """One published post by its slug in the request language."""
+    content = ("posts",)
+    serializer_class = PostDetailSerializer
+
+    def build(self, request, slug):
+        language = (get_language() or "uk").split("-")[0]
+        slug_field = f"slug_{language}" if hasattr(Post, f"slug_{language}") else "slug"
+        queryset = Post.objects.filter(status=1).select_related("author").prefetch_related("tags")
+        post = queryset.filter(**{slug_field: slug}).order_by("-updated_on", "-pk").first()
+        if post is None:
+            raise Http404("No Post matches the given query.")
+        return self.get_serializer(post).data
+
+
+@extend_schema_view(get=extend_schema(operation_id="events_list", responses=EventSerializer(many=True)))
+class UpcomingEventsAPI(ContentAPIView):
+    """The home page's upcoming events, soonest first."""
+    content = ("events",)
+    daily = True
+    serializer_class = EventSerializer
+
+    def build(self, request, *args, **kwargs):
+        return self.get_serializer(upcoming_events(), many=True).data
+
+
+@extend_schema_view(get=extend_schema(operation_id="tags_list", responses=TagSerializer(many=True)))
+class TagListAPI(ContentAPIView):
+    """Tags used by published posts, with how many posts carry each."""
+    content = ("posts",)
+    serializer_class = TagSerializer
+
+    def build(self, request, *args, **kwargs):
+        tags = (
+            Tag.objects.filter(post__status=1)
+            .annotate(count=Count("post", distinct=True))
+            .order_by("-count", "name")
+        )
+        return self.get_serializer(tags, many=True).data
@@ -0,0 +1,81 @@
+"""
+pytest-benchmark micro-benchmarks for the hot views, run in-process through
+the Django test client against a seeded database and the local Stripe stub.
+
+    pip install -r benchmarks/requirements.txt
+    pytest benchmarks --benchmark-json=micro.json
+"""
+import json
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+
+from stripe_stub import sign_webhook
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def uncached(client):
+    """Client whose requests never hit the per-view page cache."""
+    def get(url, **kwargs):
+        cache.clear()
+        return client.get(url, **kwargs)
+    return get
+
+
+def bench_home(benchmark, uncached):
+    response = benchmark(uncached, "/uk/")
+    assert response.status_code == 200
+
+
+def bench_home_cached(benchmark, client):
+    client.get("/uk/")
+    response = benchmark(client.get, "/uk/")
+    assert response.status_code == 200
+
+
+def bench_blog_list(benchmark, uncached):
+    response = benchmark(uncached, "/uk/blog/")
+    assert response.status_code == 200
+
+
+def bench_post_detail(benchmark, uncached):
+    response = benchmark(uncached, "/uk/bench-post-42/")
+    assert response.status_code == 200
+
+
+def bench_post_detail_en(benchmark, uncached):
+    response = benchmark(uncached, "/en/bench-post-42-en/")
+    assert response.status_code == 200
+
+
+def bench_search(benchmark, uncached):
+    response = benchmark(uncached, "/uk/search/", data={"q": "допомога"})
+    assert response.status_code == 200
+
+
+def bench_checkout_creation(benchmark, client, stripe_stub):
+    body = json.dumps({"amount": "20.00", "name": "Bench", "email": "bench@example.com"})
+    response = benchmark(client.post, "/uk/create-checkout-session/", body, content_type="application/json")
+    assert response.status_code == 200, response.content
+
+
+def bench_webhook_ingestion(benchmark, client, stripe_stub):
+    counter = iter(range(10**9))
+
+    def deliver():
+        payload = json.dumps({
+            "id": f"evt_bench_{next(counter)}",
+            "object": "event",
+            "type": "payment_intent.succeeded",
+            "data": {"object": {"id": f"pi_bench_hook_{next(counter)}", "object": "payment_intent"}},
+        })
+        return client.post(
+            "/stripe/webhook/", payload, content_type="application/json",
+            HTTP_STRIPE_SIGNATURE=sign_webhook(payload, settings.STRIPE_WEBHOOK_SECRET),
+        )
+
+    response = benchmark(deliver)
+    assert response.status_code == 200
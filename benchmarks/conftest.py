@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("STRIPE_WEBHOOK_SECRET", "whsec_benchmark")
+
+
+@pytest.fixture(scope="session")
+def stripe_stub():
+    """Local Stripe API stub on a free port, with the stripe client pointed at it."""
+    import stripe
+    from stripe_stub import serve
+
+    server = serve(port=0)
+    previous = stripe.api_base
+    stripe.api_base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    stripe.api_base = previous
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limits(settings):
+    """Every benchmark round comes from one client; the per-IP limits would measure 429s."""
+    settings.RATE_LIMIT_ENABLED = False
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    """Seeds a reduced but representative dataset once per session."""
+    from django.core.management import call_command
+
+    with django_db_blocker.unblock():
+        call_command(
+            "seed_benchmark_data",
+            posts=int(os.getenv("BENCH_POSTS", "500")),
+            donations=int(os.getenv("BENCH_DONATIONS", "20000")),
+            events=int(os.getenv("BENCH_EVENTS", "200")),
+            verbosity=0,
+        )
@@ -0,0 +1,241 @@
+"""
+Scripted load test for the public site, in the spirit of a locust file but
+with no extra dependencies (threads + requests).
+
+    # 1. seed data:      python manage.py seed_benchmark_data
+    # 2. stripe stub:    python benchmarks/stripe_stub.py --latency-ms 150
+    # 3. app:            RATE_LIMIT_ENABLED=false STRIPE_API_BASE=http://127.0.0.1:12111 \
+    #                        gunicorn -c gunicorn.conf.py mysite.wsgi
+    # 4. run:            python benchmarks/loadtest.py run --base-url http://127.0.0.1:8000 --out v1.2.0.json
+    # 5. diff releases:  python benchmarks/loadtest.py compare v1.1.0.json v1.2.0.json
+
+Each endpoint gets p50/p95/p99 latency and requests/second in the JSON report.
+All requests come from one address, so the app must run with rate limiting
+off: any 429 is counted under "rate_limited" and fails the run.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stripe_stub import sign_webhook  # noqa: E402
+
+SEARCH_TERMS = ("допомога", "одеса", "help", "winter", "bench", "діти", "project", "zzz-no-match")
+
+
+class Scenario:
+    """Weighted endpoint mix; each task returns (endpoint name, response)."""
+
+    def __init__(self, base_url, posts, webhook_secret, languages=("uk", "en")):
+        self.base = base_url.rstrip("/")
+        self.posts = posts
+        self.webhook_secret = webhook_secret
+        self.languages = languages
+        self.tasks = [
+            (20, self.home),
+            (15, self.blog_list),
+            (30, self.post_detail),
+            (10, self.search),
+            (5, self.checkout),
+            (5, self.webhook),
+        ]
+        self.weights = [weight for weight, _ in self.tasks]
+
+    def pick(self, rng):
+        return rng.choices(self.tasks, weights=self.weights)[0][1]
+
+    def home(self, session, rng):
+        return "home", session.get(f"{self.base}/{rng.choice(self.languages)}/")
+
+    def blog_list(self, session, rng):
+        return "blog_list", session.get(f"{self.base}/{rng.choice(self.languages)}/blog/")
+
+    def post_detail(self, session, rng):
+        i = rng.randrange(self.posts)
+        if i % 20 == 19:  # seeded drafts, see seed_benchmark_data
+            i -= 1
+        lang = rng.choice(self.languages)
+        slug = f"bench-post-{i}" if lang == "uk" else f"bench-post-{i}-en"
+        return "post_detail", session.get(f"{self.base}/{lang}/{slug}/")
+
+    def search(self, session, rng):
+        q = rng.choice(SEARCH_TERMS)
+        return "search", session.get(f"{self.base}/{rng.choice(self.languages)}/search/", params={"q": q})
+
+    def checkout(self, session, rng):
+        body = {"amount": rng.choice(("10.00", "20.00", f"{rng.randint(1, 300)}.00")),
+                "name": "Load Test", "email": "loadtest@example.com"}
+        return "checkout", session.post(f"{self.base}/{rng.choice(self.languages)}/create-checkout-session/", json=body)
+
+    def webhook(self, session, rng):
+        payload = json.dumps({
+            "id": f"evt_load_{uuid.uuid4().hex[:16]}",
+            "object": "event",
+            "type": "payment_intent.succeeded",
+            "data": {"object": {"id": f"pi_load_{uuid.uuid4().hex[:16]}", "object": "payment_intent"}},
+        })
+        headers = {"Stripe-Signature": sign_webhook(payload, self.webhook_secret),
+                   "Content-Type": "application/json"}
+        return "webhook", session.post(f"{self.base}/stripe/webhook/", data=payload, headers=headers)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples, elapsed):
+    endpoints = {}
+    for name in sorted(samples):
+        latencies = sorted(ms for ms, _ in samples[name])
+        statuses = [status for _, status in samples[name]]
+        endpoints[name] = {
+            "requests": len(latencies),
+            "errors": sum(1 for status in statuses if status is None or (status >= 400 and status != 429)),
+            "rate_limited": statuses.count(429),
+            "rps": round(len(latencies) / elapsed, 2),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+    return endpoints
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    scenario = Scenario(args.base_url, args.posts, args.webhook_secret)
+    samples, lock = {}, threading.Lock()
+    deadline = time.monotonic() + args.warmup + args.duration
+    measure_from = time.monotonic() + args.warmup
+
+    def worker(n):
+        rng = random.Random(args.seed + n)
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            task = scenario.pick(rng)
+            started = time.perf_counter()
+            try:
+                name, response = task(session, rng)
+                status = response.status_code
+            except requests.RequestException:
+                name, status = task.__name__, None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if time.monotonic() >= measure_from:
+                with lock:
+                    samples.setdefault(name, []).append((elapsed_ms, status))
+            if args.think_ms:
+                time.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    endpoints = summarize(samples, args.duration)
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "base_url": args.base_url,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": platform.python_version(),
+        },
+        "endpoints": endpoints,
+        "total_rps": round(sum(e["rps"] for e in endpoints.values()), 2),
+    }
+    with open(args.out, "w") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    print_table(endpoints)
+    print(f"\nReport written to {args.out}")
+    limited = sum(e["rate_limited"] for e in endpoints.values())
+    if limited:
+        print(f"\n{limited} requests were rate limited (429); rerun the app with RATE_LIMIT_ENABLED=false")
+        sys.exit(1)
+
+
+def print_table(endpoints):
+    print(f"{'endpoint':<14}{'reqs':>8}{'err':>6}{'429':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, e in endpoints.items():
+        print(f"{name:<14}{e['requests']:>8}{e['errors']:>6}{e['rate_limited']:>6}{e['rps']:>9}"
+              f"{e['p50_ms']:>9}{e['p95_ms']:>9}{e['p99_ms']:>9}")
+
+
+def compare(args):
+    with open(args.baseline) as fh:
+        old = json.load(fh)["endpoints"]
+    with open(args.candidate) as fh:
+        new = json.load(fh)["endpoints"]
+
+    def delta(a, b):
+        return f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+
+    print(f"{'endpoint':<14}{'rps':>18}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}")
+    regressions = []
+    for name in sorted(set(old) | set(new)):
+        if name not in old or name not in new:
+            print(f"{name:<14}  only in {'candidate' if name in new else 'baseline'}")
+            continue
+        o, n = old[name], new[name]
+        cells = [f"{n[key]} ({delta(o[key], n[key])})" for key in ("rps", "p50_ms", "p95_ms", "p99_ms")]
+        print(f"{name:<14}" + "".join(f"{c:>18}" for c in cells))
+        if o["p95_ms"] and (n["p95_ms"] - o["p95_ms"]) / o["p95_ms"] * 100 > args.threshold:
+            regressions.append(name)
+    if regressions:
+        print(f"\np95 regressed by more than {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Drive the endpoint mix and write a JSON report")
+    p_run.add_argument("--base-url", default="http://127.0.0.1:8000")
+    p_run.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    p_run.add_argument("--warmup", type=float, default=10, help="Unmeasured seconds before sampling")
+    p_run.add_argument("--concurrency", type=int, default=16)
+    p_run.add_argument("--think-ms", type=float, default=0, help="Mean pause between requests per user")
+    p_run.add_argument("--posts", type=int, default=5000, help="Number of seeded posts to pick slugs from")
+    p_run.add_argument("--seed", type=int, default=1)
+    p_run.add_argument("--webhook-secret", default=os.getenv("STRIPE_WEBHOOK_SECRET", ""))
+    p_run.add_argument("--out", default="bench-results.json")
+    p_run.set_defaults(func=run)
+
+    p_cmp = sub.add_parser("compare", help="Diff two JSON reports")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("candidate")
+    p_cmp.add_argument("--threshold", type=float, default=10, help="Fail if any p95 grows by more than this %%")
+    p_cmp.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
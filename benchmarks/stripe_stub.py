@@ -0,0 +1,183 @@
+"""
+Minimal local stand-in for the Stripe HTTP API, for benchmarks and tests.
+
+    python benchmarks/stripe_stub.py --port 12111 --latency-ms 150
+
+Point the app at it with ``STRIPE_API_BASE=http://127.0.0.1:12111``.
+
+Implements just enough of the REST surface used by the donations app:
+``POST /v1/<resource>`` creates an object, ``GET /v1/<resource>/<id>``
+retrieves it (unknown ids are synthesized, so webhooks for seeded payment
+intents work) and ``GET /v1/<resource>`` lists with cursor pagination and
+``created[gte]``/``created[lt]`` filters (``reconcile_donations``).
+"""
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+PREFIXES = {
+    "checkout/sessions": ("cs_test", "checkout.session"),
+    "payment_intents": ("pi_stub", "payment_intent"),
+    "charges": ("ch_stub", "charge"),
+    "products": ("prod_stub", "product"),
+    "prices": ("price_stub", "price"),
+}
+
+
+def sign_webhook(payload, secret, timestamp=None):
+    """Builds a ``Stripe-Signature`` header for ``payload`` (str)."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    mac = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256)
+    return f"t={timestamp},v1={mac.hexdigest()}"
+
+
+def _unflatten(pairs):
+    """``a[b][0][c]=1`` form encoding -> nested dicts (lists stay dicts keyed by index)."""
+    data = {}
+    for key, value in pairs:
+        parts = key.replace("]", "").split("[")
+        node = data
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return data
+
+
+class StripeStub:
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.objects = {}
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+
+    def _resource(self, path):
+        path = path.strip("/")
+        if not path.startswith("v1/"):
+            return None, None
+        rest = path[3:]
+        for resource in sorted(PREFIXES, key=len, reverse=True):
+            if rest == resource:
+                return resource, None
+            if rest.startswith(resource + "/"):
+                return resource, rest[len(resource) + 1:]
+        return None, None
+
+    def _synthesize(self, resource, obj_id):
+        prefix, kind = PREFIXES[resource]
+        obj = {"id": obj_id, "object": kind, "created": int(time.time()), "livemode": False, "metadata": {}}
+        if resource == "payment_intents":
+            obj.update(amount=2000, currency="usd", status="succeeded",
+                       receipt_email=None, latest_charge=f"ch_for_{obj_id}")
+        elif resource == "charges":
+            obj.update(
+                amount=2000, currency="usd", status="succeeded",
+                payment_intent=obj_id.replace("ch_for_", "", 1),
+                payment_method_details={"type": "card", "card": {"brand": "visa", "funding": "credit"}},
+                billing_details={"address": {"country": "PL"}},
+            )
+        return obj
+
+    def create(self, resource, params):
+        prefix, kind = PREFIXES[resource]
+        obj_id = f"{prefix}_{next(self.counter):08d}"
+        obj = self._synthesize(resource, obj_id)
+        obj.update(params)
+        if resource == "checkout/sessions":
+            pi = self.create("payment_intents", {"metadata": (params.get("payment_intent_data") or {}).get("metadata", {})})
+            obj.update(payment_intent=pi["id"], url=f"https://checkout.stripe.test/{obj_id}")
+        with self.lock:
+            self.objects[(resource, obj_id)] = obj
+        return obj
+
+    def retrieve(self, resource, obj_id):
+        with self.lock:
+            obj = self.objects.get((resource, obj_id))
+        return obj or self._synthesize(resource, obj_id)
+
+    def list(self, resource, params):
+        limit = int(params.get("limit", 10))
+        with self.lock:
+            items = [o for (res, _), o in sorted(self.objects.items()) if res == resource]
+        if "created[gte]" in params:
+            items = [o for o in items if o["created"] >= int(params["created[gte]"])]
+        if "created[lt]" in params:
+            items = [o for o in items if o["created"] < int(params["created[lt]"])]
+        after = params.get("starting_after")
+        if after:
+            ids = [o["id"] for o in items]
+            items = items[ids.index(after) + 1:] if after in ids else []
+        page = items[:limit]
+        return {"object": "list", "data": page, "has_more": len(items) > limit, "url": f"/v1/{resource}"}
+
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Request-Id", f"req_stub_{next(stub.counter)}")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _dispatch(self, method):
+            if stub.latency:
+                time.sleep(stub.latency)
+            url = urlsplit(self.path)
+            resource, obj_id = stub._resource(url.path)
+            if resource is None:
+                return self._reply(404, {"error": {"type": "invalid_request_error", "message": f"Unknown path {url.path}"}})
+            query = dict(parse_qsl(url.query))
+            if method == "POST":
+                length = int(self.headers.get("Content-Length") or 0)
+                params = _unflatten(parse_qsl(self.rfile.read(length).decode()))
+                return self._reply(200, stub.create(resource, params))
+            if obj_id:
+                return self._reply(200, stub.retrieve(resource, obj_id))
+            return self._reply(200, stub.list(resource, query))
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=12111, latency_ms=0):
+    """Starts the stub in a daemon thread and returns the server."""
+    server = ThreadingHTTPServer((host, port), make_handler(StripeStub(latency_ms)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated Stripe round-trip time")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StripeStub(args.latency_ms)))
+    print(f"Stripe stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django import forms
-from .models import Post, Profile
+from .models import Post, PostStats, Profile
 from django_ckeditor_5.widgets import CKEditor5Widget
 from modeltranslation.admin import TranslationAdmin
 from modeltranslation.admin import TabbedTranslationAdmin
@@ -35,4 +35,12 @@ class PostAdmin(TabbedTranslationAdmin):
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Profile)
\ No newline at end of file
+admin.site.register(Profile)
+
+
+@admin.register(PostStats)
+class PostStatsAdmin(admin.ModelAdmin):
+    list_display = ("post", "language", "day", "views")
+    list_filter = ("language", "day")
+    list_select_related = ("post",)
+    readonly_fields = ("post", "language", "day", "views")
@@ -0,0 +1,130 @@
+"""
+Search-box suggestions from an in-process prefix index.
+
+Each language gets a sorted list of normalized keys (every word-start
+suffix of a published post's title in that language, plus every tag in
+use) and a parallel list of suggestions. A lookup is a ``bisect`` to the
+first key >= the prefix and a walk while keys still start with it: no
+SQL, no cache round trip beyond reading the "posts" content version. The
+index is built at worker start (``warm()``) and rebuilt by the first
+lookup after that version is bumped.
+"""
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import translation
+from taggit.models import Tag
+
+from mysite.content_versions import get_version
+
+from .models import Post
+
+logger = logging.getLogger("app.blog")
+
+WORDS = re.compile(r"\w[\w'’-]*")
+
+
+def normalize(text):
+    return " ".join(text.casefold().split())
+
+
+class PrefixIndex:
+    def __init__(self, entries):
+        """``entries``: (text, suggestion dict) pairs; each word of ``text`` starts a key."""
+        keyed = []
+        for text, suggestion in entries:
+            text = normalize(text)
+            for match in WORDS.finditer(text):
+                # Matches at the start of the text rank first, then shorter texts
+                rank = (match.start() > 0, len(text))
+                keyed.append((text[match.start():], rank, suggestion))
+        keyed.sort(key=lambda item: item[:2])
+        self.keys = [key for key, _, _ in keyed]
+        self.ranks = [rank for _, rank, _ in keyed]
+        self.suggestions = [suggestion for _, _, suggestion in keyed]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, prefix, limit):
+        """Up to ``limit`` suggestions with a word starting with ``prefix``, best ranked first."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found = {}
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            suggestion = self.suggestions[position]
+            key = id(suggestion)
+            if key not in found or self.ranks[position] < found[key][0]:
+                found[key] = (self.ranks[position], suggestion)
+            position += 1
+        return [suggestion for _, suggestion in sorted(found.values(), key=lambda item: item[0])[:limit]]
+
+
+def build_indexes():
+    """``{language: PrefixIndex}`` over published posts' titles and the tags they use."""
+    posts = list(Post.objects.filter(status=1).order_by("-created_on"))
+    tags = [
+        {"kind": "tag", "label": tag.name, "slug": tag.slug}
+        for tag in Tag.objects.filter(post__status=1).distinct().order_by("name")
+    ]
+    indexes = {}
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            # modeltranslation resolves title/slug to this language (or its fallback)
+            entries = [
+                (post.title, {"kind": "post", "label": post.title,
+                              "url": reverse("post_detail", kwargs={"slug": post.slug})})
+                for post in posts if post.title
+            ]
+        entries += [(tag["label"], tag) for tag in tags]
+        indexes[language] = PrefixIndex(entries)
+    return indexes
+
+
+class _State:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.indexes = {}
+
+
+_state = _State()
+
+
+def indexes():
+    """The current indexes, rebuilt first if the "posts" version moved on since the last build."""
+    version = get_version("posts")
+    if version != _state.version:
+        with _state.lock:
+            if version != _state.version:
+                started = time.perf_counter()
+                _state.indexes = build_indexes()
+                _state.version = version
+                logger.info("Autocomplete index built", extra={
+                    "keys": sum(len(index) for index in _state.indexes.values()),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                })
+    return _state.indexes
+
+
+def suggest(prefix, language, limit=None):
+    index = indexes().get(language)
+    if index is None:
+        return []
+    return index.search(prefix, limit or settings.AUTOCOMPLETE_LIMIT)
+
+
+def warm():
+    """Builds the index before the worker takes traffic (gunicorn post_worker_init)."""
+    try:
+        indexes()
+    except Exception:
+        # e.g. migrations not applied yet; the first lookup builds it
+        logger.warning("Autocomplete index warm-up failed", exc_info=True)
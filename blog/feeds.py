@@ -0,0 +1,53 @@
+from django.contrib.syndication.views import Feed
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+from django.utils.translation import gettext_lazy as _
+
+from .models import Post
+
+FEED_ITEMS = 20
+
+
+class LatestPostsFeed(Feed):
+    """The newest published posts, in the language of the URL prefix."""
+    title = _("Блог")
+    description = _("Нові дописи фонду «Відгук»")
+
+    def link(self):
+        return reverse("blog")
+
+    def items(self):
+        return (
+            Post.objects.filter(status=1)
+            .select_related("author")
+            .prefetch_related("tags")
+            .order_by("-created_on", "-pk")[:FEED_ITEMS]
+        )
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return post.teaser_text or Truncator(strip_tags(post.content)).words(50)
+
+    def item_link(self, post):
+        return reverse("post_detail", kwargs={"slug": post.slug})
+
+    def item_author_name(self, post):
+        return post.author.name
+
+    def item_pubdate(self, post):
+        return post.created_on
+
+    def item_updateddate(self, post):
+        return post.updated_on
+
+    def item_categories(self, post):
+        return [tag.name for tag in post.tags.all()]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import translation
+
+from mysite.edge_cache import refresh
+from mysite.scheduler import periodic
+
+from .popularity import flush, rank
+
+
+@periodic("sitemap.rebuild", every=timedelta(hours=1))
+def rebuild_sitemap():
+    # Regenerated on publish through the "posts" purge already; this keeps
+    # them cached for crawlers across restarts and TTL expiry
+    urls = [reverse("sitemap")]
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            urls += [reverse("posts_rss"), reverse("posts_atom")]
+    refresh(urls)
+
+
+@periodic("posts.views.flush", every=timedelta(minutes=1))
+def flush_post_views():
+    flush()
+
+
+@periodic("posts.popular.rank", every=timedelta(minutes=10))
+def rank_popular_posts():
+    rank()
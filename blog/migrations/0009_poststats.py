@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_content_en_post_content_uk_post_slug_en_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=7)),
+                ('day', models.DateField(db_index=True)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='blog.post')),
+            ],
+            options={
+                'verbose_name_plural': 'post stats',
+                'constraints': [models.UniqueConstraint(fields=('post', 'language', 'day'), name='post_stats_post_language_day')],
+            },
+        ),
+    ]
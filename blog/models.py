@@ -33,4 +33,21 @@ class Post(models.Model):
         ordering = ['-created_on']
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class PostStats(models.Model):
+    """Views of a post in one language on one day, written in bulk by blog.popularity.flush."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="stats")
+    language = models.CharField(max_length=7)
+    day = models.DateField(db_index=True)
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "post stats"
+        constraints = [
+            models.UniqueConstraint(fields=["post", "language", "day"], name="post_stats_post_language_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.post} [{self.language}] {self.day}: {self.views}"
@@ -0,0 +1,228 @@
+"""
+Post view counts and the "popular posts" ranking.
+
+A view is one ``HINCRBY`` on a Redis hash (field ``<post id>:<language>``),
+so a hit never writes to PostgreSQL. The "posts.views.flush" job moves the
+hash into PostStats (one row per post, language and day) in a single
+statement, and "posts.popular.rank" turns the last POPULAR_POSTS_DAYS of
+PostStats into per-language rankings cached under RANKING_KEY. Sidebars
+and the API only read that ranking; a changed ranking bumps the "popular"
+content version.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from mysite.content_versions import bump_version
+from mysite.metrics import POST_VIEW_BACKEND_ERRORS, POST_VIEWS_FLUSHED
+
+from .models import Post, PostStats
+
+logger = logging.getLogger("app.blog")
+
+PENDING_KEY = "post-views:pending"
+# A flush renames the pending hash here first, so views counted while it
+# writes go into a fresh hash and none are lost or counted twice
+FLUSHING_KEY = "post-views:flushing"
+RANKING_KEY = "posts:popular"
+
+
+class LocalViews:
+    """Per-process counts: the fallback when Redis isn't configured or is down."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.since = None
+        self.lock = threading.Lock()
+
+    def incr(self, field):
+        with self.lock:
+            self.counts[field] += 1
+            self.since = self.since or time.monotonic()
+
+    def add(self, counts):
+        with self.lock:
+            self.counts.update(counts)
+            self.since = self.since or time.monotonic()
+
+    def due(self):
+        return self.since is not None and time.monotonic() - self.since >= settings.POST_VIEWS_FLUSH_INTERVAL
+
+    def drain(self):
+        with self.lock:
+            counts, self.counts, self.since = self.counts, Counter(), None
+        return dict(counts)
+
+
+class RedisViews:
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection("default")
+
+    def incr(self, field):
+        self.redis.hincrby(PENDING_KEY, field, 1)
+
+    def pending(self):
+        from redis.exceptions import ResponseError
+
+        # A hash left by a flush that failed to write is retried before
+        # taking newer views
+        if not self.redis.exists(FLUSHING_KEY):
+            try:
+                self.redis.rename(PENDING_KEY, FLUSHING_KEY)
+            except ResponseError:
+                # No views since the last flush
+                return {}
+        return {field.decode(): int(views) for field, views in self.redis.hgetall(FLUSHING_KEY).items()}
+
+    def done(self):
+        self.redis.delete(FLUSHING_KEY)
+
+
+_local = LocalViews()
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def _shared_views():
+    global _redis
+    if _redis is None and "django_redis" in settings.CACHES["default"]["BACKEND"]:
+        with _redis_lock:
+            if _redis is None:
+                _redis = RedisViews()
+    return _redis
+
+
+def record_view(post_id, language):
+    """
+    Counts one view of ``post_id`` in ``language``. Without Redis, or if
+    the call fails, the view is buffered in this process and written by
+    its next request after POST_VIEWS_FLUSH_INTERVAL.
+    """
+    field = f"{post_id}:{language}"
+    shared = _shared_views()
+    if shared is not None:
+        try:
+            shared.incr(field)
+            return
+        except Exception:
+            POST_VIEW_BACKEND_ERRORS.inc()
+            logger.warning("View counter backend unavailable, buffering locally", exc_info=True)
+    _local.incr(field)
+    if _local.due():
+        try:
+            flush_local()
+        except Exception:
+            # The counts went back into the buffer; the next request or the
+            # "posts.views.flush" job retries
+            logger.warning("Post views flush failed", exc_info=True)
+
+
+def add_views(counts, day):
+    """
+    Adds ``{"<post id>:<language>": views}`` to ``day``'s PostStats rows in
+    one ``INSERT ... ON CONFLICT DO UPDATE SET views = views + excluded.views``.
+    Unknown posts and languages are dropped. Returns the views written.
+    """
+    languages = {code for code, _ in settings.LANGUAGES}
+    parsed = {}
+    for field, views in counts.items():
+        post_id, _, language = field.partition(":")
+        if post_id.isdigit() and language in languages and views > 0:
+            parsed[int(post_id), language] = views
+    existing = set(Post.objects.filter(pk__in={post_id for post_id, _ in parsed}).values_list("pk", flat=True))
+    rows = [(post_id, language, views) for (post_id, language), views in parsed.items() if post_id in existing]
+    if not rows:
+        return 0
+
+    quote = connection.ops.quote_name
+    table = quote(PostStats._meta.db_table)
+    day = connection.ops.adapt_datefield_value(day)
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({quote('post_id')}, {quote('language')}, {quote('day')}, {quote('views')}) "
+            f"VALUES {values} "
+            f"ON CONFLICT ({quote('post_id')}, {quote('language')}, {quote('day')}) "
+            f"DO UPDATE SET {quote('views')} = {table}.{quote('views')} + excluded.{quote('views')}",
+            [value for post_id, language, views in rows for value in (post_id, language, day, views)],
+        )
+    written = sum(views for _, _, views in rows)
+    POST_VIEWS_FLUSHED.inc(written)
+    return written
+
+
+def flush_local(day=None):
+    counts = _local.drain()
+    try:
+        return add_views(counts, day or timezone.localdate())
+    except Exception:
+        _local.add(counts)
+        raise
+
+
+def flush(day=None):
+    """Writes buffered views (Redis and this process's) to PostStats; returns how many."""
+    day = day or timezone.localdate()
+    written = flush_local(day)
+    shared = _shared_views()
+    if shared is not None:
+        written += add_views(shared.pending(), day)
+        shared.done()
+    if written:
+        logger.info("Post views flushed", extra={"views": written})
+    return written
+
+
+def compute_ranking(today=None):
+    """``{language: [post id, ...]}``, most viewed published posts over POPULAR_POSTS_DAYS first."""
+    today = today or timezone.localdate()
+    rows = (
+        PostStats.objects.filter(day__gt=today - timedelta(days=settings.POPULAR_POSTS_DAYS), post__status=1)
+        .values("language", "post_id")
+        .annotate(total=Sum("views"))
+        .order_by("language", "-total", "-post_id")
+    )
+    ranking = {}
+    for row in rows:
+        ids = ranking.setdefault(row["language"], [])
+        if len(ids) < settings.POPULAR_POSTS_LIMIT:
+            ids.append(row["post_id"])
+    return ranking
+
+
+def rank(today=None):
+    """Recomputes and caches the ranking; bumps "popular" if it changed."""
+    ranking = compute_ranking(today)
+    if cache.get(RANKING_KEY) != ranking:
+        cache.set(RANKING_KEY, ranking, timeout=None)
+        bump_version("popular")
+    return ranking
+
+
+def popular_post_ids(language):
+    ranking = cache.get(RANKING_KEY)
+    if ranking is None:
+        # Evicted or never ranked: one aggregate, then cached like the job's
+        ranking = compute_ranking()
+        cache.add(RANKING_KEY, ranking, timeout=None)
+    return ranking.get(language, [])
+
+
+def popular_posts(language, queryset=None):
+    """The ranked published posts for ``language``, in ranking order."""
+    ids = popular_post_ids(language)
+    if not ids:
+        return []
+    queryset = queryset if queryset is not None else Post.objects.select_related("author")
+    posts = queryset.filter(status=1).in_bulk(ids)
+    return [posts[post_id] for post_id in ids if post_id in posts]
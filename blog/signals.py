@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+
+from mysite.content_versions import bump_version
+
+from .models import Post, Profile
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+@receiver(post_save, sender=TaggedItem)
+@receiver(post_delete, sender=TaggedItem)
+def bump_posts_version(sender, **kwargs):
+    # Post lists, sidebars and related-post carousels show titles, authors
+    # and tag overlap, so any of these changing retires them.
+    bump_version("posts")
@@ -0,0 +1,44 @@
+from django.contrib.sitemaps import Sitemap
+from django.urls import reverse
+
+from .models import Post
+
+
+class LocalizedSitemap(Sitemap):
+    """
+    One <url> per language with ``hreflang`` alternates (and x-default).
+    ``location`` runs under each language in turn, so reverse() picks up
+    the prefix and, for posts, the modeltranslation slug.
+    """
+    i18n = True
+    alternates = True
+    x_default = True
+
+
+class StaticViewSitemap(LocalizedSitemap):
+    priority = 0.8
+    changefreq = "weekly"
+
+    def items(self):
+        return ["home", "team", "blog", "events_archive"]
+
+    def location(self, item):
+        return reverse(item)
+
+
+class PostSitemap(LocalizedSitemap):
+    changefreq = "monthly"
+    priority = 0.6
+
+    def items(self):
+        # Only what location/lastmod read: the slugs of every language
+        return Post.objects.filter(status=1).only("pk", "updated_on", "slug_uk", "slug_en").order_by("-created_on", "-pk")
+
+    def location(self, post):
+        return reverse("post_detail", kwargs={"slug": post.slug})
+
+    def lastmod(self, post):
+        return post.updated_on
+
+
+SITEMAPS = {"pages": StaticViewSitemap, "posts": PostSitemap}
@@ -1,3 +1,389 @@
-from django.test import TestCase
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from prometheus_client import REGISTRY
+from unittest import mock
+
+from mysite import edge_cache, ratelimit
+from mysite.content_versions import get_version
+from mysite.db_stats import repeated_shapes, sql_shape
+from mysite.testing import QueryBudgetTestMixin
+
+from . import autocomplete, popularity
+from .models import Post, PostStats, Profile
+
+
+def make_post(author, n, **kwargs):
+    defaults = dict(
+        title_uk=f"Допис {n}",
+        title_en=f"Post {n}",
+        slug_uk=f"dopys-{n}",
+        slug_en=f"post-{n}",
+        content_uk="Текст",
+        content_en="Text",
+        author=author,
+        status=1,
+        image="images/post.jpg",
+    )
+    defaults.update(kwargs)
+    return Post.objects.create(**defaults)
+
+
+class BlogQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        authors = [
+            Profile.objects.create(name=f"Author {i}", bio="", image="images/author.jpg")
+            for i in range(3)
+        ]
+        cls.posts = [make_post(authors[i % 3], i) for i in range(12)]
+        for post in cls.posts:
+            post.tags.add("help", "odesa")
+
+    def test_post_list(self):
+        self.assertWithinQueryBudget("/uk/blog/")
+
+    def test_post_detail(self):
+        response = self.assertWithinQueryBudget("/uk/dopys-3/")
+        self.assertEqual(response.context["post"], self.posts[3])
+        self.assertLessEqual(len(response.context["related_posts"]), 4)
+
+    def test_search(self):
+        response = self.assertWithinQueryBudget("/uk/search/?q=Допис")
+        self.assertEqual(len(response.context["results"]), 12)
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Profile.objects.create(name="Author", bio="", image="images/author.jpg")
+        cls.posts = [make_post(cls.author, i) for i in range(6)]
+        for post in cls.posts:
+            post.tags.add("help")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sidebars_served_from_cache(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get("/uk/dopys-1/")
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get("/uk/dopys-1/")
+        self.assertLess(len(warm), len(cold))
+        self.assertContains(response, "Допис 5")  # recent posts sidebar
+        self.assertContains(response, "/uk/dopys-2/")  # related posts carousel
+
+    def test_fragments_are_per_language(self):
+        self.client.get("/uk/dopys-1/")
+        self.assertContains(self.client.get("/en/post-1/"), "Post 5")
+
+    def test_saving_a_post_retires_fragments(self):
+        self.client.get("/uk/dopys-1/")
+        post = self.posts[5]
+        post.title_uk = "Оновлений допис"
+        post.save()
+        self.assertContains(self.client.get("/uk/dopys-1/"), "Оновлений допис")
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Profile.objects.create(name="Author", bio="", image="images/author.jpg")
+        cls.posts = [make_post(cls.author, i) for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_revalidation_skips_the_view(self):
+        for url in ("/uk/dopys-1/", "/uk/blog/", "/uk/search/?q=Допис", "/uk/"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                with self.assertNumQueries(0):
+                    revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.content, b"")
+
+    def test_if_modified_since(self):
+        response = self.client.get("/uk/dopys-1/")
+        revalidated = self.client.get("/uk/dopys-1/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_validators_change_with_content_language_and_query(self):
+        etag = self.client.get("/uk/dopys-1/")["ETag"]
+        self.assertNotEqual(self.client.get("/en/post-1/")["ETag"], etag)
+        self.assertNotEqual(
+            self.client.get("/uk/search/?q=a")["ETag"], self.client.get("/uk/search/?q=b")["ETag"],
+        )
+
+        self.posts[2].title_uk = "Нова назва"
+        self.posts[2].save()
+        response = self.client.get("/uk/dopys-1/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class StubEdge(ThreadingHTTPServer):
+    """Stands in for nginx's internal listener; records refresh requests."""
+
+    def __init__(self):
+        self.seen = []
+        self.gone = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.seen.append((self.path, self.headers.get("X-Edge-Refresh"), self.headers.get("Host")))
+                self.send_response(404 if self.path in server.gone else 200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class EdgeCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Profile.objects.create(name="Author", bio="", image="images/author.jpg")
+        cls.posts = [make_post(cls.author, i) for i in range(2)]
+
+    def setUp(self):
+        cache.clear()
+        self.edge = StubEdge()
+        self.addCleanup(self.edge.server_close)
+        self.addCleanup(self.edge.shutdown)
+        settings = override_settings(EDGE_CACHE_URL=self.edge.url, EDGE_CACHE_HOST="respondua.org")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_anonymous_pages_carry_policy_and_keys(self):
+        response = self.client.get("/uk/dopys-1/")
+        self.assertEqual(response["X-Accel-Expires"], "600")
+        self.assertEqual(response["Surrogate-Key"], "posts")
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=0", response["Cache-Control"])
+
+        self.client.cookies["sessionid"] = "abc"
+        self.assertEqual(self.client.get("/uk/dopys-1/")["X-Accel-Expires"], "0")
+
+    def test_saving_a_post_refreshes_tagged_urls(self):
+        for url in ("/uk/dopys-1/", "/en/blog/", "/uk/search/?q=x"):
+            self.client.get(url)
+        self.edge.gone = {"/uk/dopys-1/"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[0].title_uk = "Нова назва"
+            self.posts[0].save()
+            self.posts[0].tags.add("news")
+        edge_cache.flush(timeout=5)
+
+        # Search results carry no key, and one save purges once
+        self.assertCountEqual(
+            self.edge.seen, [(url, "1", "respondua.org") for url in ("/uk/dopys-1/", "/en/blog/")],
+        )
+        # Refreshed URLs stay indexed for the next publish; a 404 leaves
+        self.assertEqual(edge_cache.urls_for("posts"), ["/en/blog/"])
+
+    def test_only_refreshes_with_the_secret_skip_rate_limits(self):
+        with override_settings(RATE_LIMITS={"search": "1/m"}, EDGE_REFRESH_SECRET="s3cret"), \
+                mock.patch.object(ratelimit, "_local", ratelimit.LocalBuckets()):
+            self.assertEqual(self.client.get("/uk/search/?q=x").status_code, 200)
+            self.assertEqual(self.client.get("/uk/search/?q=x").status_code, 429)
+            self.assertEqual(self.client.get("/uk/search/?q=x", HTTP_X_EDGE_REFRESH="1").status_code, 429)
+            self.assertEqual(self.client.get("/uk/search/?q=x", HTTP_X_EDGE_REFRESH="s3cret").status_code, 200)
+
+    def test_failed_refreshes_are_not_ok(self):
+        def refreshes(result):
+            return REGISTRY.get_sample_value("app_edge_purge_requests_total", {"result": result}) or 0
+
+        ok, errors = refreshes("ok"), refreshes("error")
+        with mock.patch("mysite.edge_cache.requests.Session.request", return_value=mock.Mock(status_code=429)), \
+                self.assertLogs("app.edge", "WARNING"):
+            self.assertEqual(edge_cache.refresh(["/uk/"]), [])
+        self.assertEqual((refreshes("ok"), refreshes("error")), (ok, errors + 1))
+
+
+class SyndicationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Profile.objects.create(name="Author", bio="", image="images/author.jpg")
+        cls.posts = [make_post(cls.author, i) for i in range(2)]
+        cls.draft = make_post(cls.author, 9, status=0)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sitemap_lists_each_language_with_alternates(self):
+        response = self.client.get("/sitemap.xml")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+        xml = response.content.decode()
+        self.assertIn("<loc>http://testserver/uk/dopys-1/</loc>", xml)
+        self.assertIn("<loc>http://testserver/en/post-1/</loc>", xml)
+        self.assertIn('hreflang="en" href="http://testserver/en/post-1/"', xml)
+        self.assertIn('hreflang="x-default" href="http://testserver/dopys-1/"', xml)
+        self.assertNotIn("dopys-9", xml)
+
+    def test_documents_are_rebuilt_only_after_a_publish(self):
+        for url in ("/sitemap.xml", "/en/feeds/posts.rss", "/uk/feeds/posts.atom"):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(url).content, first.content)
+
+        self.draft.status = 1
+        self.draft.save()
+        self.assertIn(b"/en/post-9/", self.client.get("/en/feeds/posts.rss").content)
+        self.assertIn(b"/uk/dopys-9/", self.client.get("/sitemap.xml").content)
+
+    def test_feeds_follow_the_language_prefix(self):
+        rss = self.client.get("/en/feeds/posts.rss")
+        self.assertEqual(rss["Content-Type"], "application/rss+xml; charset=utf-8")
+        self.assertIn(b"<title>Post 1</title>", rss.content)
+        atom = self.client.get("/uk/feeds/posts.atom")
+        self.assertEqual(atom["Content-Type"], "application/atom+xml; charset=utf-8")
+        self.assertIn("<title>Допис 1</title>", atom.content.decode())
+
+
+class SqlShapeTests(TestCase):
+    def test_in_lists_and_literals_collapse(self):
+        a = 'SELECT * FROM "blog_post" WHERE "id" IN (%s, %s) LIMIT 21'
+        b = 'SELECT * FROM "blog_post" WHERE "id" IN (%s, %s, %s)  LIMIT 5'
+        self.assertEqual(sql_shape(a), sql_shape(b))
+
+    def test_repeated_shapes(self):
+        sql = 'SELECT * FROM "blog_profile" WHERE "id" = %s LIMIT 21'
+        self.assertEqual(repeated_shapes([sql] * 5 + ["SELECT 1"], 5), [(sql_shape(sql), 5)])
+
+
+class PostViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Profile.objects.create(name="Author", bio="", image="images/author.jpg")
+        cls.posts = [make_post(cls.author, i) for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        for target, attribute, value in (
+            (popularity, "_local", popularity.LocalViews()),
+            (ratelimit, "_local", ratelimit.LocalBuckets()),
+        ):
+            patcher = mock.patch.object(target, attribute, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.today = datetime.date(2026, 3, 10)
+
+    def stats(self):
+        return {(s.post_id, s.language, s.day): s.views for s in PostStats.objects.all()}
+
+    def test_beacon_views_are_flushed_in_bulk(self):
+        first, second = self.posts[0].pk, self.posts[1].pk
+        for url in (f"/uk/blog/{first}/view/", f"/uk/blog/{first}/view/", f"/en/blog/{first}/view/",
+                    f"/uk/blog/{second}/view/"):
+            self.assertEqual(self.client.post(url).status_code, 204)
+        self.assertEqual(self.client.get(f"/uk/blog/{first}/view/").status_code, 405)
+
+        with self.assertNumQueries(2):  # which posts exist, one upsert
+            self.assertEqual(popularity.flush(self.today), 4)
+        popularity.record_view(first, "uk")
+        popularity.flush(self.today)
+        self.assertEqual(self.stats(), {
+            (first, "uk", self.today): 3, (first, "en", self.today): 1, (second, "uk", self.today): 1,
+        })
+        self.assertEqual(popularity.flush(self.today), 0)
+
+    @override_settings(POST_VIEWS_FLUSH_INTERVAL=0)
+    def test_failed_in_request_flush_keeps_the_views(self):
+        url = f"/uk/blog/{self.posts[0].pk}/view/"
+        with mock.patch("blog.popularity.add_views", side_effect=DatabaseError("down")), \
+                self.assertLogs("app.blog", "WARNING"):
+            self.assertEqual(self.client.post(url).status_code, 204)
+        self.assertEqual(popularity.flush(self.today), 1)
+
+    def test_unknown_posts_and_languages_are_dropped(self):
+        popularity.record_view(999, "uk")
+        popularity.record_view(self.posts[0].pk, "de")
+        self.assertEqual(popularity.flush(self.today), 0)
+        self.assertFalse(PostStats.objects.exists())
+
+    def test_ranking_is_precomputed_per_language(self):
+        first, second, third = self.posts
+        for post, language, views, days_ago in (
+            (first, "uk", 5, 0), (second, "uk", 9, 1), (third, "en", 4, 2),
+            (first, "uk", 50, 30),  # outside POPULAR_POSTS_DAYS
+        ):
+            PostStats.objects.create(post=post, language=language, views=views,
+                                     day=self.today - datetime.timedelta(days=days_ago))
+
+        version = get_version("popular")
+        self.assertEqual(popularity.rank(self.today), {"uk": [second.pk, first.pk], "en": [third.pk]})
+        self.assertGreater(get_version("popular"), version)
+        version = get_version("popular")
+        popularity.rank(self.today)
+        self.assertEqual(get_version("popular"), version)  # unchanged ranking
+
+        with self.assertNumQueries(0):
+            self.assertEqual(popularity.popular_post_ids("uk"), [second.pk, first.pk])
+        api = self.client.get("/uk/api/posts/popular/").json()
+        self.assertEqual([p["title"] for p in api], ["Допис 1", "Допис 0"])
+        response = self.client.get("/en/post-1/")
+        self.assertEqual(list(response.context["popular_posts"]), [third])
+        self.assertContains(response, "Популярні Публікації")  # sidebar widget (msgid)
+
+
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Profile.objects.create(name="Author", bio="", image="images/author.jpg")
+        cls.winter = make_post(author, 1, title_uk="Зимова допомога дітям", title_en="Winter help for kids")
+        cls.water = make_post(author, 2, title_uk="Вода для Херсона", title_en="Water for Kherson")
+        make_post(author, 3, title_uk="Чернетка", title_en="Wishlist draft", status=0)
+        cls.winter.tags.add("winter", "kids")
+
+    def setUp(self):
+        cache.clear()
+        for target, attribute, value in (
+            (autocomplete, "_state", autocomplete._State()),
+            (ratelimit, "_local", ratelimit.LocalBuckets()),
+        ):
+            patcher = mock.patch.object(target, attribute, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def suggest(self, url, query):
+        return [(r["kind"], r["label"]) for r in self.client.get(url, {"q": query}).json()["results"]]
+
+    def test_titles_per_language_and_tags(self):
+        self.assertEqual(self.suggest("/en/search/autocomplete/", "wi"),
+                         [("tag", "winter"), ("post", "Winter help for kids")])
+        self.assertEqual(self.suggest("/en/search/autocomplete/", "KIDS"), [("tag", "kids"), ("post", "Winter help for kids")])
+        self.assertEqual(self.suggest("/uk/search/autocomplete/", "доп"), [("post", "Зимова допомога дітям")])
+        self.assertEqual(self.suggest("/en/search/autocomplete/", "w"), [])  # below AUTOCOMPLETE_MIN_LENGTH
+        result = self.client.get("/uk/search/autocomplete/", {"q": "вода"}).json()["results"][0]
+        self.assertEqual(result["url"], "/uk/dopys-2/")
+
+    def test_warm_index_needs_no_queries_and_follows_publishes(self):
+        autocomplete.warm()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(autocomplete.suggest("wat", "en")), 1)
+        self.water.title_en = "Clean water for Kherson"
+        self.water.save()
+        self.assertEqual([r["label"] for r in autocomplete.suggest("wat", "en")], ["Clean water for Kherson"])
+
+    def test_prefix_index_ranks_and_dedupes(self):
+        index = autocomplete.PrefixIndex([
+            ("Help the help desk", {"label": "a"}), ("Helpers", {"label": "b"}), ("Self help", {"label": "c"}),
+        ])
+        self.assertEqual([s["label"] for s in index.search("help", 10)], ["b", "a", "c"])
+        self.assertEqual([s["label"] for s in index.search("help", 1)], ["b"])
+        self.assertEqual(index.search("zzz", 10), [])
@@ -5,6 +5,10 @@ from django.urls import path, include
 urlpatterns = [
     path('blog/', views.PostList.as_view(), name='blog'),
     path('search/', views.search_posts, name='search_posts'),
+    path('search/autocomplete/', views.search_autocomplete, name='search_autocomplete'),
+    path('feeds/posts.rss', views.posts_rss, name='posts_rss'),
+    path('feeds/posts.atom', views.posts_atom, name='posts_atom'),
+    path('blog/<int:pk>/view/', views.record_post_view, name='record_post_view'),
     path('<slug:slug>/', views.PostDetail.as_view(), name='post_detail'),
     path('recent_posts/', views.RecentPosts.as_view(), name='recent_posts'), 
     path("ckeditor5/", include('django_ckeditor_5.urls')),
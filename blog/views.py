@@ -1,26 +1,48 @@
 import logging
-from django.http import Http404
+from django.conf import settings
+from django.contrib.sitemaps import views as sitemaps_views
+from django.db.models import prefetch_related_objects
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
 from django.utils.translation import get_language
 from django.views import generic
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from mysite.conditional import conditional_page, content_document
+from mysite.db_stats import query_budget
+from mysite.edge_cache import edge_cache
+from mysite.ratelimit import rate_limit
+from .autocomplete import suggest
+from .feeds import LatestPostsAtomFeed, LatestPostsFeed
 from .models import Post
+from .popularity import popular_posts, record_view
+from .sitemaps import SITEMAPS
 
 logger = logging.getLogger(__name__)  # создаём логгер для blog
 
+@method_decorator(edge_cache("posts"), name="dispatch")
+@method_decorator(conditional_page("posts"), name="dispatch")
 class PostList(generic.ListView):
-    queryset = Post.objects.filter(status=1).order_by('-created_on')
+    queryset = Post.objects.filter(status=1).select_related('author').order_by('-created_on')
     template_name = 'blogusy.html'
+    query_budget = 2
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['is_blog_page'] = True  
-        logger.info("Blog list page opened", extra={"total_posts": self.queryset.count()})
+        # len() evaluates object_list once; the template reuses the result
+        logger.info("Blog list page opened", extra={"total_posts": len(context['object_list'])})
         return context
 
 
+@method_decorator(edge_cache("posts"), name="dispatch")
+@method_decorator(conditional_page("posts", "popular"), name="dispatch")
 class PostDetail(generic.DetailView):
     model = Post
     template_name = 'single_blogus.html'
+    query_budget = 8
 
     def get_object(self, queryset=None):
         queryset = queryset or self.get_queryset()
@@ -28,31 +50,51 @@ class PostDetail(generic.DetailView):
         slug = self.kwargs.get(self.slug_url_kwarg)
         slug_field = f"{self.slug_field}_{language}"
 
-        localized_queryset = queryset.filter(status=1)
+        localized_queryset = queryset.filter(status=1).select_related("author")
         if hasattr(Post, slug_field):
             localized_queryset = localized_queryset.filter(**{slug_field: slug})
         else:
             localized_queryset = localized_queryset.filter(**{self.slug_field: slug})
 
-        obj = localized_queryset.order_by("-updated_on", "-pk").first()
-        if obj is None:
+        # Fetch two rows: enough to detect an ambiguous slug without a COUNT
+        matches = list(localized_queryset.order_by("-updated_on", "-pk")[:2])
+        if not matches:
             raise Http404("No Post matches the given query.")
 
-        if localized_queryset.count() > 1:
+        if len(matches) > 1:
             logger.warning(
                 "Multiple posts matched localized slug",
-                extra={"slug": slug, "language": language, "matches": localized_queryset.count()},
+                extra={"slug": slug, "language": language},
             )
 
-        return obj
+        return matches[0]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        recent = Post.objects.filter(status=1).order_by('-created_on')[:5]
+        recent = Post.objects.filter(status=1).select_related('author').order_by('-created_on')[:5]
         context['recent_posts'] = recent
+        # Lazy: only evaluated when the cached related-posts fragment misses
+        context['related_posts'] = SimpleLazyObject(self.get_related_posts)
+        language = (get_language() or "uk").split("-")[0]
+        context['popular_posts'] = SimpleLazyObject(lambda: popular_posts(language))
         logger.info("Blog post viewed", extra={"post_title": self.object.title})
         return context
 
+    def get_related_posts(self, limit=4):
+        related = [p for p in self.object.tags.similar_objects() if p.status == 1][:limit]
+        prefetch_related_objects(related, 'author')
+        return related
+
+
+@rate_limit("post_views", "30/m")
+@csrf_exempt
+@require_POST
+def record_post_view(request, pk):
+    # Post pages come from the edge cache, so renders aren't views: the
+    # page reports itself with a beacon (single_blogus.html)
+    record_view(pk, (get_language() or "uk").split("-")[0])
+    return HttpResponse(status=204)
+
 
 class RecentPosts(generic.ListView):
     queryset = Post.objects.filter(status=1).order_by('-created_on')[:5]
@@ -64,13 +106,46 @@ class RecentPosts(generic.ListView):
         return super().get_queryset()
 
 
+@rate_limit("search", "30/m")
+@edge_cache(ttl=60)
+@conditional_page("posts")
+@query_budget(2)
 def search_posts(request):
+    """
+    No surrogate key: every ``?q=`` variant would be refreshed on each
+    publish, so nginx keeps results for a minute like search_autocomplete.
+    """
     query = request.GET.get('q', '').strip()
-    results = Post.objects.filter(title__icontains=query) if query else Post.objects.none()
+    results = Post.objects.filter(title__icontains=query).select_related('author') if query else Post.objects.none()
+    results = list(results)
 
     logger.info(
         "Blog search performed",
-        extra={"search_query": query, "results_count": results.count()}
+        extra={"search_query": query, "results_count": len(results)}
     )
 
     return render(request, 'search_results.html', {'results': results, 'query': query})
+
+
+@rate_limit("autocomplete", "120/m")
+@edge_cache(ttl=60)
+def search_autocomplete(request):
+    """
+    ``?q=<prefix>`` -> post titles (in the request language) and tags with a
+    word starting with it, from the in-process index (blog.autocomplete).
+    No surrogate key: one per keystroke would crowd real pages out of the
+    purge index, so nginx just keeps each for a minute.
+    """
+    query = request.GET.get("q", "").strip()[:100]
+    language = (get_language() or "uk").split("-")[0]
+    results = suggest(query, language) if len(query) >= settings.AUTOCOMPLETE_MIN_LENGTH else []
+    return JsonResponse({"query": query, "results": results})
+
+
+@content_document("posts")
+def sitemap(request):
+    return sitemaps_views.sitemap(request, sitemaps=SITEMAPS)
+
+
+posts_rss = content_document("posts")(LatestPostsFeed())
+posts_atom = content_document("posts")(LatestPostsAtomFeed())
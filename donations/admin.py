@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Donation
+from django.utils import timezone
+from .models import Donation, DonationPrice
+from .partitions import add_months, month_range, month_start, months
 from django.http import HttpResponse
 import csv
 
@@ -12,6 +14,29 @@ METHOD_DISPLAY = {
     "bancontact": "Bancontact",
 }
 
+class MonthListFilter(admin.SimpleListFilter):
+    """
+    One calendar month (UTC): a ``created_at`` range matching exactly one
+    partition, so the list and "select all" exports only read that month.
+    """
+    title = "month"
+    parameter_name = "month"
+
+    def lookups(self, request, model_admin):
+        now = timezone.now()
+        recent = months(add_months(month_start(now), -12), now)
+        return [(f"{start:%Y-%m}", f"{start:%B %Y}") for start in reversed(list(recent))]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            start, end = month_range(self.value())
+        except ValueError:
+            return queryset.none()
+        return queryset.filter(created_at__gte=start, created_at__lt=end)
+
+
 @admin.register(Donation)
 class DonationAdmin(admin.ModelAdmin):
     list_display = (
@@ -19,10 +44,13 @@ class DonationAdmin(admin.ModelAdmin):
         "currency", "status", "method_display", "card_brand", "funding",
         "country", "payment_intent"
     )
-    list_filter = ("status", "currency", "method", "country", "created_at", "card_brand", "funding")
+    list_filter = ("status", "currency", "method", "country", MonthListFilter, "created_at", "card_brand", "funding")
     search_fields = ("email", "name", "payment_intent")
-    readonly_fields = ("amount_display",)
+    readonly_fields = ("amount_display", "created_at")
     actions = ["export_csv"]
+    # The unfiltered total is a count(*) over every partition; filtered pages
+    # only count what they show
+    show_full_result_count = False
 
     def amount_display(self, obj):
         if obj.amount is None or obj.currency is None:
@@ -77,3 +105,9 @@ class DonationAdmin(admin.ModelAdmin):
 
         return resp
     export_csv.short_description = "Export selected items to CSV"
+
+
+@admin.register(DonationPrice)
+class DonationPriceAdmin(admin.ModelAdmin):
+    list_display = ("unit_amount", "currency", "stripe_price_id", "stripe_product_id", "created_at")
+    readonly_fields = ("created_at",)
@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 class DonationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "donations"
\ No newline at end of file
+    name = "donations"
+
+    def ready(self):
+        # Configured here rather than in views, so management commands
+        # (sync_donation_prices) talk to the same account/stub
+        import stripe
+
+        stripe.api_key = settings.STRIPE_SECRET_KEY
+        if settings.STRIPE_API_BASE:
+            stripe.api_base = settings.STRIPE_API_BASE
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from mysite.scheduler import periodic
+
+from .partitions import ensure_partitions
+from .reconcile import reconcile
+
+
+@periodic("donations.reconcile", every=timedelta(hours=1))
+def reconcile_recent():
+    # Re-reads the last few days, not from a checkpoint: intents created
+    # earlier still succeed or get refunded after their window was synced
+    now = timezone.now()
+    reconcile(now - settings.DONATION_RECONCILE_LOOKBACK, now, workers=2)
+
+
+@periodic("donations.partitions", every=timedelta(days=1))
+def create_donation_partitions():
+    ensure_partitions()
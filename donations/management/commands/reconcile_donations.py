@@ -0,0 +1,55 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from donations.reconcile import reconcile, resume_from
+
+CHECKPOINT = "reconcile_donations"
+
+
+def aware(value):
+    parsed = datetime.datetime.fromisoformat(value)
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed, datetime.timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        "Repair Donation rows from Stripe: upsert every PaymentIntent created in a "
+        "date range (e.g. after missed webhooks). Resumable with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=aware, help="ISO date/datetime (UTC unless given)")
+        parser.add_argument("--until", type=aware, help="Default: now")
+        parser.add_argument("--resume", action="store_true",
+                            help="Start where the last run's checkpoint stopped instead of --since")
+        parser.add_argument("--window-hours", type=int, default=24,
+                            help="Date range slice fetched per Stripe listing")
+        parser.add_argument("--workers", type=int, default=4, help="Windows fetched from Stripe concurrently")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        since = options["since"]
+        if options["resume"]:
+            since = resume_from(CHECKPOINT) or since
+        if since is None:
+            raise CommandError("Pass --since, or --resume after a previous run")
+        until = options["until"] or timezone.now()
+        if since >= until:
+            self.stdout.write(f"Nothing to reconcile: already synced up to {since.isoformat()}")
+            return
+
+        def progress(start, end, count):
+            self.stdout.write(f"{start:%Y-%m-%d %H:%M} .. {end:%Y-%m-%d %H:%M}: {count} donations")
+
+        written = reconcile(
+            since,
+            until,
+            window=datetime.timedelta(hours=options["window_hours"]),
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            checkpoint=CHECKPOINT,
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {written} donations"))
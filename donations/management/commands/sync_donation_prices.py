@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from donations.prices import ensure_price
+
+
+class Command(BaseCommand):
+    help = "Create the Stripe Prices for DONATION_PRESET_AMOUNTS that don't exist yet (run on deploy)"
+
+    def handle(self, *args, **options):
+        currency = settings.DONATION_CURRENCY.lower()
+        for amount in settings.DONATION_PRESET_AMOUNTS:
+            price = ensure_price(currency, int(round(amount * 100)))
+            self.stdout.write(f"{amount} {currency.upper()}: {price.stripe_price_id}")
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0003_donation_card_brand_donation_funding'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='donation',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, help_text='In currency (e.g., 77.00 PLN or 15.50 USD)', max_digits=10),
+        ),
+        migrations.CreateModel(
+            name='DonationPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=10)),
+                ('unit_amount', models.PositiveIntegerField(help_text='In minor units (cents)')),
+                ('stripe_price_id', models.CharField(max_length=255, unique=True)),
+                ('stripe_product_id', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('currency', 'unit_amount'), name='donation_price_currency_amount')],
+            },
+        ),
+    ]
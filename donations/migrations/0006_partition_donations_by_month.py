@@ -0,0 +1,99 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:55
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+from donations.partitions import add_months, create_partition_sql, month_start, months
+
+TABLE = "donations_donation"
+RENAMED = "donations_donation_unpartitioned"
+
+
+def copy_constraints(cursor, connection, constraints, target, primary_key):
+    """
+    Recreates introspected ``constraints`` on ``target`` under the same
+    names: the primary key (on ``primary_key``), unique constraints, indexes.
+    """
+    quote = connection.ops.quote_name
+    for name, info in constraints.items():
+        columns = ", ".join(quote(column) for column in info["columns"])
+        if info["primary_key"]:
+            columns = ", ".join(quote(column) for column in primary_key)
+            cursor.execute(f"ALTER TABLE {target} ADD CONSTRAINT {quote(name)} PRIMARY KEY ({columns})")
+        elif info["unique"]:
+            cursor.execute(f"ALTER TABLE {target} ADD CONSTRAINT {quote(name)} UNIQUE ({columns})")
+        elif info["index"]:
+            cursor.execute(f"CREATE INDEX {quote(name)} ON {target} ({columns})")
+
+
+def partition_table(apps, schema_editor):
+    """
+    Swaps donations_donation for a copy partitioned by month: every month
+    with rows, through DONATION_PARTITIONS_AHEAD months ahead. The primary
+    key becomes (id, created_at), as partitioned tables require. Runs in
+    the migration's transaction, so writers wait for the copy, which takes
+    seconds at donation volumes.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {RENAMED}")
+        cursor.execute(f"CREATE TABLE {TABLE} (LIKE {RENAMED}) PARTITION BY RANGE (created_at)")
+        cursor.execute(f"SELECT min(created_at) FROM {RENAMED}")
+        oldest = cursor.fetchone()[0] or timezone.now()
+        for start in months(oldest, add_months(month_start(timezone.now()), settings.DONATION_PARTITIONS_AHEAD)):
+            cursor.execute(create_partition_sql(start))
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {RENAMED}")
+
+        # The identity sequence goes with the old table; ids continue from a new one
+        cursor.execute(f"CREATE SEQUENCE {TABLE}_id_new_seq OWNED BY {TABLE}.id")
+        cursor.execute(f"SELECT setval('{TABLE}_id_new_seq', COALESCE((SELECT max(id) FROM {TABLE}), 0) + 1, false)")
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_new_seq')")
+
+        constraints = connection.introspection.get_constraints(cursor, RENAMED)
+        cursor.execute(f"DROP TABLE {RENAMED}")
+        cursor.execute(f"ALTER SEQUENCE {TABLE}_id_new_seq RENAME TO {TABLE}_id_seq")
+        copy_constraints(cursor, connection, constraints, TABLE, ["id", "created_at"])
+
+
+def unpartition_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {RENAMED}")
+        cursor.execute(f"CREATE TABLE {TABLE} (LIKE {RENAMED} INCLUDING DEFAULTS)")
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {RENAMED}")
+        cursor.execute(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+        constraints = connection.introspection.get_constraints(cursor, RENAMED)
+        # Drops the partitions too
+        cursor.execute(f"DROP TABLE {RENAMED}")
+        copy_constraints(cursor, connection, constraints, TABLE, ["id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0005_reconcilecheckpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='donation',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='donation',
+            name='payment_intent',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='donation',
+            constraint=models.UniqueConstraint(fields=('payment_intent', 'created_at'), name='donation_intent_created'),
+        ),
+        migrations.RunPython(partition_table, unpartition_table),
+    ]
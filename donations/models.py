@@ -1,13 +1,23 @@
 from django.db import models
+from django.utils import timezone
 
 class Donation(models.Model):
+    """
+    On PostgreSQL the table is partitioned by month on ``created_at``
+    (donations.partitions), so the database's primary key is (id,
+    created_at) and a PaymentIntent is unique together with its
+    ``created_at``. Writers keep that stable and serialize per intent: see
+    upsert_donations and lock_intents.
+    """
     STATUS_CHOICES = [
         ("pending", "Pending"),
         ("succeeded", "Succeeded"),
         ("failed", "Failed"),
         ("refunded", "Refunded"),
     ]
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set by the writer from Stripe's creation time, not auto_now_add,
+    # so every path records the same partition key for a PaymentIntent
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
     name = models.CharField(max_length=200, blank=True)
     email = models.EmailField(blank=True)
     amount = models.DecimalField(
@@ -17,7 +27,7 @@ class Donation(models.Model):
     )
 
     currency = models.CharField(max_length=10, default="pln")
-    payment_intent = models.CharField(max_length=255, unique=True)
+    payment_intent = models.CharField(max_length=255)
     method = models.CharField(max_length=50, blank=True)
     country = models.CharField(max_length=2, blank=True)
     card_brand = models.CharField(max_length=20, blank=True, default="")
@@ -25,5 +35,41 @@ class Donation(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     raw = models.JSONField(default=dict, blank=True)
 
+    class Meta:
+        constraints = [
+            # Leads with payment_intent, so it also serves lookups by intent
+            models.UniqueConstraint(fields=["payment_intent", "created_at"], name="donation_intent_created"),
+        ]
+
     def __str__(self):
         return f"{self.email or self.name} — {self.amount:.2f} {self.currency.upper()} — {self.status}"
+
+
+class DonationPrice(models.Model):
+    """
+    Stripe Price for a preset donation amount, created once and reused by
+    every checkout for that amount (see donations.prices).
+    """
+    currency = models.CharField(max_length=10)
+    unit_amount = models.PositiveIntegerField(help_text="In minor units (cents)")
+    stripe_price_id = models.CharField(max_length=255, unique=True)
+    stripe_product_id = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["currency", "unit_amount"], name="donation_price_currency_amount"),
+        ]
+
+    def __str__(self):
+        return f"{self.unit_amount / 100:.2f} {self.currency.upper()} — {self.stripe_price_id}"
+
+
+class ReconcileCheckpoint(models.Model):
+    """How far ``reconcile_donations`` got: PaymentIntents created before ``position`` are synced."""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position:%Y-%m-%d %H:%M}"
@@ -0,0 +1,104 @@
+"""
+Monthly range partitions of ``donations_donation`` on ``created_at``
+(PostgreSQL only; migration 0006 converts the table).
+
+Partitions are named ``donations_donation_pYYYY_MM`` and cover a UTC
+calendar month. There is no default partition: the "donations.partitions"
+job keeps DONATION_PARTITIONS_AHEAD months ready, and reconcile creates the
+months it backfills, so a row never lands somewhere a later partition
+would have to be carved out of.
+"""
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger("app.donations")
+
+TABLE = "donations_donation"
+
+
+def month_start(value):
+    """The first instant (UTC) of the month ``value`` falls in."""
+    value = value.astimezone(dt_timezone.utc) if timezone.is_aware(value) else value.replace(tzinfo=dt_timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(start):
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def add_months(start, count):
+    """The month start ``count`` months after (or, if negative, before) the month start ``start``."""
+    index = start.year * 12 + start.month - 1 + count
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def months(since, until):
+    """Month starts from ``since``'s month through ``until``'s, inclusive."""
+    start, last = month_start(since), month_start(until)
+    while start <= last:
+        yield start
+        start = next_month(start)
+
+
+def month_range(value):
+    """``"2026-03"`` -> (2026-03-01, 2026-04-01) in UTC; ValueError if malformed."""
+    start = datetime.strptime(value, "%Y-%m").replace(tzinfo=dt_timezone.utc)
+    return start, next_month(start)
+
+
+def partition_name(start, table=TABLE):
+    return f"{table}_p{start:%Y_%m}"
+
+
+def create_partition_sql(start, table=TABLE):
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start, table)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{next_month(start).isoformat()}')"
+    )
+
+
+def is_partitioned(using=connection, table=TABLE):
+    if using.vendor != "postgresql":
+        return False
+    with using.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def existing_partitions(using=connection, table=TABLE):
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits"
+            " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+            " WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [table],
+        )
+        return {name for (name,) in cursor.fetchall()}
+
+
+def ensure_partitions(since=None, until=None, using=connection):
+    """
+    Creates the monthly partitions covering [since, until] (default: this
+    month through DONATION_PARTITIONS_AHEAD months ahead) that don't exist
+    yet. Returns the names created; a no-op unless the table is partitioned.
+    """
+    if not is_partitioned(using):
+        return []
+    now = timezone.now()
+    since = since or now
+    until = until or add_months(month_start(now), settings.DONATION_PARTITIONS_AHEAD)
+    existing = existing_partitions(using)
+    created = []
+    with using.cursor() as cursor:
+        for start in months(since, until):
+            if partition_name(start) not in existing:
+                cursor.execute(create_partition_sql(start))
+                created.append(partition_name(start))
+    if created:
+        logger.info("Donation partitions created", extra={"partitions": created})
+    return created
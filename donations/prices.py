@@ -0,0 +1,78 @@
+import logging
+from decimal import Decimal
+
+import stripe
+from django.conf import settings
+from django.core.cache import cache
+
+from mysite.metrics import observe_stripe
+
+from .models import DonationPrice
+
+logger = logging.getLogger("app.donations")
+
+PRICE_KEY = "donations:price:{currency}:{unit_amount}"
+PRODUCT_NAME = "Donation"
+
+
+def preset_amounts():
+    return {Decimal(str(amount)) for amount in settings.DONATION_PRESET_AMOUNTS}
+
+
+def preset_price_id(amount, currency):
+    """
+    Stripe Price ID for a preset ``amount`` (DONATION_PRESET_AMOUNTS), or
+    None for a custom amount, which the caller prices inline.
+
+    Looked up in the cache, then the DonationPrice table; the Price is only
+    created in Stripe the first time an amount is donated (or by
+    ``sync_donation_prices``). If that fails, the checkout goes inline
+    rather than erroring.
+    """
+    if amount not in preset_amounts():
+        return None
+    currency = currency.lower()
+    unit_amount = int(amount * 100)
+    key = PRICE_KEY.format(currency=currency, unit_amount=unit_amount)
+    price_id = cache.get(key)
+    if price_id:
+        return price_id
+
+    price_id = (
+        DonationPrice.objects.filter(currency=currency, unit_amount=unit_amount)
+        .values_list("stripe_price_id", flat=True)
+        .first()
+    )
+    if price_id is None:
+        try:
+            price_id = ensure_price(currency, unit_amount).stripe_price_id
+        except Exception:
+            logger.warning("Unable to create Stripe price", exc_info=True,
+                           extra={"currency": currency, "unit_amount": unit_amount})
+            return None
+    cache.set(key, price_id, settings.DONATION_PRICE_CACHE_TTL)
+    return price_id
+
+
+def ensure_price(currency, unit_amount):
+    """The DonationPrice for an amount in minor units, creating it in Stripe if missing."""
+    existing = DonationPrice.objects.filter(currency=currency, unit_amount=unit_amount).first()
+    if existing is not None:
+        return existing
+    with observe_stripe("Price.create"):
+        price = stripe.Price.create(
+            currency=currency,
+            unit_amount=unit_amount,
+            product_data={"name": PRODUCT_NAME},
+            metadata={"preset": "true"},
+            # Concurrent first checkouts for the same amount get one Price
+            idempotency_key=f"donation-price-{currency}-{unit_amount}",
+        )
+    obj, created = DonationPrice.objects.get_or_create(
+        currency=currency,
+        unit_amount=unit_amount,
+        defaults={"stripe_price_id": price.id, "stripe_product_id": getattr(price, "product", None) or ""},
+    )
+    if created:
+        logger.info("Stripe price created", extra={"price": price.id, "currency": currency, "unit_amount": unit_amount})
+    return obj
@@ -0,0 +1,208 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import stripe
+from django.conf import settings
+from django.db import connection, transaction
+
+from mysite.metrics import observe_stripe
+
+from .models import Donation, ReconcileCheckpoint
+from .partitions import ensure_partitions
+
+logger = logging.getLogger("app.donations")
+
+# Everything a Stripe PaymentIntent (+ its charge) knows about a donation
+RECONCILED_FIELDS = [
+    "name", "email", "amount", "currency", "status",
+    "method", "country", "card_brand", "funding", "raw",
+]
+
+
+def as_dict(stripe_object):
+    """
+    StripeObject -> plain dict. Newer stripe-python objects no longer subclass
+    dict, so .get() on them raises.
+    """
+    if hasattr(stripe_object, "to_dict"):
+        return stripe_object.to_dict()
+    return dict(stripe_object)
+
+
+# First key of pg_advisory_xact_lock(int, int) for PaymentIntent locks; the
+# two-key form never collides with the scheduler's single-key locks
+INTENT_LOCK_NAMESPACE = 1701
+
+
+def lock_intents(payment_intents):
+    """
+    Makes other writers of the same PaymentIntents wait until the current
+    transaction ends (call it inside ``transaction.atomic``).
+
+    ``created_at`` is the partition key, so the database can only enforce
+    (payment_intent, created_at) as unique: this lock is what stops the
+    webhook, checkout and reconcile from each inserting a row for one
+    intent. Keys are taken in sorted order, so multi-intent writers can't
+    deadlock. PostgreSQL only; elsewhere a no-op.
+    """
+    if connection.vendor != "postgresql" or not payment_intents:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(%s, key) FROM ("
+            " SELECT DISTINCT hashtext(intent) AS key FROM unnest(%s::text[]) AS intent ORDER BY key"
+            ") AS keys",
+            [INTENT_LOCK_NAMESPACE, list(payment_intents)],
+        )
+
+
+def upsert_donations(donations, update_fields=RECONCILED_FIELDS, batch_size=None):
+    """
+    ``INSERT ... ON CONFLICT (payment_intent, created_at) DO UPDATE SET
+    <update_fields>``: one statement per batch whether the rows exist or
+    not, instead of a SELECT plus INSERT/UPDATE per donation.
+
+    Rows that already exist keep their ``created_at`` (looked up in one
+    query, under ``lock_intents``), so the conflict finds them whatever
+    the caller passed.
+    """
+    with transaction.atomic():
+        lock_intents({d.payment_intent for d in donations})
+        existing = dict(
+            Donation.objects.filter(payment_intent__in=[d.payment_intent for d in donations])
+            .values_list("payment_intent", "created_at")
+        )
+        for donation in donations:
+            donation.created_at = existing.get(donation.payment_intent, donation.created_at)
+        return Donation.objects.bulk_create(
+            donations,
+            update_conflicts=True,
+            unique_fields=["payment_intent", "created_at"],
+            update_fields=update_fields,
+            batch_size=batch_size,
+        )
+
+
+def donation_status(pi, charge):
+    if charge.get("refunded"):
+        return "refunded"
+    if pi.get("status") == "succeeded":
+        return "succeeded"
+    if pi.get("status") == "canceled" or pi.get("last_payment_error"):
+        return "failed"
+    return "pending"
+
+
+def stripe_created(stripe_dict):
+    """
+    A Stripe object's ``created`` timestamp as an aware datetime. Every
+    writer derives ``created_at`` from it, never from the clock, so they
+    agree on the partition key.
+    """
+    return datetime.fromtimestamp(stripe_dict["created"], tz=dt_timezone.utc)
+
+
+def donation_from_stripe(pi, charge=None):
+    """An unsaved Donation mirroring a PaymentIntent dict and its latest charge."""
+    charge = charge or {}
+    details = charge.get("payment_method_details") or {}
+    method = details.get("type") or ""
+    card = (details.get("card") or {}) if method == "card" else {}
+    address = (charge.get("billing_details") or {}).get("address") or {}
+    return Donation(
+        payment_intent=pi["id"],
+        created_at=stripe_created(pi),
+        name=(pi.get("metadata") or {}).get("donor_name", ""),
+        email=pi.get("receipt_email") or pi.get("customer_email") or "",
+        amount=Decimal(pi.get("amount") or 0) / 100,
+        currency=(pi.get("currency") or settings.DONATION_CURRENCY).lower(),
+        status=donation_status(pi, charge),
+        method=method,
+        country=address.get("country") or "",
+        card_brand=card.get("brand") or "",
+        funding=card.get("funding") or "",
+        raw=pi,
+    )
+
+
+def windows(since, until, size):
+    start = since
+    while start < until:
+        end = min(start + size, until)
+        yield start, end
+        start = end
+
+
+def fetch_window(start, end):
+    """
+    Donations for the PaymentIntents created in [start, end), both lists
+    auto-paginated. Charges are listed for the same range so most intents
+    find theirs without a retrieve; the few whose charge falls in a later
+    window are fetched one by one.
+    """
+    created = {"gte": int(start.timestamp()), "lt": int(end.timestamp())}
+    with observe_stripe("PaymentIntent.list"):
+        intents = [as_dict(pi) for pi in stripe.PaymentIntent.list(created=created, limit=100).auto_paging_iter()]
+    with observe_stripe("Charge.list"):
+        charges = {ch.id: as_dict(ch) for ch in stripe.Charge.list(created=created, limit=100).auto_paging_iter()}
+
+    donations = {}
+    for pi in intents:
+        charge_id = pi.get("latest_charge")
+        if isinstance(charge_id, dict):
+            charge_id = charge_id.get("id")
+        charge = charges.get(charge_id)
+        if charge_id and charge is None:
+            with observe_stripe("Charge.retrieve"):
+                charge = as_dict(stripe.Charge.retrieve(charge_id))
+        donations[pi["id"]] = donation_from_stripe(pi, charge)
+    return list(donations.values())
+
+
+def reconcile(since, until, *, window=timedelta(days=1), workers=4, batch_size=500,
+              checkpoint=None, progress=None):
+    """
+    Mirrors every PaymentIntent created in [since, until) into Donation.
+
+    Windows are fetched from Stripe by ``workers`` threads; rows are upserted
+    on this thread as windows complete. With a ``checkpoint`` name, the end
+    of the longest run of finished windows is saved after each one, so a
+    rerun with ``resume_from(checkpoint)`` skips what is already done.
+    Returns the number of donations written.
+    """
+    spans = list(windows(since, until, window))
+    # Backfills can reach months older than the table's first partition
+    ensure_partitions(since, until)
+    done = set()
+    next_span = 0
+    written = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reconcile") as pool:
+        futures = {pool.submit(fetch_window, *span): index for index, span in enumerate(spans)}
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                donations = future.result()
+                upsert_donations(donations, batch_size=batch_size)
+                written += len(donations)
+                done.add(index)
+                if progress:
+                    progress(*spans[index], len(donations))
+                finished = next_span
+                while next_span in done:
+                    next_span += 1
+                if checkpoint and next_span > finished:
+                    ReconcileCheckpoint.objects.update_or_create(
+                        name=checkpoint, defaults={"position": spans[next_span - 1][1]}
+                    )
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    logger.info("Donations reconciled", extra={"since": since.isoformat(), "until": until.isoformat(), "donations": written})
+    return written
+
+
+def resume_from(checkpoint):
+    return ReconcileCheckpoint.objects.filter(name=checkpoint).values_list("position", flat=True).first()
@@ -1,3 +1,312 @@
-from django.test import TestCase
+import datetime
+import json
+import threading
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import stripe
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from mysite import ratelimit
+
+from .admin import MonthListFilter
+from .models import Donation, DonationPrice, ReconcileCheckpoint
+from .partitions import add_months, create_partition_sql, ensure_partitions, month_range, months, partition_name
+from .prices import preset_price_id
+from .reconcile import donation_from_stripe, lock_intents, reconcile, resume_from, upsert_donations
+
+
+def stripe_object(cls, **values):
+    return cls.construct_from(values, "sk_test")
+
+
+@override_settings(DONATION_PRESET_AMOUNTS=[10, 20], DONATION_CURRENCY="usd")
+class PriceCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(stripe.Price, "create", side_effect=self._create_price)
+        self.price_create = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create_price(self, **params):
+        return stripe_object(stripe.Price, id=f"price_{params['unit_amount']}", product="prod_donation")
+
+    def checkout(self, amount):
+        session = stripe_object(stripe.checkout.Session, id="cs_test_1", payment_intent=f"pi_{amount}",
+                                created=1772323200)
+        with mock.patch.object(stripe.checkout.Session, "create", return_value=session) as create:
+            response = self.client.post(
+                reverse("create_checkout_session"),
+                json.dumps({"amount": amount, "name": "Ann", "email": "ann@example.com"}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+        return create.call_args.kwargs["line_items"][0]
+
+    def test_preset_amount_uses_one_catalog_price(self):
+        self.assertEqual(self.checkout("10"), {"price": "price_1000", "quantity": 1})
+        self.assertEqual(self.checkout("10.00"), {"price": "price_1000", "quantity": 1})
+        self.price_create.assert_called_once()
+        self.assertEqual(self.price_create.call_args.kwargs["idempotency_key"], "donation-price-usd-1000")
+        price = DonationPrice.objects.get()
+        self.assertEqual((price.currency, price.unit_amount, price.stripe_product_id), ("usd", 1000, "prod_donation"))
+        self.assertTrue(Donation.objects.filter(payment_intent="pi_10", status="pending").exists())
+
+    def test_custom_amount_is_priced_inline(self):
+        line_item = self.checkout("15.50")
+        self.assertEqual(line_item["price_data"]["unit_amount"], 1550)
+        self.assertEqual(line_item["price_data"]["currency"], "usd")
+        self.price_create.assert_not_called()
+
+    def test_cached_price_needs_no_query(self):
+        preset_price_id(Decimal("20"), "usd")
+        with self.assertNumQueries(0):
+            self.assertEqual(preset_price_id(Decimal("20"), "usd"), "price_2000")
+
+    def test_stored_price_survives_cache_loss(self):
+        DonationPrice.objects.create(currency="usd", unit_amount=2000, stripe_price_id="price_existing")
+        self.assertEqual(preset_price_id(Decimal("20"), "usd"), "price_existing")
+        self.price_create.assert_not_called()
+
+    @override_settings(RATE_LIMITS={"checkout": "1/h"})
+    @mock.patch.object(ratelimit, "_local", ratelimit.LocalBuckets())
+    def test_rate_limited_before_stripe(self):
+        self.checkout("15")
+        with mock.patch.object(stripe.checkout.Session, "create") as create, self.assertNumQueries(0):
+            response = self.client.post(reverse("create_checkout_session"), json.dumps({"amount": "15"}),
+                                        content_type="application/json", REMOTE_ADDR="127.0.0.1")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json(), {"error": "Too many requests"})
+        create.assert_not_called()
+
+    def test_stripe_failure_falls_back_to_inline(self):
+        self.price_create.side_effect = stripe.APIConnectionError("down")
+        with self.assertLogs("app.donations", "WARNING"):
+            line_item = self.checkout("20")
+        self.assertIn("price_data", line_item)
+        self.assertFalse(DonationPrice.objects.exists())
+
+
+DAY = datetime.timedelta(days=1)
+SINCE = datetime.datetime(2026, 3, 1, tzinfo=datetime.timezone.utc)
+
+
+def ts(days):
+    return int((SINCE + days * DAY).timestamp()) + 60
+
+
+class FakeStripeLists:
+    """PaymentIntent/Charge ``list`` honouring ``created`` like the API does."""
+
+    def __init__(self, intents, charges):
+        self.intents, self.charges = intents, charges
+        self.fail_at = None
+
+    def lister(self, objects, kind):
+        def list_(created, limit):
+            if self.fail_at is not None and created["gte"] <= self.fail_at < created["lt"]:
+                raise stripe.APIConnectionError("down")
+            data = [dict(o, object=kind) for o in objects if created["gte"] <= o["created"] < created["lt"]]
+            return stripe.ListObject.construct_from({"object": "list", "data": data, "has_more": False}, "sk_test")
+        return list_
+
+    def patch(self, test):
+        charges_by_id = {c["id"]: c for c in self.charges}
+        for target, attribute, fake in (
+            (stripe.PaymentIntent, "list", self.lister(self.intents, "payment_intent")),
+            (stripe.Charge, "list", self.lister(self.charges, "charge")),
+            (stripe.Charge, "retrieve", lambda charge_id: stripe_object(stripe.Charge, **charges_by_id[charge_id])),
+        ):
+            patcher = mock.patch.object(target, attribute, side_effect=fake)
+            test.addCleanup(patcher.stop)
+            setattr(self, f"{target.__name__}_{attribute}", patcher.start())
+
+
+class ReconcileTests(TestCase):
+    def setUp(self):
+        card = {"type": "card", "card": {"brand": "visa", "funding": "debit"}}
+        self.stripe = FakeStripeLists(
+            intents=[
+                {"id": "pi_a", "created": ts(0), "amount": 1000, "currency": "usd", "status": "succeeded",
+                 "receipt_email": "a@example.com", "metadata": {"donor_name": "A"}, "latest_charge": "ch_a"},
+                {"id": "pi_b", "created": ts(1), "amount": 2550, "currency": "usd", "status": "succeeded",
+                 "receipt_email": None, "metadata": {}, "latest_charge": "ch_b"},
+                {"id": "pi_c", "created": ts(2), "amount": 500, "currency": "usd", "status": "canceled",
+                 "metadata": {}, "latest_charge": None},
+            ],
+            charges=[
+                {"id": "ch_a", "created": ts(0), "payment_intent": "pi_a", "refunded": False,
+                 "payment_method_details": card, "billing_details": {"address": {"country": "PL"}}},
+                # charged the day after the intent: found by retrieve, not the listing
+                {"id": "ch_b", "created": ts(2), "payment_intent": "pi_b", "refunded": True,
+                 "payment_method_details": {"type": "blik"}, "billing_details": {"address": {"country": "PL"}}},
+            ],
+        )
+        self.stripe.patch(self)
+        Donation.objects.create(payment_intent="pi_a", name="A", amount=Decimal("10"), status="pending")
+
+    def test_upserts_every_intent_in_range(self):
+        written = reconcile(SINCE, SINCE + 3 * DAY, workers=2, checkpoint="test")
+        self.assertEqual(written, 3)
+        rows = {d.payment_intent: d for d in Donation.objects.all()}
+        self.assertEqual(len(rows), 3)
+        a, b, c = rows["pi_a"], rows["pi_b"], rows["pi_c"]
+        self.assertEqual((a.status, a.email, a.method, a.card_brand, a.funding, a.country),
+                         ("succeeded", "a@example.com", "card", "visa", "debit", "PL"))
+        self.assertEqual((b.status, b.amount, b.method), ("refunded", Decimal("25.50"), "blik"))
+        self.assertEqual(c.status, "failed")
+        # New rows are keyed by the intent's creation time; existing ones keep theirs
+        self.assertEqual(b.created_at, SINCE + DAY + datetime.timedelta(seconds=60))
+        self.assertGreater(a.created_at, SINCE + 3 * DAY)
+        self.stripe.Charge_retrieve.assert_called_once_with("ch_b")
+        self.assertEqual(resume_from("test"), SINCE + 3 * DAY)
+
+    def test_one_upsert_per_window(self):
+        with mock.patch("donations.reconcile.upsert_donations") as upsert:
+            reconcile(SINCE, SINCE + 3 * DAY, workers=2)
+        self.assertEqual(upsert.call_count, 3)
+        self.assertEqual(sorted(len(c.args[0]) for c in upsert.call_args_list), [1, 1, 1])
+
+    def test_checkpoint_stops_before_failed_window(self):
+        self.stripe.fail_at = ts(1)
+        with self.assertRaises(stripe.APIConnectionError):
+            reconcile(SINCE, SINCE + 3 * DAY, workers=1, checkpoint="reconcile_donations")
+        self.assertEqual(resume_from("reconcile_donations"), SINCE + DAY)
+
+        self.stripe.fail_at = None
+        self.stripe.PaymentIntent_list.reset_mock()
+        call_command("reconcile_donations", "--resume", "--until", (SINCE + 3 * DAY).isoformat(), stdout=mock.Mock())
+        fetched = sorted(c.kwargs["created"]["gte"] for c in self.stripe.PaymentIntent_list.call_args_list)
+        self.assertEqual(fetched, [int((SINCE + DAY).timestamp()), int((SINCE + 2 * DAY).timestamp())])
+        self.assertEqual(Donation.objects.count(), 3)
+        self.assertEqual(ReconcileCheckpoint.objects.get().position, SINCE + 3 * DAY)
+
+
+def deliver_succeeded(client, pi):
+    """Posts a payment_intent.succeeded webhook for ``pi`` (a dict), Stripe calls stubbed."""
+    event = {"type": "payment_intent.succeeded", "data": {"object": {"id": pi["id"]}}}
+    with mock.patch.object(stripe.Webhook, "construct_event", return_value=event), \
+            mock.patch.object(stripe.PaymentIntent, "retrieve",
+                              return_value=stripe_object(stripe.PaymentIntent, **pi)), \
+            mock.patch.object(stripe.Charge, "retrieve", side_effect=stripe.InvalidRequestError("none", None)), \
+            mock.patch("donations.views._send_donation_receipt"):
+        return client.post("/stripe/webhook/", "{}", content_type="application/json", HTTP_STRIPE_SIGNATURE="t=1")
+
+
+class IntentWritersTests(TestCase):
+    """The webhook and reconcile write the same intent: one row, keyed by Stripe's ``created``."""
+
+    def setUp(self):
+        self.pi = {"id": "pi_both", "created": ts(1), "amount": 2000, "currency": "usd",
+                   "status": "succeeded", "metadata": {"donor_name": "Both"}, "latest_charge": None}
+        self.stripe = FakeStripeLists(intents=[self.pi], charges=[])
+        self.stripe.patch(self)
+
+    def assert_one_row(self):
+        donation = Donation.objects.get(payment_intent="pi_both")
+        self.assertEqual((donation.created_at, donation.status, donation.amount),
+                         (SINCE + DAY + datetime.timedelta(seconds=60), "succeeded", Decimal("20")))
+
+    def test_webhook_then_reconcile(self):
+        with self.assertLogs("app.donations", "WARNING"):  # no charge to retrieve
+            self.assertEqual(deliver_succeeded(self.client, self.pi).status_code, 200)
+        reconcile(SINCE, SINCE + 3 * DAY, workers=1)
+        self.assert_one_row()
+
+    def test_reconcile_then_webhook(self):
+        reconcile(SINCE, SINCE + 3 * DAY, workers=1)
+        with self.assertLogs("app.donations", "WARNING"):
+            self.assertEqual(deliver_succeeded(self.client, self.pi).status_code, 200)
+            self.assertEqual(deliver_succeeded(self.client, self.pi).status_code, 200)
+        self.assert_one_row()
+
+    def test_both_paths_lock_the_intent(self):
+        with mock.patch("donations.views.lock_intents") as webhook_lock, \
+                mock.patch("donations.reconcile.lock_intents") as reconcile_lock, \
+                self.assertLogs("app.donations", "WARNING"):
+            deliver_succeeded(self.client, self.pi)
+            reconcile(SINCE, SINCE + 3 * DAY, workers=1)
+        webhook_lock.assert_called_once_with(["pi_both"])
+        self.assertIn(mock.call({"pi_both"}), reconcile_lock.call_args_list)
+
+
+@skipUnless(connection.vendor == "postgresql", "advisory locks are PostgreSQL only")
+class IntentLockTests(TransactionTestCase):
+    def test_webhook_waits_for_a_concurrent_writer(self):
+        ensure_partitions(SINCE, SINCE + DAY)
+        pi = {"id": "pi_race", "created": ts(0), "amount": 1000, "currency": "usd",
+              "status": "succeeded", "metadata": {}, "latest_charge": None}
+        responses = []
+
+        def deliver():
+            try:
+                responses.append(deliver_succeeded(Client(), pi))
+            finally:
+                connection.close()
+
+        with transaction.atomic():
+            lock_intents(["pi_race"])
+            webhook = threading.Thread(target=deliver)
+            webhook.start()
+            webhook.join(0.5)
+            self.assertTrue(webhook.is_alive())  # waiting on the lock
+            # A writer that picked another created_at
+            Donation.objects.create(payment_intent="pi_race", amount=Decimal("10"), created_at=SINCE + DAY)
+        webhook.join(10)
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(list(Donation.objects.filter(payment_intent="pi_race").values_list("status", flat=True)),
+                         ["succeeded"])
+
+
+class PartitionTests(TestCase):
+    def setUp(self):
+        # Creates the months on PostgreSQL; a no-op on an unpartitioned table
+        ensure_partitions(SINCE - 31 * DAY, SINCE + 31 * DAY)
+        for intent, day in (("pi_feb", -1), ("pi_mar", 0), ("pi_mar_end", 30), ("pi_apr", 31)):
+            Donation.objects.create(payment_intent=intent, amount=Decimal("5"), created_at=SINCE + day * DAY)
+        self.staff = User.objects.create_superuser("staff", "staff@example.com", "pw")
+
+    def test_months(self):
+        december = datetime.datetime(2025, 12, 31, 23, 59, tzinfo=datetime.timezone.utc)
+        self.assertEqual([f"{m:%Y-%m}" for m in months(december, SINCE)], ["2025-12", "2026-01", "2026-02", "2026-03"])
+        self.assertEqual(month_range("2025-12"), (datetime.datetime(2025, 12, 1, tzinfo=datetime.timezone.utc),
+                                                  datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)))
+        self.assertEqual(partition_name(SINCE), "donations_donation_p2026_03")
+        self.assertEqual(
+            create_partition_sql(SINCE),
+            "CREATE TABLE IF NOT EXISTS donations_donation_p2026_03 PARTITION OF donations_donation "
+            "FOR VALUES FROM ('2026-03-01T00:00:00+00:00') TO ('2026-04-01T00:00:00+00:00')",
+        )
+
+    def test_upsert_keeps_the_partition_key(self):
+        pi = {"id": "pi_mar", "created": ts(3), "amount": 500, "status": "succeeded", "metadata": {}}
+        upsert_donations([donation_from_stripe(pi)])
+        donation = Donation.objects.get(payment_intent="pi_mar")
+        self.assertEqual((donation.created_at, donation.status), (SINCE, "succeeded"))
+
+    def test_export_filters_by_date(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("export_all_csv"), {"since": "2026-03-01", "until": "2026-04-01"})
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual([line.split(",")[6] for line in body.splitlines()[1:]], ["pi_mar_end", "pi_mar"])
+        self.assertEqual(self.client.get(reverse("export_all_csv"), {"since": "March"}).status_code, 400)
+
+    def test_admin_month_filter(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("admin:donations_donation_changelist"), {"month": "2026-03"})
+        self.assertEqual(
+            sorted(d.payment_intent for d in response.context["cl"].result_list), ["pi_mar", "pi_mar_end"]
+        )
+
+    def test_admin_month_filter_on_leap_day(self):
+        leap_day = datetime.datetime(2028, 2, 29, 12, tzinfo=datetime.timezone.utc)
+        with mock.patch("donations.admin.timezone.now", return_value=leap_day):
+            choices = MonthListFilter.lookups(None, None, None)
+        self.assertEqual([value for value, _ in choices[:2]], ["2028-02", "2028-01"])
+        self.assertEqual((len(choices), choices[-1][0]), (13, "2027-02"))
+        self.assertEqual(add_months(SINCE, -14), datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc))
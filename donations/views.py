@@ -2,6 +2,8 @@
 import json
 import logging
 import csv
+import datetime
+import time
 import stripe
 from decimal import Decimal
 
@@ -9,6 +11,8 @@ from django.conf import settings
 from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import render
+from django.db import transaction
+from django.utils.dateparse import parse_date
 
 # i18n
 from django.utils.translation import override, gettext as _, get_language
@@ -17,9 +21,21 @@ from django.utils.translation import override, gettext as _, get_language
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 
+from mysite.db.routers import use_primary
+from mysite.metrics import (
+    CHECKOUT_SESSION_SECONDS,
+    RECEIPT_EMAIL_FAILURES,
+    RECEIPT_EMAIL_SECONDS,
+    WEBHOOK_PROCESSING_SECONDS,
+    observe_stripe,
+    record_donation,
+)
+from mysite.ratelimit import rate_limit
+
 from .models import Donation
+from .prices import preset_price_id
+from .reconcile import as_dict, lock_intents, stripe_created, upsert_donations
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 logger = logging.getLogger("app.donations")
 
 
@@ -82,6 +98,7 @@ def _send_donation_receipt(
         except Exception:
             pass
 
+        started = time.perf_counter()
         try:
             msg = EmailMultiAlternatives(
                 subject=subject,
@@ -92,9 +109,15 @@ def _send_donation_receipt(
                 bcc=getattr(settings, "DONATIONS_BCC", []),
             )
             msg.attach_alternative(html_body, "text/html")
-            msg.send(fail_silently=True)
+            sent = msg.send(fail_silently=True)
+            RECEIPT_EMAIL_SECONDS.observe(time.perf_counter() - started)
+            if not sent:
+                RECEIPT_EMAIL_FAILURES.inc()
+                logger.warning("Receipt email not sent", extra={"email": email, "intent": transaction_id})
+                return
             logger.info("Receipt email sent", extra={"email": email, "intent": transaction_id, "locale": active_locale})
         except Exception:
+            RECEIPT_EMAIL_FAILURES.inc()
             logger.warning("Error sending receipt email", exc_info=True)
 
 
@@ -105,7 +128,8 @@ def success(request):
     ctx = {}
     if sid:
         try:
-            session = stripe.checkout.Session.retrieve(sid, expand=["payment_intent"])
+            with observe_stripe("checkout.Session.retrieve"):
+                session = stripe.checkout.Session.retrieve(sid, expand=["payment_intent"])
             ctx = {
                 "amount": Decimal(session.payment_intent.amount) / 100,
                 "currency": session.payment_intent.currency.upper(),
@@ -122,6 +146,7 @@ def cancel(request):
     return render(request, "donations/cancel.html")
 
 
+@rate_limit("checkout", "10/m")
 @csrf_exempt
 def create_checkout_session(request):
     if request.method != "POST":
@@ -159,37 +184,54 @@ def create_checkout_session(request):
     stripe_locale = donor_locale if donor_locale in stripe_supported else "auto"
 
     try:
-        session = stripe.checkout.Session.create(
-            mode="payment",
-            customer_creation="if_required",
-            customer_email=donor_email or None,
-            payment_method_types=["card", "link", "blik", "p24"],
-            line_items=[{
+        started = time.perf_counter()
+        # Preset amounts reuse a catalog Price; custom ones make Stripe
+        # create a throwaway Product/Price with the session
+        price_id = preset_price_id(amount_decimal, currency)
+        if price_id:
+            pricing = "catalog"
+            line_item = {"price": price_id, "quantity": 1}
+        else:
+            pricing = "inline"
+            line_item = {
                 "price_data": {
                     "currency": currency,
                     "product_data": {"name": "Donation"},
                     "unit_amount": amount_minor,
                 },
                 "quantity": 1,
-            }],
-            payment_intent_data={
-                "receipt_email": donor_email or None,
-                "metadata": {
-                    "donor_name": donor_name,
-                    "chosen_amount": str(amount_decimal),
-                    "donor_locale": donor_locale,  # <<< сохраняем язык в PI
-                }
-            },
-            locale=stripe_locale,  # <<< локаль интерфейса Checkout
-            success_url=request.build_absolute_uri("/success/") + "?session_id={CHECKOUT_SESSION_ID}",
-            cancel_url=request.build_absolute_uri("/cancel/"),
-        )
+            }
+        with observe_stripe("checkout.Session.create"):
+            session = stripe.checkout.Session.create(
+                mode="payment",
+                customer_creation="if_required",
+                customer_email=donor_email or None,
+                payment_method_types=["card", "link", "blik", "p24"],
+                line_items=[line_item],
+                payment_intent_data={
+                    "receipt_email": donor_email or None,
+                    "metadata": {
+                        "donor_name": donor_name,
+                        "chosen_amount": str(amount_decimal),
+                        "donor_locale": donor_locale,  # <<< сохраняем язык в PI
+                    }
+                },
+                locale=stripe_locale,  # <<< локаль интерфейса Checkout
+                success_url=request.build_absolute_uri("/success/") + "?session_id={CHECKOUT_SESSION_ID}",
+                cancel_url=request.build_absolute_uri("/cancel/"),
+            )
+        CHECKOUT_SESSION_SECONDS.labels(pricing=pricing).observe(time.perf_counter() - started)
 
-        pi_id = session.get("payment_intent")
+        session_dict = as_dict(session)
+        pi_id = session_dict.get("payment_intent")
         if pi_id:
-            obj, created = Donation.objects.get_or_create(
-                payment_intent=pi_id,
-                defaults=dict(
+            # A new PaymentIntent; on the off chance the webhook or
+            # reconcile_donations got there first, keep their status
+            # (and their created_at)
+            upsert_donations(
+                [Donation(
+                    payment_intent=pi_id,
+                    created_at=stripe_created(session_dict),
                     name=donor_name,
                     email=donor_email,
                     amount=amount_decimal,
@@ -197,14 +239,16 @@ def create_checkout_session(request):
                     status="pending",
                     method="",
                     country="",
-                )
+                )],
+                update_fields=["name", "email", "amount", "currency"],
             )
+            record_donation(currency, "pending")
             logger.info("Donation created", extra={
                 "intent": pi_id,
                 "email": donor_email,
                 "amount": float(amount_decimal),
-                "name": donor_name,
-                "created": created,
+                "donor_name": donor_name,
+                "pricing": pricing,
                 "locale": donor_locale,
             })
 
@@ -229,11 +273,18 @@ def stripe_webhook(request):
     event_type = event["type"]
     logger.info(f"Webhook received: {event_type}")
 
+    # Reads back what it writes: never from a replica
+    with WEBHOOK_PROCESSING_SECONDS.labels(event_type=event_type).time(), use_primary():
+        return _handle_webhook_event(event, event_type)
+
+
+def _handle_webhook_event(event, event_type):
     if event_type == "payment_intent.succeeded":
         pi_id = event["data"]["object"]["id"]
 
         try:
-            pi = stripe.PaymentIntent.retrieve(pi_id)
+            with observe_stripe("PaymentIntent.retrieve"):
+                pi = as_dict(stripe.PaymentIntent.retrieve(pi_id))
         except Exception:
             logger.exception("Unable to retrieve PaymentIntent")
             return HttpResponse(status=400)
@@ -241,11 +292,11 @@ def stripe_webhook(request):
         amount_minor = pi.get("amount", 0)
         amount_decimal = Decimal(amount_minor) / 100
         currency = (pi.get("currency") or settings.DONATION_CURRENCY).lower()
-        name = pi.metadata.get("donor_name", "") if getattr(pi, "metadata", None) else ""
+        name = (pi.get("metadata") or {}).get("donor_name", "")
         email = pi.get("receipt_email") or pi.get("customer_email") or ""
         donor_locale = ""
         try:
-            donor_locale = (pi.metadata or {}).get("donor_locale", "")
+            donor_locale = (pi.get("metadata") or {}).get("donor_locale", "")
         except Exception:
             donor_locale = ""
 
@@ -255,7 +306,8 @@ def stripe_webhook(request):
         funding = ""
 
         try:
-            charge = stripe.Charge.retrieve(pi.get("latest_charge"))
+            with observe_stripe("Charge.retrieve"):
+                charge = as_dict(stripe.Charge.retrieve(pi.get("latest_charge")))
             details = charge.get("payment_method_details", {}) or {}
             method = details.get("type", "") or ""
             country = (charge.get("billing_details", {}) or {}).get("address", {}).get("country", "") or ""
@@ -266,21 +318,30 @@ def stripe_webhook(request):
         except Exception:
             logger.warning("Unable to retrieve Stripe charge", exc_info=True)
 
-        Donation.objects.update_or_create(
-            payment_intent=pi_id,
-            defaults=dict(
-                name=name,
-                email=email,
-                amount=amount_decimal,
-                currency=currency,
-                status="succeeded",
-                method=method,
-                country=country,
-                card_brand=card_brand,
-                funding=funding,
-                raw=pi,
-            )
+        record_donation(currency, "succeeded", amount_decimal)
+
+        donation_fields = dict(
+            name=name,
+            email=email,
+            amount=amount_decimal,
+            currency=currency,
+            status="succeeded",
+            method=method,
+            country=country,
+            card_brand=card_brand,
+            funding=funding,
+            raw=pi,
         )
+        # A new row gets the intent's creation time, the same partition key
+        # reconcile_donations would give it. The lock keeps a concurrent
+        # checkout or reconcile from inserting the intent alongside it.
+        with transaction.atomic():
+            lock_intents([pi_id])
+            Donation.objects.update_or_create(
+                payment_intent=pi_id,
+                defaults=donation_fields,
+                create_defaults={**donation_fields, "created_at": stripe_created(pi)},
+            )
 
         logger.info("Donation saved after webhook", extra={
             "intent": pi_id,
@@ -307,7 +368,9 @@ def stripe_webhook(request):
     elif event_type == "charge.refunded":
         try:
             pi_id = event["data"]["object"]["payment_intent"]
-            Donation.objects.filter(payment_intent=pi_id).update(status="refunded")
+            refunded = Donation.objects.filter(payment_intent=pi_id).update(status="refunded")
+            if refunded:
+                record_donation(event["data"]["object"].get("currency"), "refunded")
             logger.info("Donation marked as refunded", extra={"intent": pi_id})
         except Exception:
             logger.warning("Error processing refund webhook", exc_info=True)
@@ -315,26 +378,66 @@ def stripe_webhook(request):
     return HttpResponse(status=200)
 
 
+class _Echo:
+    """Write target for csv.writer that hands each row back, for streaming."""
+
+    def write(self, value):
+        return value
+
+
+def _day_start(value):
+    """``"2026-03-01"`` -> that midnight in UTC, or None when empty; ValueError if malformed."""
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.timezone.utc)
+
+
 def export_all_csv(request):
+    """
+    Streams donations as CSV, newest first. ``?since=2026-01-01&until=2026-04-01``
+    (until exclusive) narrows it to a date range, which PostgreSQL answers
+    from those months' partitions only.
+    """
     if not request.user.is_staff:
         logger.warning("Unauthorized CSV export attempt")
         return HttpResponseForbidden()
 
-    logger.info("Donation CSV export initiated", extra={"user": request.user.email})
-
-    resp = StreamingHttpResponse(content_type="text/csv")
+    try:
+        since = _day_start(request.GET.get("since"))
+        until = _day_start(request.GET.get("until"))
+    except ValueError:
+        return HttpResponse("since/until must be YYYY-MM-DD dates", status=400, content_type="text/plain")
+
+    donations = Donation.objects.order_by("-created_at")
+    if since:
+        donations = donations.filter(created_at__gte=since)
+    if until:
+        donations = donations.filter(created_at__lt=until)
+
+    logger.info("Donation CSV export initiated", extra={
+        "user": request.user.email,
+        "since": since and since.isoformat(),
+        "until": until and until.isoformat(),
+    })
+
+    currency_symbols = {"pln": "zł", "usd": "$", "eur": "€"}
+    writer = csv.writer(_Echo())
+
+    def rows():
+        yield writer.writerow(["created_at", "name", "email", "amount", "currency", "status", "payment_intent", "method", "country"])
+        for d in donations.iterator(chunk_size=2000):
+            symbol = currency_symbols.get(d.currency.lower(), "")
+            amount_str = f"{symbol}{d.amount:.2f} {d.currency.upper()}"
+            yield writer.writerow([
+                d.created_at, d.name, d.email, amount_str, d.currency.upper(), d.status,
+                d.payment_intent, d.method, d.country
+            ])
+
+    resp = StreamingHttpResponse(rows(), content_type="text/csv")
     resp["Content-Disposition"] = 'attachment; filename="donations_all.csv"'
-    writer = csv.writer(resp)
-    writer.writerow(["created_at", "name", "email", "amount", "currency", "status", "payment_intent", "method", "country"])
-
-    for d in Donation.objects.order_by("-created_at"):
-        currency_symbols = {"pln": "zł", "usd": "$", "eur": "€"}
-        symbol = currency_symbols.get(d.currency.lower(), "")
-        amount_str = f"{symbol}{d.amount:.2f} {d.currency.upper()}"
-        writer.writerow([
-            d.created_at, d.name, d.email, amount_str, d.currency.upper(), d.status,
-            d.payment_intent, d.method, d.country
-        ])
     return resp
 
 
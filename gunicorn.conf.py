@@ -1,9 +1,10 @@
 import os
-import sys
 import logging
 from datetime import datetime, timezone
 from pythonjsonlogger import jsonlogger
 
+from mysite.log_queue import start_listeners
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings.dev")
 
 bind = "0.0.0.0:8000"
@@ -35,19 +36,26 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
         log_record["logger"] = record.name
 
 def post_fork(server, worker):
+    # App logging (LOG_QUEUE included) is configured only by LOGGING in the
+    # Django settings. Queued handlers inherited from the master need this
+    # worker's own listener thread.
+    start_listeners()
+
     json_formatter = CustomJsonFormatter(fmt="%(level)s %(logger)s %(message)s")
 
     err = logging.getLogger("gunicorn.error")
     for h in err.handlers:
         h.setFormatter(json_formatter)
 
-    app_logger = logging.getLogger("app")
-    if not app_logger.handlers:
-        sh = logging.StreamHandler(sys.stdout)
-        sh.setFormatter(json_formatter)
-        app_logger.addHandler(sh)
-        app_logger.setLevel(loglevel.upper())
-
     acc = logging.getLogger("gunicorn.access")
     for h in acc.handlers:
         h.setFormatter(logging.Formatter("%(message)s"))
+
+
+def post_worker_init(worker):
+    # The app is loaded by now; compile every template and build the search
+    # suggestion index before taking traffic.
+    from blog.autocomplete import warm
+    from mysite.template_loaders import warm_templates
+    warm_templates()
+    warm()
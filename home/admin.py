@@ -1,10 +1,18 @@
 from django.contrib import admin
-from parler.admin import TranslatableAdmin
-from .models import Event
+from modeltranslation.admin import TabbedTranslationAdmin
+from .models import Event, ScheduledJob
 
 
-class EventAdmin(TranslatableAdmin):
-    list_display = ('title', 'description', 'place',)
+class EventAdmin(TabbedTranslationAdmin):
+    list_display = ('title', 'date', 'place',)
+    date_hierarchy = 'date'
+    ordering = ('-date',)
     fields = ('title', 'description', 'place', 'date', 'time', 'image')
 
-admin.site.register(Event, EventAdmin)
\ No newline at end of file
+admin.site.register(Event, EventAdmin)
+
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_started', 'last_status', 'last_duration')
+    readonly_fields = ('name', 'last_started', 'last_finished', 'last_status', 'last_error', 'last_duration')
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class HomeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'home'
+
+    def ready(self):
+        from . import events  # noqa: F401  (connects cache invalidation signals)
+        import mysite.edge_cache  # noqa: F401  (purges nginx when content versions are bumped)
+        import mysite.db.routers  # noqa: F401  (pins reads to the primary after a publish)
@@ -0,0 +1,50 @@
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from mysite.content_versions import bump_version
+
+from .models import Event
+
+UPCOMING_CACHE_KEY = "events:upcoming:{day}"
+
+
+def seconds_until_midnight(now=None):
+    """Seconds left in the current day in ``TIME_ZONE`` (at least 1)."""
+    now = timezone.localtime(now)
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min, now.tzinfo)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def upcoming_events(limit=None):
+    """
+    The next ``UPCOMING_EVENTS_LIMIT`` events from today on.
+
+    The list is computed once per day in ``TIME_ZONE`` and kept in the
+    shared cache under a key carrying the date, so it rolls over at local
+    midnight; saving or deleting an event drops today's entry. Every
+    language lives on the row, so one entry serves all of them and a warm
+    call runs no queries.
+    """
+    today = timezone.localdate()
+    key = UPCOMING_CACHE_KEY.format(day=today.isoformat())
+    events = cache.get(key)
+    if events is None:
+        events = list(
+            Event.objects.filter(date__gte=today)
+            .order_by("date", "time", "pk")[:settings.UPCOMING_EVENTS_LIMIT]
+        )
+        cache.set(key, events, seconds_until_midnight())
+
+    return events[:limit] if limit else events
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_upcoming_events(sender, **kwargs):
+    cache.delete(UPCOMING_CACHE_KEY.format(day=timezone.localdate().isoformat()))
+    bump_version("events")
@@ -0,0 +1,40 @@
+import datetime
+
+from django.contrib.syndication.views import Feed
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.translation import gettext_lazy as _
+
+from .events import upcoming_events
+
+
+class UpcomingEventsFeed(Feed):
+    """The home page's upcoming events, in the language of the URL prefix."""
+    title = _("Події")
+    description = _("Найближчі події фонду «Відгук»")
+
+    def link(self):
+        return reverse("home")
+
+    def items(self):
+        return upcoming_events()
+
+    def item_title(self, event):
+        return event.title
+
+    def item_description(self, event):
+        return event.description
+
+    def item_link(self, event):
+        return f"{reverse('home')}#event-{event.pk}"
+
+    def item_pubdate(self, event):
+        if event.date is None:
+            return None
+        return timezone.make_aware(datetime.datetime.combine(event.date, event.time or datetime.time.min))
+
+
+class UpcomingEventsAtomFeed(UpcomingEventsFeed):
+    feed_type = Atom1Feed
+    subtitle = UpcomingEventsFeed.description
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+
+from mysite.edge_cache import refresh
+from mysite.scheduler import periodic
+from mysite.sessions import purge_expired_sessions
+
+from .events import upcoming_events
+
+
+@periodic("sessions.purge", every=timedelta(hours=6))
+def purge_sessions():
+    purge_expired_sessions()
+
+
+@periodic("pages.warm", every=timedelta(minutes=10))
+def warm_pages():
+    # The upcoming-events cache rolls over at midnight, and nginx entries
+    # expire after EDGE_CACHE_TTL: rebuild both before a visitor has to
+    upcoming_events()
+    refresh(settings.WARM_URLS)
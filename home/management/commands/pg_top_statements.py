@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mysite.db.pg_stats import ORDERINGS, PgStatStatementsUnavailable, top_statements
+
+
+class Command(BaseCommand):
+    help = "Show the top pg_stat_statements entries with the Django view that issued them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--order", choices=sorted(ORDERINGS), default="total",
+                            help="Sort by total time, mean time or call count")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--min-calls", type=int, default=1)
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--width", type=int, default=120, help="Truncate query text to this width")
+
+    def handle(self, *args, **options):
+        try:
+            rows = top_statements(
+                order=options["order"],
+                limit=options["limit"],
+                min_calls=options["min_calls"],
+                using=options["database"],
+            )
+        except PgStatStatementsUnavailable as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f"{'calls':>9} {'total ms':>12} {'mean ms':>10} {'max ms':>10}  view / query")
+        for row in rows:
+            query = " ".join(row["query"].split())[: options["width"]]
+            self.stdout.write(
+                f"{row['calls']:>9} {row['total_exec_time']:>12.1f} {row['mean_exec_time']:>10.2f} "
+                f"{row['max_exec_time']:>10.2f}  {row['view'] or '-'}"
+                + (f" ({row['site']})" if row["site"] else "")
+            )
+            self.stdout.write(f"{'':>45}  {query}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from mysite.edge_cache import purge
+
+
+class Command(BaseCommand):
+    help = "Refresh the nginx cache entries tagged with the given surrogate keys (e.g. after a deploy)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("keys", nargs="+", help="Surrogate keys, e.g. posts events")
+
+    def handle(self, *args, **options):
+        count = purge(*options["keys"])
+        self.stdout.write(f"Refreshed {count} URLs")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from mysite.sessions import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete expired rows from django_session in batches (run periodically)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_sessions(batch_size=options["batch_size"])
+        self.stdout.write(f"Deleted {deleted} expired sessions")
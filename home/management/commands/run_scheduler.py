@@ -0,0 +1,34 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from mysite.scheduler import Scheduler, discover, interval
+
+
+class Command(BaseCommand):
+    help = "Run the periodic jobs registered in each app's jobs.py (one per replica, e.g. as a sidecar)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the due jobs once and exit")
+        parser.add_argument("--metrics-port", type=int, default=settings.SCHEDULER_METRICS_PORT,
+                            help="Serve Prometheus metrics on this port (0: off)")
+
+    def handle(self, *args, **options):
+        jobs = discover()
+        for job in jobs.values():
+            self.stdout.write(f"{job.name}: every {interval(job) or 'never (disabled)'}")
+        scheduler = Scheduler(jobs)
+        if options["once"]:
+            ran = scheduler.run_pending()
+            self.stdout.write(f"Ran: {', '.join(ran) or 'nothing due'}")
+            return
+
+        if options["metrics_port"]:
+            start_http_server(options["metrics_port"])
+        stop = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+        scheduler.run_forever(stop=stop)
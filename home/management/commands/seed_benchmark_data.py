@@ -0,0 +1,152 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from taggit.models import Tag, TaggedItem
+
+from blog.models import Post, Profile
+from donations.models import Donation
+from donations.partitions import ensure_partitions
+from home.models import Event
+
+# Seeded rows carry these markers so --reset can remove exactly them
+POST_SLUG_PREFIX = "bench-post-"
+DONATION_INTENT_PREFIX = "pi_bench_seed_"
+EVENT_PLACE = "bench"
+# Seeded donations are dated over this many days back
+SPREAD_DAYS = 730
+
+WORDS = (
+    "допомога одеса волонтери діти родини ветерани відбудова зима проєкт "
+    "help odesa volunteers children families veterans rebuild winter project"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Seed realistic data volumes for load tests and benchmarks (see benchmarks/README.md)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=5000)
+        parser.add_argument("--tags", type=int, default=60)
+        parser.add_argument("--donations", type=int, default=1_000_000)
+        parser.add_argument("--events", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible data")
+        parser.add_argument("--reset", action="store_true", help="Delete previously seeded rows first")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        if options["reset"]:
+            self.reset()
+        self.seed_posts(options["posts"], options["tags"])
+        self.seed_events(options["events"])
+        self.seed_donations(options["donations"])
+
+    def reset(self):
+        Post.objects.filter(slug_uk__startswith=POST_SLUG_PREFIX).delete()
+        Profile.objects.filter(name__startswith="Bench author").delete()
+        Tag.objects.filter(slug__startswith="bench-").delete()
+        Event.objects.filter(place_uk=EVENT_PLACE).delete()
+        Donation.objects.filter(payment_intent__startswith=DONATION_INTENT_PREFIX).delete()
+        self.stdout.write("Removed previously seeded rows")
+
+    def _sentence(self, n):
+        return " ".join(self.rng.choice(WORDS) for _ in range(n))
+
+    @transaction.atomic
+    def seed_posts(self, count, tag_count):
+        if not count:
+            return
+        authors = Profile.objects.bulk_create([
+            Profile(name=f"Bench author {i}", bio=self._sentence(20), image="images/bench-author.jpg")
+            for i in range(20)
+        ])
+        tags = [
+            Tag.objects.get_or_create(slug=f"bench-{i}", defaults={"name": f"bench {self.rng.choice(WORDS)} {i}"})[0]
+            for i in range(tag_count)
+        ]
+
+        start = Post.objects.filter(slug_uk__startswith=POST_SLUG_PREFIX).count()
+        content_type = ContentType.objects.get_for_model(Post)
+        for offset in range(0, count, self.batch_size):
+            posts = []
+            for i in range(start + offset, start + min(offset + self.batch_size, count)):
+                title_uk, slug_uk = f"Bench {i} {self._sentence(5)}", f"{POST_SLUG_PREFIX}{i}"
+                body_uk, body_en = self._sentence(400), self._sentence(400)
+                posts.append(Post(
+                    title=title_uk, title_uk=title_uk,
+                    title_en=f"Bench {i} {self._sentence(5)} (en)",
+                    slug=slug_uk, slug_uk=slug_uk,
+                    slug_en=f"{slug_uk}-en",
+                    content=body_uk, content_uk=body_uk, content_en=body_en,
+                    teaser_text_uk=body_uk[:180], teaser_text_en=body_en[:180],
+                    author=self.rng.choice(authors),
+                    status=0 if i % 20 == 19 else 1,  # every 20th post is a draft
+                    image="images/bench.jpg",
+                ))
+            posts = Post.objects.bulk_create(posts)
+            TaggedItem.objects.bulk_create([
+                TaggedItem(tag=tag, content_type=content_type, object_id=post.pk)
+                for post in posts
+                for tag in self.rng.sample(tags, k=min(len(tags), self.rng.randint(1, 5)))
+            ])
+        self.stdout.write(f"Seeded {count} posts with {tag_count} tags")
+
+    @transaction.atomic
+    def seed_events(self, count):
+        if not count:
+            return
+        today = timezone.localdate()
+        events = []
+        for _ in range(count):
+            title_uk, title_en = f"{self._sentence(4)} (uk)", f"{self._sentence(4)} (en)"
+            description_uk, description_en = self._sentence(60), self._sentence(60)
+            events.append(Event(
+                image="images/bench-event.jpg",
+                date=today + datetime.timedelta(days=self.rng.randint(-365, 365)),
+                time=datetime.time(self.rng.randint(9, 19), self.rng.choice((0, 30))),
+                title=title_uk, title_uk=title_uk, title_en=title_en,
+                description=description_uk, description_uk=description_uk, description_en=description_en,
+                place=EVENT_PLACE, place_uk=EVENT_PLACE, place_en=EVENT_PLACE,
+            ))
+        Event.objects.bulk_create(events)
+        self.stdout.write(f"Seeded {count} events with uk/en translations")
+
+    def seed_donations(self, count):
+        if not count:
+            return
+        start = Donation.objects.filter(payment_intent__startswith=DONATION_INTENT_PREFIX).count()
+        currencies = ("usd", "usd", "usd", "eur", "pln")
+        statuses = ("succeeded",) * 17 + ("pending", "failed", "refunded")
+        methods = ("card", "card", "card", "link", "blik", "p24")
+        # Spread over two years so date-filtered admin lists and exports see
+        # realistic ranges; the partitions for those months must exist first
+        now = timezone.now()
+        ensure_partitions(now - datetime.timedelta(days=SPREAD_DAYS), now)
+        for offset in range(0, count, self.batch_size):
+            batch = []
+            for i in range(start + offset, start + min(offset + self.batch_size, count)):
+                method = self.rng.choice(methods)
+                batch.append(Donation(
+                    name=f"Donor {i}",
+                    email=f"donor{i}@example.com",
+                    amount=Decimal(self.rng.choice((5, 10, 10, 20, 20, 50, 100, self.rng.randint(1, 500)))),
+                    currency=self.rng.choice(currencies),
+                    payment_intent=f"{DONATION_INTENT_PREFIX}{i}",
+                    method=method,
+                    country=self.rng.choice(("PL", "UA", "DE", "US", "GB")),
+                    card_brand="visa" if method == "card" else "",
+                    status=self.rng.choice(statuses),
+                    created_at=now - datetime.timedelta(days=i % SPREAD_DAYS, seconds=i % 86400),
+                ))
+            with transaction.atomic():
+                Donation.objects.bulk_create(batch)
+            self.stdout.write(f"  donations: {offset + len(batch)}/{count}", ending="\r")
+        self.stdout.write("")
+        self.stdout.write(f"Seeded {count} donations")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from mysite.template_loaders import warm_templates
+
+
+class Command(BaseCommand):
+    help = "Compile every template once (what gunicorn workers do at startup) and report failures"
+
+    def handle(self, *args, **options):
+        compiled, failed = warm_templates()
+        self.stdout.write(f"Compiled {compiled} templates, {failed} failed (see app.templates debug log)")
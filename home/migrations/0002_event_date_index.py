@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='date',
+            field=models.DateField(blank=True, db_index=True, default=None, null=True),
+        ),
+    ]
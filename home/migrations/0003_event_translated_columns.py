@@ -0,0 +1,69 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_event_date_index'),
+    ]
+
+    operations = [
+        # parler's TranslationsForeignKey proxies title/description/place onto
+        # Event, which would clash with the columns added below. A plain FK is
+        # the same column; EventTranslation is only kept for the data copy.
+        migrations.AlterField(
+            model_name='eventtranslation',
+            name='master',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='home.event'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='title',
+            field=models.CharField(default='', max_length=200),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='title_en',
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='title_uk',
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='description',
+            field=models.TextField(default=''),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='description_en',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='description_uk',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='place',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='place_en',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='place_uk',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+    ]
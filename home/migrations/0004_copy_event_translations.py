@@ -0,0 +1,52 @@
+from django.db import migrations
+
+LANGUAGES = ("uk", "en")
+FIELDS = ("title", "description", "place")
+DEFAULT_LANGUAGE = "uk"
+
+
+def parler_to_columns(apps, schema_editor):
+    Event = apps.get_model("home", "Event")
+    EventTranslation = apps.get_model("home", "EventTranslation")
+
+    by_event = {}
+    for translation in EventTranslation.objects.filter(language_code__in=LANGUAGES).iterator():
+        by_event.setdefault(translation.master_id, {})[translation.language_code] = translation
+
+    events = list(Event.objects.filter(pk__in=by_event))
+    for event in events:
+        translations = by_event[event.pk]
+        for lang, translation in translations.items():
+            for field in FIELDS:
+                setattr(event, f"{field}_{lang}", getattr(translation, field))
+        # The untranslated column mirrors the default language, as modeltranslation expects
+        source = translations.get(DEFAULT_LANGUAGE) or next(iter(translations.values()))
+        for field in FIELDS:
+            setattr(event, field, getattr(source, field))
+
+    fields = list(FIELDS) + [f"{field}_{lang}" for field in FIELDS for lang in LANGUAGES]
+    Event.objects.bulk_update(events, fields, batch_size=500)
+
+
+def columns_to_parler(apps, schema_editor):
+    Event = apps.get_model("home", "Event")
+    EventTranslation = apps.get_model("home", "EventTranslation")
+
+    translations = []
+    for event in Event.objects.iterator():
+        for lang in LANGUAGES:
+            values = {field: getattr(event, f"{field}_{lang}") for field in FIELDS}
+            if values["title"]:
+                translations.append(EventTranslation(master_id=event.pk, language_code=lang, **values))
+    EventTranslation.objects.bulk_create(translations, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_event_translated_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(parler_to_columns, columns_to_parler),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_copy_event_translations'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='EventTranslation',
+        ),
+    ]
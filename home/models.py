@@ -1,16 +1,27 @@
 from django.db import models
-from parler.models import TranslatableModel, TranslatedFields
 
 
-class Event(TranslatableModel):
+class Event(models.Model):
     image = models.ImageField(upload_to='images/', default=None)
-    date = models.DateField(default=None, null=True, blank=True)
+    date = models.DateField(default=None, null=True, blank=True, db_index=True)
     time = models.TimeField(default=None, null=True, blank=True)
-    translations = TranslatedFields(
-        title = models.CharField(max_length=200),
-        description = models.TextField(),
-        place = models.CharField(max_length=200, null=True, blank=True)
-    )
+    # Translated via modeltranslation (home/translation.py): *_uk / *_en columns
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    place = models.CharField(max_length=200, null=True, blank=True)
 
     def __str__(self):
         return self.title
+
+
+class ScheduledJob(models.Model):
+    """Last run of a periodic job (mysite.scheduler), shared by every replica."""
+    name = models.CharField(max_length=100, unique=True)
+    last_started = models.DateTimeField(null=True, blank=True)
+    last_finished = models.DateTimeField(null=True, blank=True)
+    last_status = models.CharField(max_length=10, blank=True)
+    last_error = models.TextField(blank=True)
+    last_duration = models.FloatField(null=True, blank=True, help_text="Seconds")
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,59 @@
+import functools
+import posixpath
+import re
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+RELATIVE_URL = re.compile(r"""url\((['"]?)(?!data:|https?:|/|#)([^'")]+)\1\)""")
+
+
+@functools.lru_cache(maxsize=None)
+def _inline_css(path):
+    source = finders.find(path)
+    if source is None:
+        raise template.TemplateSyntaxError(f"inline_css: static file {path!r} not found")
+    with open(source, encoding="utf-8") as fh:
+        css = fh.read()
+
+    # Relative url() is resolved against the page once inlined; point it at
+    # the (hashed) static URL instead.
+    def absolute(match):
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(path), match.group(2)))
+        return f'url("{static(target)}")'
+
+    css = RELATIVE_URL.sub(absolute, css)
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s*\n\s*", "\n", css).strip()
+    return mark_safe(f"<style>\n{css}\n</style>")
+
+
+@register.simple_tag
+def inline_css(path):
+    """
+    ``{% inline_css "css/critical.css" %}``: the static file as a <style>
+    block, read from the source tree once per process, so above-the-fold
+    styles arrive with the HTML instead of after another round trip.
+    """
+    return _inline_css(path)
+
+
+@register.simple_tag
+def async_css(href):
+    """
+    ``{% async_css "css/style.css" %}`` or ``{% async_css "https://..." %}``:
+    a stylesheet that doesn't block rendering (preloaded, applied on load),
+    with a <noscript> fallback. Relative paths go through {% static %}.
+    """
+    if not href.startswith(("http://", "https://", "/")):
+        href = static(href)
+    return format_html(
+        '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link href="{0}" rel="stylesheet"></noscript>',
+        href,
+    )
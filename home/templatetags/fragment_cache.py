@@ -0,0 +1,75 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from mysite.content_versions import get_versions
+from mysite.metrics import FRAGMENT_CACHE_REQUESTS
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, fingerprint, versions, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.fingerprint = fingerprint
+        self.versions = versions
+        self.vary_on = vary_on
+
+    def cache_key(self, context):
+        parts = [self.name, self.fingerprint, get_language() or ""]
+        if self.versions:
+            versions = get_versions(*self.versions)
+            parts += [str(versions[name]) for name in self.versions]
+        if self.vary_on:
+            vary = "|".join(str(var.resolve(context)) for var in self.vary_on)
+            parts.append(hashlib.md5(vary.encode(), usedforsecurity=False).hexdigest())
+        return "fragment:" + ":".join(parts)
+
+    def render(self, context):
+        key = self.cache_key(context)
+        content = cache.get(key)
+        if content is not None:
+            FRAGMENT_CACHE_REQUESTS.labels(fragment=self.name, result="hit").inc()
+            return content
+        FRAGMENT_CACHE_REQUESTS.labels(fragment=self.name, result="miss").inc()
+        content = self.nodelist.render(context)
+        cache.set(key, content, settings.FRAGMENT_CACHE_TTL)
+        return content
+
+
+@register.tag
+def cachefragment(parser, token):
+    """
+    Caches the enclosed template output per language::
+
+        {% cachefragment "related_posts" post.pk versions="posts" %}
+            ...
+        {% endcachefragment %}
+
+    ``versions`` names content types (see mysite.content_versions) whose
+    version is part of the key, so saving such content retires the
+    fragment. Other arguments are variables the output depends on. The key
+    also carries a hash of the enclosed template source, so a deploy that
+    changes the markup never serves the old fragment.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name")
+    name = bits[1].strip("\"'")
+    versions, vary_on = (), []
+    for bit in bits[2:]:
+        if bit.startswith("versions="):
+            versions = tuple(v for v in bit[len("versions="):].strip("\"'").split(",") if v)
+        else:
+            vary_on.append(parser.compile_filter(bit))
+
+    pending = list(parser.tokens)
+    nodelist = parser.parse(("endcachefragment",))
+    source = "".join(t.contents for t in pending[len(parser.tokens):])
+    parser.delete_first_token()
+    fingerprint = hashlib.md5(source.encode(), usedforsecurity=False).hexdigest()[:10]
+    return FragmentCacheNode(nodelist, name, fingerprint, versions, vary_on)
@@ -1,3 +1,549 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.template import TemplateDoesNotExist, engines
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone, translation
+from prometheus_client import REGISTRY
+
+from blog.models import Profile
+from blog.tests import make_post
+from mysite.db.instrumentation import build_sql_comment
+from mysite.db.pg_stats import parse_sql_comment
+from mysite.i18n import localized, localized_values
+from mysite import log_queue, ratelimit
+from mysite.content_versions import bump_version
+from mysite.db import routers
+from mysite.middleware import ReplicaMiddleware, SessionMiddleware
+from mysite.scheduler import Job, Scheduler, advisory_lock, discover, lock_id
+from mysite.sessions import purge_expired_sessions
+from mysite.static_storage import PrecompressedManifestStaticFilesStorage
+from mysite.template_loaders import warm_templates
+from mysite.testing import QueryBudgetTestMixin
+
+from .events import seconds_until_midnight, upcoming_events
+from .models import Event, ScheduledJob
+
+
+class SqlCommentTests(TestCase):
+    def test_round_trip(self):
+        comment = build_sql_comment(view="post_detail", site="blog.views:get_object")
+        sql = f'SELECT 1 FROM "blog_post" {comment}'
+        self.assertEqual(parse_sql_comment(sql), {"view": "post_detail", "site": "blog.views:get_object"})
+
+    def test_unsafe_characters_are_replaced(self):
+        comment = build_sql_comment(view="x'*/%s")
+        self.assertNotIn("%", comment)
+        self.assertEqual(comment.count("*/"), 1)
+
+
+class PgStatementsViewTests(TestCase):
+    def test_staff_only(self):
+        response = self.client.get("/uk/admin/pg-statements/")
+        self.assertEqual(response.status_code, 302)
+
+        User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.login(username="staff", password="pw")
+        response = self.client.get("/uk/admin/pg-statements/?order=mean")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["order"], "mean")
+
+
+class HomeEventsQueryTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        for i in range(6):
+            event = Event(
+                image="images/event.jpg", date=today + datetime.timedelta(days=i + 1),
+                title_en=f"Event {i}", description_en="Description", place_en="Odesa",
+            )
+            if i % 2:
+                # Half the events have no Ukrainian translation and fall back to English.
+                event.title_uk, event.description_uk, event.place_uk = f"Подія {i}", "Опис", "Одеса"
+            event.save()
+        cache.clear()
+
+    def test_home_within_budget(self):
+        response = self.assertWithinQueryBudget("/uk/")
+        self.assertContains(response, "Подія 5")
+        self.assertContains(response, "Event 4")
+
+    def test_translated_reads_need_no_extra_query(self):
+        with translation.override("uk"), self.assertNumQueries(1):
+            events = list(Event.objects.order_by("date"))
+            rendered = [(e.title, e.description, e.place) for e in events]
+        self.assertEqual(rendered[0], ("Event 0", "Description", "Odesa"))
+        self.assertEqual(rendered[1], ("Подія 1", "Опис", "Одеса"))
+
+    def test_localized_reads_any_language_from_the_row(self):
+        event = Event.objects.get(title_en="Event 1")
+        with self.assertNumQueries(0):
+            self.assertEqual(localized(event, "title", "en"), "Event 1")
+            self.assertEqual(localized(event, "title", "uk"), "Подія 1")
+        untranslated = Event.objects.get(title_en="Event 0")
+        self.assertEqual(
+            localized_values(untranslated, ["title", "place"]),
+            {"uk": {"title": "Event 0", "place": "Odesa"}, "en": {"title": "Event 0", "place": "Odesa"}},
+        )
+
+
+class UpcomingEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+
+    def make_event(self, days, title):
+        return Event.objects.create(
+            image="images/event.jpg", date=self.today + datetime.timedelta(days=days),
+            title_en=title, description_en="Description",
+        )
+
+    @override_settings(UPCOMING_EVENTS_LIMIT=2)
+    def test_bounded_from_today(self):
+        self.make_event(-1, "yesterday")
+        self.make_event(3, "later")
+        self.make_event(0, "today")
+        self.make_event(1, "tomorrow")
+        with translation.override("en"):
+            self.assertEqual([e.title for e in upcoming_events()], ["today", "tomorrow"])
+
+    def test_cached_for_the_day_and_invalidated_on_save(self):
+        self.make_event(1, "tomorrow")
+        with translation.override("en"):
+            upcoming_events()
+            with self.assertNumQueries(0):
+                self.assertEqual([e.title for e in upcoming_events()], ["tomorrow"])
+            self.make_event(0, "today")
+            self.assertEqual([e.title for e in upcoming_events()], ["today", "tomorrow"])
+
+    def test_rolls_over_at_local_midnight(self):
+        self.make_event(0, "today")
+        with translation.override("en"):
+            self.assertEqual(len(upcoming_events()), 1)
+            tomorrow = self.today + datetime.timedelta(days=1)
+            with mock.patch("home.events.timezone.localdate", return_value=tomorrow):
+                self.assertEqual(upcoming_events(), [])
+
+    @override_settings(TIME_ZONE="Europe/Kyiv")
+    def test_seconds_until_midnight(self):
+        now = datetime.datetime(2026, 3, 1, 21, 30, tzinfo=datetime.timezone.utc)  # 23:30 in Kyiv
+        self.assertEqual(seconds_until_midnight(now), 30 * 60)
+
+    def test_archive_lists_past_events_paginated(self):
+        for days in range(1, 15):
+            self.make_event(-days, f"past {days}")
+        self.make_event(1, "upcoming")
+        with self.settings(EVENTS_ARCHIVE_PAGE_SIZE=12):
+            response = self.client.get("/en/events/archive/")
+        self.assertEqual(response.status_code, 200)
+        titles = [e.title for e in response.context["events"]]
+        self.assertEqual(titles[0], "past 1")
+        self.assertNotIn("upcoming", titles)
+        self.assertTrue(response.context["is_paginated"])
+        self.assertContains(self.client.get("/en/events/archive/?page=2"), "past 14")
+
+
+class EventFeedTests(TestCase):
+    def test_upcoming_events_feed(self):
+        upcoming = Event.objects.create(
+            title_uk="Збір", title_en="Drive", description_uk="Опис", description_en="About",
+            date=timezone.localdate() + datetime.timedelta(days=1), image="images/event.jpg",
+        )
+        Event.objects.create(
+            title_uk="Минула", title_en="Past", description_uk="-", description_en="-",
+            date=timezone.localdate() - datetime.timedelta(days=1), image="images/event.jpg",
+        )
+        response = self.client.get("/en/feeds/events.rss")
+        self.assertContains(response, "<title>Drive</title>")
+        self.assertNotContains(response, "Past")
+        self.assertContains(self.client.get("/uk/feeds/events.atom"), "<title>Збір</title>")
+
+        # Item links point at the event on the home page
+        link = f"/en/#event-{upcoming.pk}"
+        self.assertContains(response, f"<link>http://testserver{link}</link>")
+        cache.clear()
+        self.assertContains(self.client.get("/en/"), f'id="event-{upcoming.pk}"')
+
+
+class SharedPageTests(TestCase):
+    """Anonymous pages render the same for everyone, so caches share them per language."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Profile.objects.create(name="Author", bio="", image="images/author.jpg")
+        make_post(author, 1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_set_no_cookies_and_do_not_vary_on_them(self):
+        for url in ("/uk/", "/en/", "/uk/team/", "/uk/blog/", "/en/post-1/"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(dict(response.cookies), {})
+                self.assertNotIn("Cookie", response.get("Vary", ""))
+                self.assertNotIn("Accept-Language", response.get("Vary", ""))
+                self.assertNotIn("csrfmiddlewaretoken", response.content.decode())
+
+    def test_visitors_with_different_cookies_share_the_cached_home_page(self):
+        first = self.client.get("/uk/")
+        other = Client()
+        other.cookies["csrftoken"] = "x" * 32
+        other.cookies["cookie_consent"] = "1"
+        with self.assertNumQueries(0):
+            self.assertEqual(other.get("/uk/").content, first.content)
+
+    def test_unprefixed_urls_vary_on_language(self):
+        response = self.client.get("/", HTTP_ACCEPT_LANGUAGE="en")
+        self.assertRedirects(response, "/en/", fetch_redirect_response=False)
+        self.assertIn("Accept-Language", response["Vary"])
+
+    def test_csrf_endpoint(self):
+        response = self.client.get("/csrf/")
+        self.assertIn("csrftoken", response.cookies)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertTrue(response.json()["csrfToken"])
+
+
+class SessionTests(TestCase):
+    def test_anonymous_get_never_creates_a_session(self):
+        def view(request):
+            request.session["seen"] = True
+            return HttpResponse("ok")
+
+        request = RequestFactory().get("/uk/")
+        response = SessionMiddleware(view)(request)
+        self.assertEqual(dict(response.cookies), {})
+        self.assertNotIn("Vary", response)
+        self.assertFalse(Session.objects.exists())
+
+        request = RequestFactory().post("/uk/")
+        self.assertIn("sessionid", SessionMiddleware(view)(request).cookies)
+        self.assertEqual(Session.objects.count(), 1)
+
+    def test_purge_deletes_expired_rows_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f"old{i}", session_data="", expire_date=now - datetime.timedelta(days=1))
+        Session.objects.create(session_key="live", session_data="", expire_date=now + datetime.timedelta(days=1))
+        self.assertEqual(purge_expired_sessions(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["live"])
+
+
+class TemplateWarmupTests(TestCase):
+    def misses(self, name):
+        return REGISTRY.get_sample_value("app_template_cache_misses_total", {"template": name}) or 0
+
+    def test_warmed_templates_do_not_miss(self):
+        compiled, _ = warm_templates()
+        self.assertGreater(compiled, 0)
+        before = self.misses("index.html")
+        engines.all()[0].get_template("index.html")
+        self.assertEqual(self.misses("index.html"), before)
+
+    def test_unknown_template_counts_as_miss(self):
+        with self.assertRaises(TemplateDoesNotExist):
+            engines.all()[0].get_template("no-such-template.html")
+        self.assertEqual(self.misses("no-such-template.html"), 1)
+
+
+
+class StaticPipelineTests(TestCase):
+    def setUp(self):
+        self.src = tempfile.TemporaryDirectory()
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.src.cleanup)
+        self.addCleanup(self.root.cleanup)
+        for path, data in {
+            "css/site.css": b"body { background: url(../img/bg.png); }\n" + b"/* padding */\n" * 40,
+            "img/bg.png": b"\x89PNG" + bytes(512),
+            "js/app.js": b"console.log('hi');\n" * 40,
+        }.items():
+            os.makedirs(os.path.join(self.src.name, os.path.dirname(path)), exist_ok=True)
+            with open(os.path.join(self.src.name, path), "wb") as fh:
+                fh.write(data)
+
+    def collect(self):
+        with override_settings(
+            STATICFILES_DIRS=[self.src.name],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STATIC_ROOT=self.root.name,
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "mysite.static_storage.PrecompressedManifestStaticFilesStorage"},
+            },
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+        with open(os.path.join(self.root.name, "staticfiles.json")) as fh:
+            return json.load(fh)["paths"]
+
+    def read(self, path):
+        with open(os.path.join(self.root.name, path), "rb") as fh:
+            return fh.read()
+
+    def test_hashed_names_and_compressed_variants(self):
+        paths = self.collect()
+        css, png, js = paths["css/site.css"], paths["img/bg.png"], paths["js/app.js"]
+        self.assertRegex(css, r"^css/site\.[0-9a-f]{12}\.css$")
+        self.assertIn(png.split("/")[-1].encode(), self.read(css))
+        for name in (css, js):
+            self.assertEqual(gzip.decompress(self.read(name + ".gz")), self.read(name))
+        self.assertFalse(os.path.exists(os.path.join(self.root.name, png + ".gz")))
+
+    def test_missing_files_keep_their_plain_name(self):
+        self.collect()
+        storage = PrecompressedManifestStaticFilesStorage(location=self.root.name)
+        self.assertEqual(storage.stored_name("lib/missing.css"), "lib/missing.css")
+        self.assertRegex(storage.stored_name("js/app.js"), r"^js/app\.[0-9a-f]{12}\.js$")
+
+    def test_recollect_replaces_variants_in_place(self):
+        self.collect()
+        first = sorted(os.listdir(os.path.join(self.root.name, "css")))
+        self.collect()
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root.name, "css"))), first)
+
+    def test_overwriting_backends_are_not_deleted_first(self):
+        storage = PrecompressedManifestStaticFilesStorage(location=self.root.name, allow_overwrite=True)
+        with mock.patch.object(storage, "delete") as delete:
+            storage._save("css/site.css", ContentFile(b"a {}" * 100))
+            storage._save("css/site.css", ContentFile(b"b {}" * 100))
+            storage.wait_for_uploads()
+        delete.assert_not_called()
+        self.assertEqual(self.read("css/site.css"), b"b {}" * 100)
+
+
+class CriticalCssTests(TestCase):
+    def test_pages_inline_critical_css_and_defer_stylesheets(self):
+        for url in ("/uk/", "/uk/team/", "/uk/blog/"):
+            with self.subTest(url=url):
+                html = self.client.get(url).content.decode()
+                head = html[:html.index("</head>")]
+                self.assertIn(".top-bar {", head)
+                self.assertIn('rel="preload" href="https://stackpath.bootstrapcdn.com', head)
+                blocking = re.findall(r'<link[^>]*rel="stylesheet"', re.sub(r"<noscript>.*?</noscript>", "", head))
+                self.assertEqual(blocking, [])
+
+
+@override_settings(RATE_LIMITS={"search": "2/m"}, RATE_LIMIT_ENABLED=True)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(ratelimit, "_local", ratelimit.LocalBuckets())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def rejected(self):
+        return REGISTRY.get_sample_value("app_rate_limited_total", {"limit": "search", "backend": "local"}) or 0
+
+    def search(self, ip):
+        return self.client.get("/uk/search/?q=x", HTTP_X_REAL_IP=ip)
+
+    def test_burst_then_cheap_429(self):
+        before = self.rejected()
+        self.assertEqual(self.search("198.51.100.1").status_code, 200)
+        self.assertEqual(self.search("198.51.100.1").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.search("198.51.100.1")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        self.assertNotIn("X-Accel-Expires", response)
+        self.assertEqual(self.rejected(), before + 1)
+        # Buckets are per client
+        self.assertEqual(self.search("198.51.100.2").status_code, 200)
+
+    def test_bucket_refills(self):
+        with mock.patch("mysite.ratelimit.time.time", return_value=1000.0):
+            self.search("198.51.100.3")
+            self.search("198.51.100.3")
+            self.assertEqual(self.search("198.51.100.3").status_code, 429)
+        with mock.patch("mysite.ratelimit.time.time", return_value=1030.0):
+            self.assertEqual(self.search("198.51.100.3").status_code, 200)
+            self.assertEqual(self.search("198.51.100.3").status_code, 429)
+
+    def test_setting_overrides_and_disables(self):
+        with override_settings(RATE_LIMITS={"search": None}):
+            for _ in range(5):
+                self.assertEqual(self.search("198.51.100.4").status_code, 200)
+
+    def test_redis_failure_falls_back_to_local_bucket(self):
+        broken = mock.Mock()
+        broken.take.side_effect = ConnectionError("redis down")
+        with mock.patch("mysite.ratelimit._shared_buckets", return_value=broken), \
+                self.assertLogs("app.ratelimit", "WARNING"):
+            allowed, _, backend = ratelimit.take("search", "198.51.100.5", "1/m")
+        self.assertEqual((allowed, backend), (True, "local"))
+
+    def test_ip_header_only_trusted_from_proxies(self):
+        request = RequestFactory().get("/", HTTP_X_REAL_IP="198.51.100.6", REMOTE_ADDR="203.0.113.9")
+        self.assertEqual(ratelimit.client_ip(request), "203.0.113.9")
+        with override_settings(RATE_LIMIT_TRUSTED_PROXIES=["203.0.113.0/24"]):
+            self.assertEqual(ratelimit.client_ip(request), "198.51.100.6")
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate("10/m"), (10, 60))
+        self.assertEqual(ratelimit.parse_rate("5/10s"), (5, 10))
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.jobs = {
+            "test.hourly": Job("test.hourly", lambda: self.calls.append("hourly"), datetime.timedelta(hours=1)),
+            "test.broken": Job("test.broken", self.broken, datetime.timedelta(days=1)),
+        }
+        self.t0 = timezone.now()
+
+    def broken(self):
+        raise RuntimeError("boom")
+
+    def test_each_due_run_happens_once_across_replicas(self):
+        with self.assertLogs("app.scheduler", "ERROR"):
+            self.assertEqual(Scheduler(self.jobs).run_pending(self.t0), ["test.hourly", "test.broken"])
+        # Another replica a minute later sees the shared state
+        later = self.t0 + datetime.timedelta(minutes=1)
+        self.assertEqual(Scheduler(self.jobs).run_pending(later), [])
+        self.assertEqual(Scheduler(self.jobs).run_pending(self.t0 + datetime.timedelta(hours=1)), ["test.hourly"])
+        self.assertEqual(self.calls, ["hourly", "hourly"])
+
+    def test_records_failures(self):
+        failures = REGISTRY.get_sample_value("app_scheduler_job_failures_total", {"job": "test.broken"}) or 0
+        with self.assertLogs("app.scheduler", "ERROR"):
+            Scheduler(self.jobs).run_pending(self.t0)
+        state = ScheduledJob.objects.get(name="test.broken")
+        self.assertEqual(state.last_status, "failed")
+        self.assertIn("RuntimeError: boom", state.last_error)
+        self.assertEqual(ScheduledJob.objects.get(name="test.hourly").last_status, "ok")
+        self.assertEqual(REGISTRY.get_sample_value("app_scheduler_job_failures_total", {"job": "test.broken"}), failures + 1)
+        self.assertIsNotNone(REGISTRY.get_sample_value(
+            "app_scheduler_job_seconds_count", {"job": "test.hourly", "status": "ok"}))
+
+    def test_skips_jobs_locked_elsewhere_or_disabled(self):
+        with override_settings(SCHEDULER_INTERVALS={"test.broken": None}), advisory_lock("test.hourly"):
+            self.assertEqual(Scheduler(self.jobs).run_pending(self.t0), [])
+        self.assertEqual(self.calls, [])
+        self.assertFalse(ScheduledJob.objects.exists())
+
+    def test_app_jobs_are_discovered(self):
+        names = set(discover())
+        self.assertTrue({"sessions.purge", "pages.warm", "sitemap.rebuild", "donations.reconcile", "donations.partitions"} <= names)
+        self.assertNotEqual(lock_id("sessions.purge"), lock_id("pages.warm"))
+        self.assertLess(abs(lock_id("sessions.purge")), 2 ** 63)
+
+
+@override_settings(REPLICA_READS=True)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(routers, "_lag", routers._LagCheck())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_alias(self, method="get", **extra):
+        """The alias ReplicaMiddleware routes a request's reads to."""
+        middleware = ReplicaMiddleware(lambda request: HttpResponse(Event.objects.all().db))
+        request = getattr(RequestFactory(), method)("/uk/blog/", **extra)
+        return middleware(request).content.decode()
+
+    def test_anonymous_reads_go_to_replica(self):
+        self.assertEqual(self.read_alias(), "replica")
+        self.assertEqual(self.read_alias("head"), "replica")
+        self.assertEqual(Event.objects.all().db, "default")
+
+    def test_sessions_and_writes_stay_on_primary(self):
+        self.assertEqual(self.read_alias(HTTP_COOKIE="sessionid=abc"), "default")
+        self.assertEqual(self.read_alias("post"), "default")
+        with routers.use_replica(), routers.use_primary():
+            self.assertEqual(Event.objects.all().db, "default")
+
+    def test_publish_pins_reads_to_primary(self):
+        bump_version("posts")
+        self.assertEqual(self.read_alias(), "default")
+        cache.delete(routers.PINNED_KEY)
+        self.assertEqual(self.read_alias(), "replica")
+
+    def test_lagging_or_broken_replica_falls_back(self):
+        for lag in (mock.Mock(return_value=60.0), mock.Mock(side_effect=DatabaseError("down"))):
+            with self.subTest(lag=lag), mock.patch.object(routers, "replication_lag", lag), \
+                    mock.patch.object(routers, "_lag", routers._LagCheck()):
+                with self.assertLogs("app.db", "WARNING"):
+                    self.assertEqual(self.read_alias(), "default")
+                # Measured once per REPLICA_LAG_CHECK_INTERVAL
+                self.assertEqual(self.read_alias(), "default")
+                lag.assert_called_once()
+
+    @override_settings(REPLICA_READS=False)
+    def test_disabled_without_replica(self):
+        self.assertEqual(self.read_alias(), "default")
+
+    def test_replica_is_never_written_or_migrated(self):
+        router = routers.ReplicaRouter()
+        with routers.use_replica():
+            self.assertEqual(router.db_for_write(Event), "default")
+        self.assertFalse(router.allow_migrate("replica", "blog"))
+        self.assertTrue(router.allow_migrate("default", "blog"))
+
+
+class LogQueueTests(SimpleTestCase):
+    def handler(self, queue_size=10000):
+        stream = io.StringIO()
+        handler = log_queue.QueueLogHandler(stream, queue_size=queue_size)
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        self.addCleanup(handler.close)
+        return handler, stream
+
+    def record(self, message, level=logging.INFO):
+        return logging.LogRecord("app.test", level, __file__, 1, message, None, None)
+
+    def test_records_reach_the_stream(self):
+        handler, stream = self.handler()
+        handler.handle(self.record("queued"))
+        handler.close()
+        self.assertEqual(stream.getvalue(), "INFO queued\n")
+        self.assertNotIn(handler, log_queue._handlers)
+
+    def test_full_queue_drops_and_counts(self):
+        handler, stream = self.handler(queue_size=1)
+        dropped = REGISTRY.get_sample_value("app_logging_dropped_total")
+        # No listener draining the queue: the second record doesn't fit
+        with mock.patch.object(handler, "_ensure_listener"):
+            handler.handle(self.record("kept"))
+            handler.handle(self.record("dropped"))
+        self.assertEqual(REGISTRY.get_sample_value("app_logging_dropped_total"), dropped + 1)
+        self.assertEqual(handler.queue.qsize(), 1)
+
+    def test_listener_restarts_after_fork(self):
+        handler, stream = self.handler()
+        handler.handle(self.record("parent"))
+        parent = handler.listener
+        # Its thread doesn't exist in a forked child
+        parent.stop()
+        with mock.patch("mysite.log_queue.os.getpid", return_value=os.getpid() + 1):
+            log_queue.start_listeners()  # gunicorn post_fork
+            self.assertIsNot(handler.listener, parent)
+            handler.handle(self.record("child"))
+            handler.close()
+        self.assertIn("INFO child\n", stream.getvalue())
+
+    def test_sampling_only_thins_listed_info_messages(self):
+        sampler = log_queue.RateLimitFilter(messages=["Hot"], rate=2, per_seconds=60)
+        passed = [sampler.filter(self.record("Hot")) for _ in range(3)]
+        self.assertEqual(passed, [True, True, False])
+        self.assertTrue(sampler.filter(self.record("Hot", logging.WARNING)))
+        self.assertTrue(sampler.filter(self.record("Hot", logging.ERROR)))
+        self.assertTrue(sampler.filter(self.record("Other")))
+        self.assertTrue(sampler.filter(self.record({"event": "unhashable"})))
@@ -0,0 +1,7 @@
+from modeltranslation.translator import translator, TranslationOptions
+from .models import Event
+
+class EventTranslationOptions(TranslationOptions):
+    fields = ('title', 'description', 'place')
+
+translator.register(Event, EventTranslationOptions)
@@ -4,5 +4,8 @@ from . import views
 urlpatterns = [
     path("", views.home, name='home'),
     path('team/', views.team, name='team'),
+    path('events/archive/', views.EventArchive.as_view(), name='events_archive'),
+    path('feeds/events.rss', views.events_rss, name='events_rss'),
+    path('feeds/events.atom', views.events_atom, name='events_atom'),
     path('privacy-policy/', views.external_privacy_policy, name='external_privacy_policy')
 ]
\ No newline at end of file
@@ -1,21 +1,32 @@
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+from django.utils.decorators import method_decorator
 from django.core.cache.backends.base import DEFAULT_TIMEOUT
-from django.views.decorators.cache import cache_page
+from mysite.conditional import conditional_page, content_document
+from mysite.db_stats import query_budget
+from mysite.edge_cache import edge_cache
+from mysite.metrics import metered_cache_page
 
+from django.views import generic
+from blog.models import Post
+
+from .events import upcoming_events
+from .feeds import UpcomingEventsAtomFeed, UpcomingEventsFeed
 from .models import Event
 from django.utils import timezone
-from blog.models import Post
 
 
 CACHE_TTL = getattr(settings, 'CACHE_TTL', DEFAULT_TIMEOUT)
 
 
-@cache_page(CACHE_TTL)
+@edge_cache("posts", "events")
+@conditional_page("posts", "events", daily=True)
+@metered_cache_page(CACHE_TTL)
+@query_budget(2)
 def home(request):
-    events = Event.objects.filter(date__gte=timezone.now()).order_by('date')
-    recent_posts = Post.objects.all()[:3]
+    events = upcoming_events()
+    recent_posts = Post.objects.select_related('author')[:3]
     is_home_page = True
 
     return render(request, 'home.html', {
@@ -25,11 +36,32 @@ def home(request):
         'stripe_public_key': settings.STRIPE_PUBLISHABLE_KEY
     })
 
-@cache_page(CACHE_TTL)
+@method_decorator(edge_cache("events"), name="dispatch")
+class EventArchive(generic.ListView):
+    """Past events, newest first."""
+    template_name = 'events_archive.html'
+    context_object_name = 'events'
+    paginate_by = settings.EVENTS_ARCHIVE_PAGE_SIZE
+    query_budget = 2
+
+    def get_queryset(self):
+        return (
+            Event.objects.filter(date__lt=timezone.localdate())
+            .order_by('-date', '-time', '-pk')
+        )
+
+
+@edge_cache()
+@metered_cache_page(CACHE_TTL)
 def team(request):
     is_team_page = True  
     return render(request, 'team.html', {'is_team_page':is_team_page})
 
+
+events_rss = content_document("events", daily=True)(UpcomingEventsFeed())
+events_atom = content_document("events", daily=True)(UpcomingEventsAtomFeed())
+
+
 from django.shortcuts import redirect
 
 def external_privacy_policy(request):
@@ -0,0 +1,131 @@
+import datetime
+import hashlib
+import os
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.utils import timezone
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from .content_versions import as_datetime, get_versions
+from .edge_cache import edge_cache
+from .metrics import CACHED_VIEW_REQUESTS
+
+
+@lru_cache(maxsize=None)
+def release():
+    """
+    ``(token, timestamp)`` identifying the deployed markup: ``RELEASE`` if
+    set, otherwise the newest template mtime, which is identical for every
+    worker and pod started from the same image.
+    """
+    newest = 0.0
+    for backend in engines.all():
+        engine = getattr(backend, "engine", None)
+        if engine is None:
+            continue
+        for root in list(engine.dirs) + list(get_app_template_dirs("templates")):
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    newest = max(newest, os.path.getmtime(os.path.join(dirpath, filename)))
+    stamp = datetime.datetime.fromtimestamp(newest, tz=datetime.timezone.utc)
+    return settings.RELEASE or str(int(newest)), stamp
+
+
+def _versions(request, names):
+    # The ETag and Last-Modified callbacks share one cache round trip
+    if not hasattr(request, "_content_versions"):
+        request._content_versions = get_versions(*names)
+    return request._content_versions
+
+
+def conditional_page(*content, daily=False):
+    """
+    Conditional GET (ETag/Last-Modified, 304) for a page whose output
+    depends only on the URL, the language, the deployed templates and the
+    named content versions. Validators cost one cache lookup and no SQL,
+    so a 304 skips the view and template rendering entirely.
+
+    ``daily`` pages change at local midnight as well (date-filtered lists).
+    Such pages must not embed anything per visitor (see mysite.views.csrf).
+    """
+    def last_modified(request, *args, **kwargs):
+        stamps = [as_datetime(v) for v in _versions(request, content).values() if v]
+        stamps.append(release()[1])
+        if daily:
+            midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+            stamps.append(midnight)
+        return max(stamps)
+
+    def etag(request, *args, **kwargs):
+        versions = _versions(request, content)
+        parts = [
+            release()[0],
+            get_language() or "",
+            request.get_full_path(),
+            *(f"{name}={versions[name]}" for name in content),
+        ]
+        if daily:
+            parts.append(timezone.localdate().isoformat())
+        return hashlib.md5("|".join(parts).encode(), usedforsecurity=False).hexdigest()
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def versioned_cache_page(*content, daily=False, timeout=60 * 60 * 24):
+    """
+    Caches the whole response until one of the named content versions is
+    bumped (or the release changes) rather than for a short TTL. For
+    documents that are expensive to build and identical for everyone,
+    e.g. the sitemap and feeds; ``daily`` as for conditional_page.
+    """
+    def decorator(view_func):
+        # Feed instances are views too; they have no __name__
+        view_name = f"{view_func.__module__}.{getattr(view_func, '__name__', type(view_func).__name__)}"
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+            versions = _versions(request, content)
+            parts = [
+                release()[0],
+                get_language() or "",
+                request.build_absolute_uri(),
+                *(f"{name}={versions[name]}" for name in content),
+            ]
+            if daily:
+                parts.append(timezone.localdate().isoformat())
+            key = "page:" + hashlib.md5("|".join(parts).encode(), usedforsecurity=False).hexdigest()
+            response = cache.get(key)
+            if response is not None:
+                CACHED_VIEW_REQUESTS.labels(view=view_name, result="hit").inc()
+                return response
+            CACHED_VIEW_REQUESTS.labels(view=view_name, result="miss").inc()
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.cookies:
+                store = lambda r: cache.set(key, r, timeout)  # noqa: E731
+                if hasattr(response, "render") and not response.is_rendered:
+                    response.add_post_render_callback(store)
+                else:
+                    store(response)
+            return response
+        return wrapper
+    return decorator
+
+
+def content_document(*content, daily=False):
+    """
+    Everything a document built once per content version needs (sitemap,
+    feeds): the response cache above, validators, and nginx caching with
+    purge on change, which also rebuilds it right after a publish.
+    """
+    def decorator(view_func):
+        view = versioned_cache_page(*content, daily=daily)(view_func)
+        view = conditional_page(*content, daily=daily)(view)
+        return edge_cache(*content)(view)
+    return decorator
@@ -0,0 +1,49 @@
+import datetime
+import time
+
+from django.core.cache import cache
+from django.dispatch import Signal
+
+# A version is the time of the last change in nanoseconds since the epoch,
+# so it doubles as a Last-Modified timestamp (see as_datetime). A version
+# evicted from the cache comes back as "now": larger than any value handed
+# out before, so anything keyed on an old version is never served again.
+KEY = "content-version:{name}"
+
+# Sent with ``name`` after each bump, for caches outside this process
+# (mysite.edge_cache purges nginx).
+content_changed = Signal()
+
+
+def _fresh():
+    return time.time_ns()
+
+
+def get_versions(*names):
+    """``{name: version}`` for each content type, in one cache round trip."""
+    keys = {KEY.format(name=name): name for name in names}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, name in keys.items():
+        if key not in found:
+            cache.add(key, _fresh(), timeout=None)
+            found[key] = cache.get(key)
+        versions[name] = found[key]
+    return versions
+
+
+def get_version(name):
+    return get_versions(name)[name]
+
+
+def bump_version(name):
+    """Invalidates everything keyed on ``name``; call when that content changes."""
+    key = KEY.format(name=name)
+    version = max(_fresh(), (cache.get(key) or 0) + 1)
+    cache.set(key, version, timeout=None)
+    content_changed.send(sender=None, name=name, version=version)
+    return version
+
+
+def as_datetime(version):
+    return datetime.datetime.fromtimestamp(version / 1e9, tz=datetime.timezone.utc)
@@ -0,0 +1,15 @@
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+
+from mysite.db.instrumentation import QueryAnnotator
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    """
+    Stock PostgreSQL backend plus an outermost execute wrapper that tags every
+    statement with an SQL comment (view, optionally call site) and logs slow
+    queries. Enable with ``'ENGINE': 'mysite.db.backends.postgresql'``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.execute_wrappers.append(QueryAnnotator(self.alias))
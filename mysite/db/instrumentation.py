@@ -0,0 +1,71 @@
+import logging
+import re
+import sys
+import time
+
+from django.conf import settings
+
+from mysite.log_queue import request_log_context
+
+logger = logging.getLogger("app.db")
+
+_UNSAFE = re.compile(r"[^\w.:<>/-]")
+
+# Frames from these modules are skipped when looking for the call site
+_INTERNAL_MODULES = ("django.", "mysite.db.", "contextlib", "functools", "parler.", "modeltranslation.", "taggit.")
+
+
+def _comment_value(value):
+    # No quotes, '%' (psycopg placeholders) or '*/' may leak into the comment
+    return _UNSAFE.sub("_", str(value))
+
+
+def _call_site():
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_INTERNAL_MODULES):
+            return f"{module}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def build_sql_comment(**tags):
+    """sqlcommenter-style trailing comment: ``/*view='post_detail'*/``."""
+    parts = [f"{key}='{_comment_value(value)}'" for key, value in sorted(tags.items()) if value]
+    return f"/*{','.join(parts)}*/" if parts else ""
+
+
+class QueryAnnotator:
+    """
+    Execute wrapper that appends an SQL comment naming the Django view (and,
+    with SQL_COMMENT_CALL_SITE, the calling function) so pg_stat_statements
+    entries can be traced back, and logs statements slower than
+    SLOW_QUERY_MS with the request context attached.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.slow_query_ms = getattr(settings, "SLOW_QUERY_MS", 200)
+        self.with_call_site = getattr(settings, "SQL_COMMENT_CALL_SITE", False)
+
+    def __call__(self, execute, sql, params, many, context):
+        ctx = request_log_context.get()
+        comment = build_sql_comment(
+            view=ctx.get("view") if ctx else None,
+            site=_call_site() if self.with_call_site else None,
+        )
+        if comment:
+            sql = f"{sql} {comment}"
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= self.slow_query_ms:
+                logger.warning("Slow query", extra={
+                    "duration_ms": round(duration_ms, 2),
+                    "sql": sql[:2000],
+                    "db_alias": self.alias,
+                })
@@ -0,0 +1,63 @@
+import re
+
+from django.db import DatabaseError, connections
+
+_COMMENT = re.compile(r"/\*(.*?)\*/\s*$", re.S)
+_TAG = re.compile(r"(\w+)='([^']*)'")
+
+ORDERINGS = {
+    "total": "total_exec_time",
+    "mean": "mean_exec_time",
+    "calls": "calls",
+}
+
+TOP_STATEMENTS_SQL = """
+    SELECT queryid, calls, total_exec_time, mean_exec_time, max_exec_time, rows, query
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND calls >= %s
+    ORDER BY {order} DESC
+    LIMIT %s
+"""
+
+
+class PgStatStatementsUnavailable(Exception):
+    pass
+
+
+def parse_sql_comment(query):
+    """Returns the tags of a trailing ``/*key='value',...*/`` comment."""
+    match = _COMMENT.search(query or "")
+    return dict(_TAG.findall(match.group(1))) if match else {}
+
+
+def top_statements(order="total", limit=20, min_calls=1, using="default"):
+    """
+    Top pg_stat_statements entries for the current database. Each row is
+    annotated with the ``view``/``site`` tags injected by QueryAnnotator.
+
+    pg_stat_statements ignores comments when fingerprinting, so a statement
+    shared by several views keeps the tags of the first one that ran it.
+    """
+    if order not in ORDERINGS:
+        raise ValueError(f"order must be one of {', '.join(ORDERINGS)}")
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        raise PgStatStatementsUnavailable(f"{using!r} is not a PostgreSQL database")
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(TOP_STATEMENTS_SQL.format(order=ORDERINGS[order]), [min_calls, limit])
+            columns = [col.name for col in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    except DatabaseError as exc:
+        raise PgStatStatementsUnavailable(
+            "pg_stat_statements is not available; run CREATE EXTENSION pg_stat_statements"
+        ) from exc
+
+    for row in rows:
+        tags = parse_sql_comment(row["query"])
+        row["view"] = tags.get("view", "")
+        row["site"] = tags.get("site", "")
+    return rows
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.dispatch import receiver
+
+from mysite.content_versions import content_changed
+from mysite.metrics import REPLICA_FALLBACKS
+
+logger = logging.getLogger("app.db")
+
+REPLICA = "replica"
+PINNED_KEY = "db:primary-until"
+
+# Whether reads in the current request/context may go to the replica.
+# Unset (commands, threads, unsafe requests) means primary.
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the ``replica`` alias while ``use_replica()`` is in
+    effect (ReplicaMiddleware turns it on for anonymous GET/HEAD requests),
+    everything else to ``default``. Without a ``replica`` alias it's a no-op.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and REPLICA in settings.DATABASES:
+            return REPLICA
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica follows the primary through streaming replication
+        return db != REPLICA
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Routes reads in this block to the replica (``enabled=False``: to the primary)."""
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def use_primary():
+    return use_replica(False)
+
+
+class _LagCheck:
+    """``replica_usable()``'s per-process cache of the last lag measurement."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = 0.0
+        self.usable = True
+
+
+_lag = _LagCheck()
+
+
+def replication_lag():
+    """Seconds the replica is behind the primary (0 when caught up, or on a non-PostgreSQL alias)."""
+    connection = connections[REPLICA]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def replica_usable():
+    """
+    Whether reads can go to the replica right now: it is enabled, nothing
+    was published in the last REPLICA_PIN_SECONDS (readers must see it) and
+    it lags less than REPLICA_MAX_LAG. The lag is measured at most every
+    REPLICA_LAG_CHECK_INTERVAL seconds per process.
+    """
+    if not settings.REPLICA_READS or REPLICA not in settings.DATABASES:
+        return False
+    if (cache.get(PINNED_KEY) or 0) > time.time():
+        return False
+    now = time.monotonic()
+    if now - _lag.checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return _lag.usable
+    with _lag.lock:
+        if now - _lag.checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+            try:
+                lag = replication_lag()
+                _lag.usable = lag <= settings.REPLICA_MAX_LAG
+                if not _lag.usable:
+                    REPLICA_FALLBACKS.labels(reason="lag").inc()
+                    logger.warning("Replica lagging, reading from primary", extra={"lag_seconds": lag})
+            except DatabaseError:
+                _lag.usable = False
+                REPLICA_FALLBACKS.labels(reason="error").inc()
+                logger.warning("Replica unavailable, reading from primary", exc_info=True)
+            _lag.checked_at = now
+    return _lag.usable
+
+
+def pin_to_primary(seconds=None):
+    """Sends every process's reads to the primary for ``seconds`` (after a write readers must see)."""
+    seconds = seconds or settings.REPLICA_PIN_SECONDS
+    cache.set(PINNED_KEY, time.time() + seconds, timeout=seconds)
+
+
+@receiver(content_changed)
+def pin_after_publish(sender, name, **kwargs):
+    # The edge purge re-renders pages right after the commit; they must not
+    # be rebuilt from a replica that hasn't replayed the change yet
+    pin_to_primary()
@@ -0,0 +1,74 @@
+import re
+import time
+from collections import Counter
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+
+
+def sql_shape(sql):
+    """
+    Normalizes a statement so that queries differing only in literals or in
+    the length of an IN (...) list compare equal.
+    """
+    shape = _WHITESPACE.sub(" ", sql).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(%s, ...)", shape)
+
+
+def repeated_shapes(statements, threshold):
+    """Returns ``[(shape, count), ...]`` for shapes seen at least ``threshold`` times."""
+    shapes = Counter()
+    for sql, count in Counter(statements).items():
+        shapes[sql_shape(sql)] += count
+    return sorted(
+        ((shape, count) for shape, count in shapes.items() if count >= threshold),
+        key=lambda item: -item[1],
+    )
+
+
+class QueryStats:
+    """``connection.execute_wrapper`` that counts queries and DB time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements.append(sql)
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+
+def query_budget(budget):
+    """
+    Declares the maximum number of queries a function view may issue::
+
+        @query_budget(3)
+        def search_posts(request): ...
+
+    Class-based views set a ``query_budget`` class attribute instead.
+    """
+    def decorator(view_func):
+        view_func.query_budget = budget
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func):
+    budget = getattr(view_func, "query_budget", None)
+    if budget is None and hasattr(view_func, "view_class"):
+        budget = getattr(view_func.view_class, "query_budget", None)
+    return budget
@@ -0,0 +1,274 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import wraps
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+
+from .content_versions import content_changed
+from .metrics import EDGE_PURGE_REQUESTS
+
+logger = logging.getLogger("app.edge")
+
+URLS_KEY = "edge:urls:{key}"
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="edge-purge")
+_dirty = set()
+_dirty_lock = threading.Lock()
+# The Future draining _dirty, while one runs
+_draining = None
+
+
+def edge_cache(*surrogate_keys, ttl=None, query_params=None):
+    """
+    Lets the nginx cache in front of gunicorn keep the page::
+
+        @edge_cache("posts", "events")
+        def home(request): ...
+
+    Anonymous GET 200 (and 304, for nginx's own revalidation) responses get ``X-Accel-Expires`` (how long nginx
+    keeps them), ``Cache-Control: public, max-age=0`` (browsers revalidate
+    with the ETag) and ``Surrogate-Key``. The URL is indexed under each key,
+    so ``purge(key)`` knows which entries to refresh when that content
+    changes. Surrogate keys are content version names
+    (mysite.content_versions), whose bump triggers the purge.
+
+    ``query_params`` names the parameters the view reads; a URL carrying any
+    other is neither stored nor indexed, so ``?junk=<n>`` can't grow either.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            if request.method not in ("GET", "HEAD") or response.status_code not in (200, 304):
+                return response
+            if response.cookies or settings.SESSION_COOKIE_NAME in request.COOKIES:
+                # Per-visitor response: must never be served to anyone else
+                response["X-Accel-Expires"] = "0"
+                if response.cookies:
+                    # Pages meant to be shared must render the same for every
+                    # anonymous visitor (e.g. a {% csrf_token %} sneaked in)
+                    logger.warning(
+                        "Shared page set cookies",
+                        extra={"path": request.path, "cookies": sorted(response.cookies)},
+                    )
+                return response
+            if query_params is not None and not set(request.GET) <= set(query_params):
+                response["X-Accel-Expires"] = "0"
+                return response
+            response["X-Accel-Expires"] = str(ttl or settings.EDGE_CACHE_TTL)
+            patch_cache_control(response, public=True, max_age=0)
+            if surrogate_keys:
+                response["Surrogate-Key"] = " ".join(surrogate_keys)
+                _index_url(surrogate_keys, request.get_full_path())
+            return response
+        return wrapper
+    return decorator
+
+
+class LocalIndex:
+    """Per-process URL index in the cache: the fallback when Redis isn't configured or is down."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def add(self, key, url):
+        cache_key = URLS_KEY.format(key=key)
+        with self.lock:
+            urls = cache.get(cache_key) or {}
+            if url in urls:
+                return
+            urls[url] = None
+            # Bounded: the oldest URLs drop out and simply age out of nginx
+            while len(urls) > settings.EDGE_CACHE_MAX_URLS:
+                urls.pop(next(iter(urls)))
+            cache.set(cache_key, urls, timeout=settings.EDGE_CACHE_TTL * 2)
+
+    def urls(self, key):
+        return list(cache.get(URLS_KEY.format(key=key)) or {})
+
+    def remove(self, key, urls):
+        cache_key = URLS_KEY.format(key=key)
+        with self.lock:
+            indexed = cache.get(cache_key)
+            if indexed:
+                for url in urls:
+                    indexed.pop(url, None)
+                cache.set(cache_key, indexed, timeout=settings.EDGE_CACHE_TTL * 2)
+
+
+class RedisIndex:
+    """One sorted set per key, scored by when each URL was last served, so concurrent workers never lose an entry."""
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection("default")
+
+    def add(self, key, url):
+        cache_key = URLS_KEY.format(key=key)
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.zadd(cache_key, {url: time.time()})
+        # Bounded: the least recently served URLs drop out and simply age out of nginx
+        pipeline.zremrangebyrank(cache_key, 0, -settings.EDGE_CACHE_MAX_URLS - 1)
+        pipeline.expire(cache_key, settings.EDGE_CACHE_TTL * 2)
+        pipeline.execute()
+
+    def urls(self, key):
+        return [url.decode() for url in self.redis.zrange(URLS_KEY.format(key=key), 0, -1)]
+
+    def remove(self, key, urls):
+        if urls:
+            self.redis.zrem(URLS_KEY.format(key=key), *urls)
+
+
+_local = LocalIndex()
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def _index():
+    global _redis
+    if "django_redis" not in settings.CACHES["default"]["BACKEND"]:
+        return _local
+    if _redis is None:
+        with _redis_lock:
+            if _redis is None:
+                _redis = RedisIndex()
+    return _redis
+
+
+def _index_url(keys, url):
+    if not settings.EDGE_CACHE_URL:
+        return
+    try:
+        for key in keys:
+            _index().add(key, url)
+    except Exception:
+        # The page is still served; it just ages out of nginx instead of being refreshed
+        logger.warning("Edge cache index unavailable", exc_info=True)
+
+
+def urls_for(*keys):
+    urls = {}
+    for key in keys:
+        urls.update(dict.fromkeys(_index().urls(key)))
+    return list(urls)
+
+
+def purge(*keys):
+    """
+    Refreshes every nginx entry tagged with ``keys``, synchronously.
+
+    Stock nginx can't delete by key, so each indexed URL is re-fetched
+    through nginx's internal listener (``EDGE_CACHE_URL``), which bypasses
+    the cache on ``X-Edge-Refresh`` and stores the fresh response in place
+    of the old one. ``EDGE_PURGE_METHOD = "PURGE"`` sends PURGE requests
+    instead, for an nginx built with ngx_cache_purge, or for Varnish.
+    """
+    if not settings.EDGE_CACHE_URL:
+        return 0
+    urls = urls_for(*keys)
+    # The refreshes re-index their URLs, so the index is kept; only pages
+    # that no longer exist leave it
+    gone = refresh(urls, method=settings.EDGE_PURGE_METHOD)
+    for key in keys:
+        _index().remove(key, gone)
+    return len(urls)
+
+
+def refresh(urls, method="GET"):
+    """
+    Re-fetches ``urls`` (paths) through nginx's internal listener, replacing
+    their cache entries. Returns the URLs that answered 404 or 410.
+    """
+    if not settings.EDGE_CACHE_URL:
+        return []
+    base = settings.EDGE_CACHE_URL.rstrip("/")
+    session = requests.Session()
+    gone = []
+    for url in urls:
+        try:
+            response = session.request(
+                method, base + url,
+                headers={"X-Edge-Refresh": settings.EDGE_REFRESH_SECRET or "1", "Host": settings.EDGE_CACHE_HOST},
+                timeout=settings.EDGE_PURGE_TIMEOUT,
+                allow_redirects=False,
+            )
+        except requests.RequestException:
+            EDGE_PURGE_REQUESTS.labels(result="error").inc()
+            logger.warning("Edge cache purge failed", extra={"url": url})
+            continue
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            EDGE_PURGE_REQUESTS.labels(result="ok").inc()
+        elif response.status_code in (404, 410):
+            EDGE_PURGE_REQUESTS.labels(result="gone").inc()
+            gone.append(url)
+        else:
+            # e.g. a 429 or 5xx: nginx kept serving the old copy
+            EDGE_PURGE_REQUESTS.labels(result="error").inc()
+            logger.warning("Edge cache purge failed", extra={"url": url, "status": response.status_code})
+    return gone
+
+
+def is_edge_refresh(request):
+    """
+    True for refresh requests sent by ``refresh``: their ``X-Edge-Refresh``
+    carries EDGE_REFRESH_SECRET. Without a secret configured none qualify,
+    since anyone reaching gunicorn can send the header.
+    """
+    secret = settings.EDGE_REFRESH_SECRET
+    return bool(secret) and constant_time_compare(request.headers.get("X-Edge-Refresh", ""), secret)
+
+
+def purge_later(*keys):
+    """
+    Purges ``keys`` off the request thread once the current transaction
+    commits. Keys are collected in a dirty set drained by a single task, so
+    the several version bumps of one admin save cost one purge.
+    """
+    if settings.EDGE_CACHE_URL:
+        transaction.on_commit(lambda: _mark_dirty(keys))
+
+
+def _mark_dirty(keys):
+    global _draining
+    with _dirty_lock:
+        _dirty.update(keys)
+        if _draining is None:
+            _draining = _executor.submit(_drain)
+
+
+def _drain():
+    global _draining
+    while True:
+        with _dirty_lock:
+            keys = sorted(_dirty)
+            _dirty.clear()
+            if not keys:
+                _draining = None
+                return
+        try:
+            purge(*keys)
+        except Exception:
+            logger.warning("Edge cache purge failed", extra={"keys": keys}, exc_info=True)
+
+
+def flush(timeout=None):
+    """Waits for scheduled purges (tests and management commands)."""
+    with _dirty_lock:
+        draining = _draining
+    if draining is not None:
+        wait([draining], timeout=timeout)
+
+
+@receiver(content_changed)
+def purge_changed_content(sender, name, **kwargs):
+    purge_later(name)
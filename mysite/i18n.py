@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.utils import translation
+
+
+def localized(obj, field, language_code):
+    """
+    Value of the modeltranslation field ``field`` on ``obj`` as it reads in
+    ``language_code``, with the same fallbacks templates get. Reads the
+    row's own columns, so it never queries.
+    """
+    with translation.override(language_code):
+        return getattr(obj, field)
+
+
+def localized_values(obj, fields, languages=None):
+    """``{language: {field: value}}`` for every configured language."""
+    languages = languages or settings.MODELTRANSLATION_LANGUAGES
+    return {lang: {field: localized(obj, field, lang) for field in fields} for lang in languages}
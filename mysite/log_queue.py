@@ -0,0 +1,143 @@
+import contextvars
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import weakref
+from logging.handlers import QueueHandler, QueueListener
+
+from prometheus_client import Counter, Gauge
+
+# Imported from settings (before Django is configured) — keep this module
+# free of django imports.
+
+LOG_QUEUE_DEPTH = Gauge(
+    "app_logging_queue_depth",
+    "Log records waiting to be formatted and written",
+)
+LOG_RECORDS_DROPPED = Counter(
+    "app_logging_dropped_total",
+    "Log records dropped because the logging queue was full",
+)
+LOG_RECORDS_SAMPLED_OUT = Counter(
+    "app_logging_sampled_out_total",
+    "High-volume log records suppressed by rate-limited sampling",
+    ["message"],
+)
+
+# Open handlers only: close() (e.g. logging being reconfigured) and garbage
+# collection take a handler's queue out of the gauge.
+_handlers = weakref.WeakSet()
+LOG_QUEUE_DEPTH.set_function(lambda: sum(handler.queue.qsize() for handler in list(_handlers)))
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Hands records to a bounded in-process queue; a background QueueListener
+    does the JSON formatting and the stream write, off the request thread.
+
+    The formatter configured for this handler is applied by the listener.
+    The listener is (re)started lazily per process so it survives the
+    gunicorn fork.
+    """
+
+    def __init__(self, stream=None, queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        _handlers.add(self)
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.listener = QueueListener(self.queue, self.target)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def close(self):
+        # Also called by logging.shutdown() at exit
+        _handlers.discard(self)
+        with self._start_lock:
+            if self.listener is not None and self._pid == os.getpid():
+                # Writes what is still queued, then ends the thread; a
+                # listener inherited through fork has no thread here
+                self.listener.stop()
+            self.listener = None
+        super().close()
+
+    def prepare(self, record):
+        # In-process queue: no pickling needed, so skip QueueHandler's eager
+        # message formatting and let the listener thread do all of it.
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def start_listeners():
+    """Starts this process's listener for every open handler (gunicorn post_fork); first use would too."""
+    for handler in list(_handlers):
+        handler._ensure_listener()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most ``rate`` records per ``per_seconds`` for each of the
+    listed INFO messages; everything else passes untouched.
+    """
+
+    def __init__(self, messages=(), rate=10, per_seconds=1.0):
+        super().__init__()
+        self.messages = frozenset(messages)
+        self.rate = rate
+        self.per_seconds = per_seconds
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        # msg can be any object (a dict, a list): only strings are listed
+        if record.levelno != logging.INFO or not (isinstance(record.msg, str) and record.msg in self.messages):
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            started, count = self._windows.get(record.msg, (now, 0))
+            if now - started >= self.per_seconds:
+                started, count = now, 0
+            count += 1
+            self._windows[record.msg] = (started, count)
+
+        if count > self.rate:
+            LOG_RECORDS_SAMPLED_OUT.labels(message=record.msg).inc()
+            return False
+        return True
+
+
+# Per-request data (view name, DB stats, ...) set by mysite.middleware and
+# attached to every record logged while the request is being handled.
+request_log_context = contextvars.ContextVar("request_log_context", default=None)
+
+
+class RequestContextFilter(logging.Filter):
+    def filter(self, record):
+        ctx = request_log_context.get()
+        if ctx is not None:
+            for key, value in ctx.items():
+                if hasattr(record, key):
+                    continue  # explicit extra= wins
+                setattr(record, key, value() if callable(value) else value)
+        return True
@@ -0,0 +1,197 @@
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.views.decorators.cache import cache_page
+from prometheus_client import Counter, Gauge, Histogram
+
+# Business and hot-path metrics. Everything registers on the default
+# prometheus_client registry, so it is exported by django_prometheus'
+# /metrics endpoint next to the generic request/DB metrics.
+
+STRIPE_REQUEST_LATENCY = Histogram(
+    "app_stripe_request_latency_seconds",
+    "Latency of outbound Stripe API calls",
+    ["endpoint"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0),
+)
+STRIPE_REQUEST_ERRORS = Counter(
+    "app_stripe_request_errors_total",
+    "Stripe API calls that raised",
+    ["endpoint"],
+)
+
+CHECKOUT_SESSION_SECONDS = Histogram(
+    "app_checkout_session_create_seconds",
+    "Time to set up a Checkout Session, by pricing path (catalog price or inline price_data)",
+    ["pricing"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0),
+)
+
+WEBHOOK_PROCESSING_SECONDS = Histogram(
+    "app_stripe_webhook_processing_seconds",
+    "Time spent handling a Stripe webhook, by event type",
+    ["event_type"],
+)
+
+RECEIPT_EMAIL_SECONDS = Histogram(
+    "app_receipt_email_send_seconds",
+    "Time spent sending a donation receipt email",
+)
+RECEIPT_EMAIL_FAILURES = Counter(
+    "app_receipt_email_failures_total",
+    "Donation receipt emails that could not be sent",
+)
+
+CACHED_VIEW_REQUESTS = Counter(
+    "app_cached_view_requests_total",
+    "Requests to cache_page views, by cache result (hit/miss)",
+    ["view", "result"],
+)
+
+FRAGMENT_CACHE_REQUESTS = Counter(
+    "app_template_fragment_requests_total",
+    "{% cachefragment %} lookups, by fragment and cache result (hit/miss)",
+    ["fragment", "result"],
+)
+
+EDGE_PURGE_REQUESTS = Counter(
+    "app_edge_purge_requests_total",
+    "Refresh/purge requests sent to the nginx cache, by result (ok/gone/error)",
+    ["result"],
+)
+
+RATE_LIMITED = Counter(
+    "app_rate_limited_total",
+    "Requests rejected with 429, by limit name and bucket backend (redis/local)",
+    ["limit", "backend"],
+)
+RATE_LIMIT_BACKEND_ERRORS = Counter(
+    "app_rate_limit_backend_errors_total",
+    "Redis token bucket calls that failed (the local bucket was used instead)",
+)
+
+POST_VIEWS_FLUSHED = Counter(
+    "app_post_views_flushed_total",
+    "Post views written from the counters to PostStats",
+)
+POST_VIEW_BACKEND_ERRORS = Counter(
+    "app_post_view_backend_errors_total",
+    "Redis view counter calls that failed (the view was buffered in the process instead)",
+)
+
+SCHEDULER_JOB_SECONDS = Histogram(
+    "app_scheduler_job_seconds",
+    "Duration of periodic job runs, by job and status (ok/failed)",
+    ["job", "status"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+SCHEDULER_JOB_FAILURES = Counter(
+    "app_scheduler_job_failures_total",
+    "Periodic job runs that raised",
+    ["job"],
+)
+SCHEDULER_JOB_LAST_SUCCESS = Gauge(
+    "app_scheduler_job_last_success_timestamp_seconds",
+    "Unix time of the job's last successful run on this replica",
+    ["job"],
+)
+
+TEMPLATE_CACHE_MISSES = Counter(
+    "app_template_cache_misses_total",
+    "Template lookups that had to load and compile the template (cached loader miss) after warm-up",
+    ["template"],
+)
+
+TEMPLATE_RENDER_SECONDS = Histogram(
+    "app_template_render_seconds",
+    "Template render time, by top-level template",
+    ["template"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+DONATIONS_TOTAL = Counter(
+    "app_donations_total",
+    "Donations recorded, by currency and status",
+    ["currency", "status"],
+)
+DONATION_AMOUNT_TOTAL = Counter(
+    "app_donation_amount_total",
+    "Sum of succeeded donation amounts, in major currency units",
+    ["currency"],
+)
+
+REQUEST_DB_QUERIES = Histogram(
+    "app_request_db_queries",
+    "Number of SQL queries issued per request, by view",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 200),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "app_request_db_seconds",
+    "Time spent in SQL per request, by view",
+    ["view"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+REPLICA_FALLBACKS = Counter(
+    "app_db_replica_fallbacks_total",
+    "Replica lag checks that sent reads back to the primary, by reason (lag/error)",
+    ["reason"],
+)
+REPEATED_QUERIES_DETECTED = Counter(
+    "app_db_repeated_queries_total",
+    "Requests in which the same SQL shape ran repeatedly (likely N+1), by view",
+    ["view"],
+)
+QUERY_BUDGET_EXCEEDED = Counter(
+    "app_db_query_budget_exceeded_total",
+    "Requests that issued more queries than the view's declared budget",
+    ["view"],
+)
+
+
+@contextmanager
+def observe_stripe(endpoint):
+    """Times a Stripe API call, e.g. ``with observe_stripe("PaymentIntent.retrieve"):``."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STRIPE_REQUEST_ERRORS.labels(endpoint=endpoint).inc()
+        raise
+    finally:
+        STRIPE_REQUEST_LATENCY.labels(endpoint=endpoint).observe(time.perf_counter() - start)
+
+
+def record_donation(currency, status, amount=None):
+    currency = (currency or "").lower()
+    DONATIONS_TOTAL.labels(currency=currency, status=status).inc()
+    if amount is not None:
+        DONATION_AMOUNT_TOTAL.labels(currency=currency).inc(float(amount))
+
+
+def metered_cache_page(timeout, *, cache=None, key_prefix=None):
+    """
+    Drop-in replacement for ``cache_page`` that counts cache hits and misses
+    per view. The wrapped view only runs on a miss, so that is what we detect.
+    """
+    def decorator(view_func):
+        view_name = f"{view_func.__module__}.{view_func.__name__}"
+
+        def render_on_miss(request, *args, **kwargs):
+            request._cache_page_miss = True
+            return view_func(request, *args, **kwargs)
+
+        cached_view = cache_page(timeout, cache=cache, key_prefix=key_prefix)(render_on_miss)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = cached_view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                result = "miss" if getattr(request, "_cache_page_miss", False) else "hit"
+                CACHED_VIEW_REQUESTS.labels(view=view_name, result=result).inc()
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,121 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware as BaseSessionMiddleware
+from django.db import connections
+
+from .db.routers import replica_usable, use_replica
+from .db_stats import QueryStats, get_query_budget, repeated_shapes
+from .log_queue import request_log_context
+from .metrics import (
+    QUERY_BUDGET_EXCEEDED,
+    REPEATED_QUERIES_DETECTED,
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_SECONDS,
+)
+
+logger = logging.getLogger("app.db")
+
+
+class QueryCountMiddleware:
+    """
+    Counts SQL queries and DB time per request on every database alias.
+
+    The running totals and the view name are attached to every log record
+    emitted during the request (see RequestContextFilter), exported as
+    per-view histograms, and checked against the view's ``query_budget``.
+    Repeated identical SQL shapes (the N+1 pattern) are logged as warnings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.repeat_threshold = getattr(settings, "N_PLUS_ONE_THRESHOLD", 5)
+
+    def __call__(self, request):
+        stats = QueryStats()
+        ctx = {
+            "view": None,
+            "db_queries": lambda: stats.count,
+            "db_time_ms": lambda: stats.duration_ms,
+        }
+        token = request_log_context.set(ctx)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(stats))
+                response = self.get_response(request)
+            self._report(request, ctx["view"] or "<unresolved>", stats)
+        finally:
+            request_log_context.reset(token)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        request_log_context.get()["view"] = match.view_name or match._func_path
+        request._query_budget = get_query_budget(view_func)
+
+    def _report(self, request, view, stats):
+        REQUEST_DB_QUERIES.labels(view=view).observe(stats.count)
+        REQUEST_DB_SECONDS.labels(view=view).observe(stats.duration)
+
+        budget = getattr(request, "_query_budget", None)
+        if budget is not None and stats.count > budget:
+            QUERY_BUDGET_EXCEEDED.labels(view=view).inc()
+            logger.warning("Query budget exceeded", extra={"budget": budget, "path": request.path})
+
+        repeated = repeated_shapes(stats.statements, self.repeat_threshold)
+        if repeated:
+            REPEATED_QUERIES_DETECTED.labels(view=view).inc()
+            shape, count = repeated[0]
+            logger.warning(
+                "Repeated SQL detected",
+                extra={"sql_shape": shape[:500], "repeats": count, "path": request.path},
+            )
+
+
+class SessionMiddleware(BaseSessionMiddleware):
+    """
+    Django's SessionMiddleware, except that a GET/HEAD without a session
+    cookie never creates a session: nothing is written to the session
+    store, no cookie is set and no ``Vary: Cookie`` is added, whatever the
+    view did with ``request.session``. Anonymous public pages therefore
+    cost no session I/O and stay shareable by caches. Sessions start on
+    POST (admin login) as before.
+    """
+
+    def process_response(self, request, response):
+        session = getattr(request, "session", None)
+        if (
+            session is not None
+            and request.method in ("GET", "HEAD")
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        ):
+            if session.modified and not session.is_empty():
+                logger.warning("Anonymous GET wrote to the session; not saved", extra={"path": request.path})
+            return response
+        return super().process_response(request, response)
+
+
+class ReplicaMiddleware:
+    """
+    Lets anonymous GET/HEAD requests read from the ``replica`` database
+    (see mysite.db.routers). Everything else stays on the primary, which
+    gives read-your-writes where it matters: form posts and webhooks
+    (unsafe methods), and anyone with a session, i.e. staff reading back
+    their admin edits. A recent publish or a lagging replica also sends
+    anonymous reads to the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            request.method in ("GET", "HEAD")
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and replica_usable()
+        ):
+            with use_replica():
+                return self.get_response(request)
+        return self.get_response(request)
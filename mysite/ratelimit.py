@@ -0,0 +1,182 @@
+import ipaddress
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from .edge_cache import is_edge_refresh
+from .metrics import RATE_LIMIT_BACKEND_ERRORS, RATE_LIMITED
+
+logger = logging.getLogger("app.ratelimit")
+
+BUCKET_KEY = "ratelimit:{name}:{client}"
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS[1] bucket; ARGV: capacity, refill per second, now (s), cost.
+# Returns {allowed, seconds until a token is available}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("PEXPIRE", KEYS[1], math.ceil((capacity / rate) * 1000) + 1000)
+if allowed == 1 then
+    return {1, "0"}
+end
+return {0, tostring((cost - tokens) / rate)}
+"""
+
+
+def parse_rate(rate):
+    """``"10/m"`` -> (10, 60): requests per period in seconds. ``"5/10s"`` works too."""
+    count, _, period = rate.partition("/")
+    multiplier = int(period[:-1] or 1)
+    return int(count), multiplier * PERIODS[period[-1]]
+
+
+class LocalBuckets:
+    """Per-process token buckets: the fallback when Redis isn't configured or is down."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now, cost=1):
+        with self.lock:
+            tokens, ts = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self.buckets[key] = (tokens, now)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+class RedisBuckets:
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.script = get_redis_connection("default").register_script(TOKEN_BUCKET_LUA)
+
+    def take(self, key, capacity, rate, now, cost=1):
+        allowed, retry_after = self.script(keys=[key], args=[capacity, rate, now, cost])
+        return bool(allowed), float(retry_after)
+
+
+_local = LocalBuckets()
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def _shared_buckets():
+    global _redis
+    if _redis is None and "django_redis" in settings.CACHES["default"]["BACKEND"]:
+        with _redis_lock:
+            if _redis is None:
+                _redis = RedisBuckets()
+    return _redis
+
+
+def take(name, client, rate, burst=None):
+    """
+    Takes one token from ``client``'s bucket for ``name``. Returns
+    ``(allowed, retry_after_seconds, backend)``.
+
+    The bucket holds ``burst`` tokens (default: the rate's count) and refills
+    at ``rate``. Buckets live in Redis so the limit holds across gunicorn
+    workers and replicas; without Redis, or if a call fails, each process
+    falls back to its own bucket (a looser limit, not an outage).
+    """
+    count, period = parse_rate(rate)
+    capacity = burst or count
+    refill = count / period
+    key = BUCKET_KEY.format(name=name, client=client)
+    now = time.time()
+    shared = _shared_buckets()
+    if shared is not None:
+        try:
+            return (*shared.take(key, capacity, refill, now), "redis")
+        except Exception:
+            RATE_LIMIT_BACKEND_ERRORS.inc()
+            logger.warning("Rate limit backend unavailable, using local buckets", exc_info=True)
+    return _local.take(key, capacity, refill, now) + ("local",)
+
+
+@lru_cache(maxsize=8)
+def _networks(proxies):
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def is_trusted_proxy(address):
+    """Whether ``address`` is in RATE_LIMIT_TRUSTED_PROXIES (addresses or CIDR ranges)."""
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in _networks(tuple(settings.RATE_LIMIT_TRUSTED_PROXIES)))
+
+
+def client_ip(request):
+    """
+    The socket address, or RATE_LIMIT_IP_HEADER when the request came
+    through a trusted proxy; from anyone else the header is client-chosen.
+    """
+    remote = request.META.get("REMOTE_ADDR", "")
+    header = settings.RATE_LIMIT_IP_HEADER
+    if header and is_trusted_proxy(remote):
+        forwarded = request.META.get(header, "").split(",")[0].strip()
+        if forwarded:
+            return forwarded
+    return remote
+
+
+def rate_limit(name, rate, burst=None):
+    """
+    Rejects clients over ``rate`` (e.g. ``"10/m"``) with a 429 before the
+    view runs::
+
+        @rate_limit("checkout", "10/m", burst=5)
+        def create_checkout_session(request): ...
+
+    Put it outermost, so rejected requests cost one Redis call and nothing
+    else. ``RATE_LIMITS = {"checkout": "20/m"}`` in settings overrides the
+    rate of a named limit, ``None`` there disables it.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            limit = settings.RATE_LIMITS.get(name, rate)
+            # Edge cache refreshes all come from nginx's internal listener
+            if limit is None or not settings.RATE_LIMIT_ENABLED or is_edge_refresh(request):
+                return view_func(request, *args, **kwargs)
+            allowed, retry_after, backend = take(name, client_ip(request), limit, burst)
+            if allowed:
+                return view_func(request, *args, **kwargs)
+            RATE_LIMITED.labels(limit=name, backend=backend).inc()
+            if request.content_type == "application/json" or "json" in request.headers.get("Accept", ""):
+                response = JsonResponse({"error": "Too many requests"}, status=429)
+            else:
+                response = HttpResponse("Too many requests", status=429, content_type="text/plain")
+            response["Retry-After"] = str(max(1, math.ceil(retry_after)))
+            response["Cache-Control"] = "no-store"
+            return response
+        return wrapper
+    return decorator
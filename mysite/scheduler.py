@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .metrics import SCHEDULER_JOB_FAILURES, SCHEDULER_JOB_LAST_SUCCESS, SCHEDULER_JOB_SECONDS
+
+logger = logging.getLogger("app.scheduler")
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    func: object
+    every: timedelta
+
+
+registry = {}
+
+
+def periodic(name, every):
+    """
+    Registers a function as a periodic job, from an app's ``jobs.py``::
+
+        @periodic("sessions.purge", every=timedelta(days=1))
+        def purge_sessions():
+            purge_expired_sessions()
+
+    ``SCHEDULER_INTERVALS = {"sessions.purge": timedelta(hours=6)}`` in
+    settings overrides the interval, ``None`` there disables the job.
+    """
+    def decorator(func):
+        registry[name] = Job(name, func, every)
+        return func
+    return decorator
+
+
+def discover():
+    autodiscover_modules("jobs")
+    return registry
+
+
+def interval(job):
+    return settings.SCHEDULER_INTERVALS.get(job.name, job.every)
+
+
+def lock_id(name):
+    """Stable signed 64-bit key for pg_advisory_lock."""
+    return int.from_bytes(hashlib.blake2b(f"scheduler:{name}".encode(), digest_size=8).digest(), "big", signed=True)
+
+
+_local_locks = {}
+
+
+@contextmanager
+def advisory_lock(name):
+    """
+    Yields whether this process holds the cluster-wide lock for ``name``.
+
+    On PostgreSQL that's a session-level ``pg_try_advisory_lock``: it never
+    waits, and dies with the connection if the process does. Other
+    databases (local runs, tests) only get a per-process lock.
+    """
+    if connection.vendor != "postgresql":
+        lock = _local_locks.setdefault(name, threading.Lock())
+        acquired = lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+    key = lock_id(name)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+
+
+class Scheduler:
+    """
+    Runs the registered jobs when they are due, on whichever replica gets
+    there first.
+
+    Every replica can run a scheduler. Before running a job, one takes the
+    job's advisory lock and re-reads its ScheduledJob row under it. The run
+    only happens if no replica has started the job within its interval.
+    So each due run happens exactly once, and a slow job is never started
+    twice.
+    """
+
+    def __init__(self, jobs=None):
+        self.jobs = registry if jobs is None else jobs
+        self.next_due = {}
+
+    def run_pending(self, now=None):
+        """Runs every due job once; returns the names of the jobs that ran."""
+        from home.models import ScheduledJob
+
+        ran = []
+        for job in list(self.jobs.values()):
+            every = interval(job)
+            current = now or timezone.now()
+            if every is None or self.next_due.get(job.name, current) > current:
+                continue
+            with advisory_lock(job.name) as acquired:
+                if not acquired:
+                    # Running elsewhere right now; look again next tick
+                    continue
+                state, _ = ScheduledJob.objects.get_or_create(name=job.name)
+                if state.last_started and state.last_started + every > current:
+                    self.next_due[job.name] = state.last_started + every
+                    continue
+                self.run(job, state, current)
+                self.next_due[job.name] = current + every
+                ran.append(job.name)
+        return ran
+
+    def run(self, job, state, now):
+        state.last_started = now
+        state.save(update_fields=["last_started"])
+        started = time.perf_counter()
+        status = "ok"
+        error = ""
+        try:
+            job.func()
+        except Exception:
+            status = "failed"
+            error = traceback.format_exc(limit=5)
+            SCHEDULER_JOB_FAILURES.labels(job=job.name).inc()
+            logger.exception("Scheduled job failed", extra={"job": job.name})
+        duration = time.perf_counter() - started
+        SCHEDULER_JOB_SECONDS.labels(job=job.name, status=status).observe(duration)
+        if status == "ok":
+            SCHEDULER_JOB_LAST_SUCCESS.labels(job=job.name).set(time.time())
+            logger.info("Scheduled job finished", extra={"job": job.name, "duration_ms": round(duration * 1000, 1)})
+        state.last_finished = timezone.now()
+        state.last_status = status
+        state.last_error = error
+        state.last_duration = duration
+        state.save(update_fields=["last_finished", "last_status", "last_error", "last_duration"])
+
+    def run_forever(self, tick=None, stop=None):
+        tick = tick or settings.SCHEDULER_TICK
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                self.run_pending()
+            except Exception:
+                # e.g. the database went away; the next tick reconnects
+                logger.exception("Scheduler tick failed")
+            stop.wait(tick)
@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 import django
 from pathlib import Path
 from decouple import config
@@ -24,6 +25,12 @@ else:
 DONATION_MIN = 1      # минимальная сумма в валюте
 DONATION_MAX = None   # максимальная сумма
 DONATION_CURRENCY = "usd"
+# Amounts offered as buttons in home/templates/index.html: checkout uses a
+# reusable Stripe Price for these (donations.prices), custom amounts go inline
+DONATION_PRESET_AMOUNTS = [10, 20]
+DONATION_PRICE_CACHE_TTL = 60 * 60 * 24
+# Override to point the Stripe client at a local stub (benchmarks/stripe_stub.py)
+STRIPE_API_BASE = config("STRIPE_API_BASE", default="")
 
 SECRET_KEY = config("SECRET_KEY")
 DEBUG = config("DEBUG", default=False, cast=bool)
@@ -35,6 +42,28 @@ LOGGING_CONFIG = None
 
 LOGLEVEL = os.getenv("LOGLEVEL", "INFO").upper()
 
+# Queue mode: records are formatted and written by a background listener
+# instead of on the request thread (see mysite/log_queue.py).
+LOG_QUEUE = config("LOG_QUEUE", default=not DEBUG, cast=bool)
+LOG_QUEUE_SIZE = config("LOG_QUEUE_SIZE", default=10000, cast=int)
+
+# High-volume INFO messages are sampled down to LOG_SAMPLE_RATE per second.
+LOG_SAMPLED_MESSAGES = [
+    "Blog post viewed",
+    "Blog list page opened",
+    "Blog search performed",
+]
+LOG_SAMPLE_RATE = config("LOG_SAMPLE_RATE", default=10, cast=int)
+
+if LOG_QUEUE:
+    CONSOLE_HANDLER = {
+        '()': 'mysite.log_queue.QueueLogHandler',
+        'queue_size': LOG_QUEUE_SIZE,
+    }
+else:
+    CONSOLE_HANDLER = {'class': 'logging.StreamHandler'}
+CONSOLE_HANDLER.update({'formatter': 'json', 'filters': ['sample_hot_info', 'request_context']})
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -47,11 +76,19 @@ LOGGING = {
         'django.server': DEFAULT_LOGGING['formatters']['django.server'],
     },
 
-    'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'json',
+    'filters': {
+        'sample_hot_info': {
+            '()': 'mysite.log_queue.RateLimitFilter',
+            'messages': LOG_SAMPLED_MESSAGES,
+            'rate': LOG_SAMPLE_RATE,
+        },
+        'request_context': {
+            '()': 'mysite.log_queue.RequestContextFilter',
         },
+    },
+
+    'handlers': {
+        'console': CONSOLE_HANDLER,
         'django.server': DEFAULT_LOGGING['handlers']['django.server'],
     },
 
@@ -98,13 +135,13 @@ LOGGING = {
 INSTALLED_APPS = [
     'modeltranslation',
     'django_prometheus',
-    'parler',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     'blog',
     'home',
     'taggit',
@@ -114,7 +151,8 @@ INSTALLED_APPS = [
     'django_extensions',
     'rest_framework',
     'drf_spectacular',
-    'donations'
+    'donations',
+    'api',
 ]
 
 REST_FRAMEWORK = {
@@ -132,8 +170,10 @@ SPECTACULAR_SETTINGS = {
 
 MIDDLEWARE = [
     'django_prometheus.middleware.PrometheusBeforeMiddleware',
+    'mysite.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'mysite.middleware.ReplicaMiddleware',
+    'mysite.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -145,12 +185,24 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'mysite.urls'
 
+# Compiled templates are kept per process regardless of DEBUG; runserver's
+# autoreloader still resets them when a template changes. TEMPLATE_CACHE=False
+# turns caching off for template work without a reloader.
+TEMPLATE_CACHE = config("TEMPLATE_CACHE", default=True, cast=bool)
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'mysite.template_backends.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': (
+                [('mysite.template_loaders.MeteredCachedLoader', TEMPLATE_LOADERS)]
+                if TEMPLATE_CACHE else TEMPLATE_LOADERS
+            ),
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -228,21 +280,12 @@ USE_I18N = True
 USE_L10N = True
 USE_TZ = True
 
-# modeltranslation
+# modeltranslation: every translated model (blog.Post, home.Event) stores
+# its languages as *_uk / *_en columns on the row. An empty value falls back
+# to Ukrainian, then English. Read a specific language via mysite.i18n.
 MODELTRANSLATION_DEFAULT_LANGUAGE = "uk"
 MODELTRANSLATION_LANGUAGES = ("uk", "en")
-MODELTRANSLATION_FALLBACK_LANGUAGES = ("uk",)
-
-PARLER_LANGUAGES = {
-    None: (
-        {'code': 'en'},
-        {'code': 'uk'},
-    ),
-    'default': {
-        'fallbacks': ['en'],
-        'hide_untranslated': False,
-    }
-}
+MODELTRANSLATION_FALLBACK_LANGUAGES = ("uk", "en")
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -253,8 +296,129 @@ AUTH_PASSWORD_VALIDATORS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Shared by all gunicorn workers and pods: page cache, upcoming events,
+# and anything else that goes through django.core.cache. Without REDIS_HOST
+# (local runs, tests) each process gets its own in-memory cache.
+REDIS_HOST = config("REDIS_HOST", default="")
+if REDIS_HOST:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": f"redis://{REDIS_HOST}:{config('REDIS_PORT', default=6379, cast=int)}/{config('REDIS_DB', default=0, cast=int)}",
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "PASSWORD": config("REDIS_PASSWORD", default="") or None,
+                # A cache outage degrades to database reads instead of 500s.
+                "IGNORE_EXCEPTIONS": True,
+            },
+            "KEY_PREFIX": "respondua",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 CACHE_TTL = 60 * 3
 
+# Sessions (admin only: anonymous GETs never get one, see
+# mysite.middleware.SessionMiddleware). With Redis, reads come from the
+# cache and Postgres is only written on change; purge_sessions deletes
+# expired rows.
+SESSION_ENGINE = config(
+    "SESSION_ENGINE",
+    default="django.contrib.sessions.backends.cached_db" if REDIS_HOST else "django.contrib.sessions.backends.db",
+)
+SESSION_PURGE_BATCH_SIZE = 5000
+
+# Token-bucket rate limits (mysite/ratelimit.py). Views declare their
+# default with @rate_limit(name, rate); a rate here overrides it, None
+# turns it off.
+RATE_LIMIT_ENABLED = config("RATE_LIMIT_ENABLED", default=True, cast=bool)
+RATE_LIMITS = {}
+# Client address set by nginx. Read only from RATE_LIMIT_TRUSTED_PROXIES
+# (addresses or CIDR ranges, e.g. the compose network); otherwise, or when
+# absent, the socket address is used.
+RATE_LIMIT_IP_HEADER = "HTTP_X_REAL_IP"
+RATE_LIMIT_TRUSTED_PROXIES = config("RATE_LIMIT_TRUSTED_PROXIES", default="127.0.0.1,::1", cast=Csv())
+
+# Read replica (mysite/db/routers.py): with REPLICA_READS, anonymous GET/HEAD
+# requests read from DATABASES["replica"], unless it lags more than
+# REPLICA_MAX_LAG seconds or content was published in the last
+# REPLICA_PIN_SECONDS.
+DATABASE_ROUTERS = ["mysite.db.routers.ReplicaRouter"]
+REPLICA_READS = config("REPLICA_READS", default=bool(os.getenv("POSTGRES_REPLICA_HOST")), cast=bool)
+REPLICA_MAX_LAG = 5
+REPLICA_LAG_CHECK_INTERVAL = 5
+REPLICA_PIN_SECONDS = 10
+
+# Periodic jobs (mysite/scheduler.py, registered in each app's jobs.py), run
+# by `manage.py run_scheduler` on every replica; advisory locks make each
+# run happen once. Intervals here override a job's own (None disables it).
+SCHEDULER_TICK = 5
+SCHEDULER_INTERVALS = {}
+SCHEDULER_METRICS_PORT = config("SCHEDULER_METRICS_PORT", default=9108, cast=int)
+# Pages kept warm in nginx and the shared cache by the "pages.warm" job
+WARM_URLS = ["/uk/", "/en/", "/uk/blog/", "/en/blog/", "/uk/api/posts/", "/en/api/posts/", "/uk/api/events/", "/en/api/events/", "/uk/api/posts/popular/", "/en/api/posts/popular/"]
+# How far back the hourly "donations.reconcile" job re-reads Stripe
+DONATION_RECONCILE_LOOKBACK = timedelta(days=2)
+# Monthly Donation partitions the daily "donations.partitions" job keeps
+# ready beyond the current month (PostgreSQL)
+DONATION_PARTITIONS_AHEAD = 3
+
+# Post views (blog/popularity.py) are counted in Redis and written to
+# PostStats by the "posts.views.flush" job; without Redis each process
+# writes its own after POST_VIEWS_FLUSH_INTERVAL seconds. The popular
+# posts ranking covers the last POPULAR_POSTS_DAYS days.
+POST_VIEWS_FLUSH_INTERVAL = 60
+POPULAR_POSTS_DAYS = 7
+POPULAR_POSTS_LIMIT = 5
+
+# Search box suggestions (blog/autocomplete.py): shortest prefix answered
+# and how many suggestions a response carries.
+AUTOCOMPLETE_MIN_LENGTH = 2
+AUTOCOMPLETE_LIMIT = 8
+
+# Identifies the deployed build in ETags (mysite.conditional); when unset,
+# the newest template mtime is used instead.
+RELEASE = config("RELEASE", default="")
+
+# {% cachefragment %} entries; content versions retire them earlier.
+FRAGMENT_CACHE_TTL = 60 * 60 * 24
+
+# nginx micro-cache (mysite.edge_cache). Anonymous pages are kept at the
+# edge for EDGE_CACHE_TTL and refreshed through EDGE_CACHE_URL, nginx's
+# internal listener, when their content changes. Empty disables purging.
+EDGE_CACHE_URL = config("EDGE_CACHE_URL", default="")
+EDGE_CACHE_HOST = config("EDGE_CACHE_HOST", default="respondua.org")
+EDGE_CACHE_TTL = config("EDGE_CACHE_TTL", default=60 * 10, cast=int)
+EDGE_CACHE_MAX_URLS = 5000
+EDGE_PURGE_METHOD = config("EDGE_PURGE_METHOD", default="GET")
+EDGE_PURGE_TIMEOUT = 5
+# Sent as X-Edge-Refresh by refreshes, which then skip rate limits; empty
+# means they are limited like any other client.
+EDGE_REFRESH_SECRET = config("EDGE_REFRESH_SECRET", default="")
+
+# Read-only content API (api/): page size and how long serialized
+# payloads stay cached (content versions retire them earlier).
+API_PAGE_SIZE = 20
+API_CACHE_TTL = 60 * 60
+
+# Events carousel on the home page, and the past-events archive page size.
+UPCOMING_EVENTS_LIMIT = 6
+EVENTS_ARCHIVE_PAGE_SIZE = 12
+
+# Same SQL shape this many times in one request is reported as a likely N+1.
+N_PLUS_ONE_THRESHOLD = 5
+
+# Statements slower than this are logged with the request context
+# (mysite.db.backends.postgresql). SQL_COMMENT_CALL_SITE also tags each
+# statement with the calling function; it walks the stack, so off by default.
+SLOW_QUERY_MS = config("SLOW_QUERY_MS", default=200, cast=int)
+SQL_COMMENT_CALL_SITE = config("SQL_COMMENT_CALL_SITE", default=False, cast=bool)
+
 import logging.config
 logging.config.dictConfig(LOGGING)
 
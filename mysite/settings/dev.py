@@ -6,7 +6,7 @@ ALLOWED_HOSTS=['*']
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'mysite.db.backends.postgresql',
         'NAME': os.getenv('POSTGRES_DB', 'respondua'),
         'USER': os.getenv('POSTGRES_USER', 'postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
@@ -15,6 +15,14 @@ DATABASES = {
     }
 }
 
+# A second alias for replica routing (REPLICA_READS). Without a replica
+# server it points at the primary; tests mirror it onto the test database.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'HOST': os.getenv('POSTGRES_REPLICA_HOST', DATABASES['default']['HOST']),
+    'TEST': {'MIRROR': 'default'},
+}
+
 STRIPE_PUBLISHABLE_KEY = config("STRIPE_PUBLISHABLE_KEY")
 STRIPE_SECRET_KEY = config("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = config("STRIPE_WEBHOOK_SECRET")
@@ -0,0 +1,100 @@
+import gzip
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.staticfiles.storage import ManifestFilesMixin, ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # .br variants are skipped; .gz is always written
+    brotli = None
+
+COMPRESSIBLE = re.compile(r"\.(css|js|mjs|map|json|svg|txt|xml|html|ico|ttf|otf|eot)$", re.IGNORECASE)
+HASHED = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+ENCODINGS = {".gz": "gzip", ".br": "br"}
+
+
+class PrecompressedManifestMixin(ManifestFilesMixin):
+    """
+    ``collectstatic`` for storages served without on-the-fly compression.
+
+    On top of ManifestFilesMixin's content-hashed names (``style.css`` ->
+    ``style.3f2a1b9c8d7e.css`` plus ``staticfiles.json``), every text file
+    also gets ``.gz`` and, when the ``brotli`` package is installed, ``.br``
+    siblings. Saves run on a thread pool, so a remote backend uploads
+    ``upload_workers`` files at a time; post_process waits for the copies
+    before hashing them and for everything before returning, so upload
+    errors still fail the command.
+    """
+    manifest_strict = False
+    compress_min_size = 256
+    upload_workers = 16
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._uploads = {}
+        self._uploads_lock = threading.Lock()
+        self._pool = None
+
+    def _save(self, name, content):
+        content.seek(0)
+        data = content.read()
+        if isinstance(data, str):
+            data = data.encode()
+        with self._uploads_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.upload_workers, thread_name_prefix="collectstatic")
+            # HashedFilesMixin re-saves adjusted CSS on every pass; each save
+            # of a name replaces the previous one, never races with it.
+            previous = self._uploads.get(name)
+            self._uploads[name] = self._pool.submit(self._store, name, data, previous)
+        return name
+
+    @property
+    def overwrites(self):
+        """Whether ``_save`` replaces an existing name (S3's ``file_overwrite``, disk's ``allow_overwrite``)."""
+        return getattr(self, "file_overwrite", getattr(self, "_allow_overwrite", False))
+
+    def _store(self, name, data, previous=None):
+        if previous is not None:
+            previous.result()
+            if not self.overwrites:
+                self.delete(name)
+        variants = {}
+        if len(data) >= self.compress_min_size and COMPRESSIBLE.search(name):
+            variants[".gz"] = gzip.compress(data, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variants[".br"] = brotli.compress(data, quality=11)
+        super()._save(name, ContentFile(data))
+        for suffix, compressed in variants.items():
+            if len(compressed) < len(data):
+                if not self.overwrites:
+                    self.delete(name + suffix)
+                super()._save(name + suffix, ContentFile(compressed))
+
+    def wait_for_uploads(self):
+        with self._uploads_lock:
+            pending, self._uploads = list(self._uploads.values()), {}
+        for future in pending:
+            future.result()
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Referenced but never collected (e.g. static/lib/*): serve the
+            # plain URL instead of a 500, and remember it so the storage
+            # isn't probed again on every render.
+            self.hashed_files[self.hash_key(name)] = name
+            return name
+
+    def post_process(self, *args, **kwargs):
+        self.wait_for_uploads()  # originals must exist before they are hashed
+        yield from super().post_process(*args, **kwargs)
+        self.wait_for_uploads()
+
+
+class PrecompressedManifestStaticFilesStorage(PrecompressedManifestMixin, ManifestStaticFilesStorage):
+    """Local-disk variant, for nginx's ``gzip_static``/``brotli_static``."""
@@ -1,8 +1,13 @@
+import mimetypes
+import os
+
 from django.conf import settings
 from storages.backends.s3boto3 import S3Boto3Storage
 
+from .static_storage import ENCODINGS, HASHED, PrecompressedManifestMixin
+
 
-class StaticStorage(S3Boto3Storage):
+class StaticStorage(PrecompressedManifestMixin, S3Boto3Storage):
     location = settings.STATICFILES_LOCATION
     default_acl = None
     file_overwrite = True
@@ -11,6 +16,21 @@ class StaticStorage(S3Boto3Storage):
         "CacheControl": "max-age=31536000, immutable"
     }
 
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        base, suffix = os.path.splitext(name)
+        if suffix in ENCODINGS:
+            # .gz/.br siblings are served as-is by whatever picks them by
+            # Accept-Encoding (CDN rule or proxy)
+            params["ContentEncoding"] = ENCODINGS[suffix]
+            params["ContentType"] = mimetypes.guess_type(base)[0] or self.default_content_type
+        else:
+            base = name
+        if not HASHED.search(base):
+            # Unhashed copies (and staticfiles.json) change in place
+            params["CacheControl"] = "max-age=300, must-revalidate"
+        return params
+
 
 class MediaStorage(S3Boto3Storage):
     location = settings.MEDIAFILES_LOCATION
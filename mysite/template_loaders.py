@@ -0,0 +1,69 @@
+import logging
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+from django.template.loaders import cached
+from django.template.utils import get_app_template_dirs
+
+from .metrics import TEMPLATE_CACHE_MISSES
+
+logger = logging.getLogger("app.templates")
+
+_warming = False
+
+
+class MeteredCachedLoader(cached.Loader):
+    """
+    The cached loader, counting lookups that miss its cache. After
+    ``warm_templates()`` has run, a steady miss rate means templates are
+    being recompiled at request time (dynamic names, cache resets).
+    """
+
+    def get_template(self, template_name, skip=None):
+        if not _warming and self.cache_key(template_name, skip) not in self.get_template_cache:
+            TEMPLATE_CACHE_MISSES.labels(template=template_name).inc()
+        return super().get_template(template_name, skip)
+
+
+def _template_names(engine):
+    dirs = list(engine.dirs)
+    if engine.app_dirs or any("app_directories" in str(loader) for loader in engine.loaders):
+        dirs += get_app_template_dirs("templates")
+    for root in dirs:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith((".html", ".txt", ".xml")):
+                    yield os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, "/")
+
+
+def warm_templates():
+    """
+    Compiles every template the Django engines can find, so the first
+    request to each page doesn't pay for parsing. Templates that fail to
+    compile (e.g. third-party ones needing tag libraries we don't install)
+    are skipped.
+    """
+    global _warming
+    started = time.perf_counter()
+    compiled = failed = 0
+    _warming = True
+    try:
+        for backend in engines.all():
+            engine = getattr(backend, "engine", None)
+            if engine is None:
+                continue
+            for name in dict.fromkeys(_template_names(engine)):
+                try:
+                    engine.get_template(name)
+                    compiled += 1
+                except (TemplateSyntaxError, LookupError, UnicodeDecodeError) as exc:
+                    failed += 1
+                    logger.debug("Template not warmed", extra={"template": name, "error": str(exc)})
+    finally:
+        _warming = False
+    logger.info(
+        "Templates warmed",
+        extra={"compiled": compiled, "failed": failed, "duration_ms": round((time.perf_counter() - started) * 1000, 1)},
+    )
+    return compiled, failed
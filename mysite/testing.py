@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from .db_stats import get_query_budget, repeated_shapes
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin that enforces the ``query_budget`` a view declares::
+
+        class BlogViewsTests(QueryBudgetTestMixin, TestCase):
+            def test_post_list(self):
+                self.assertWithinQueryBudget("/uk/blog/")
+    """
+
+    def assertWithinQueryBudget(self, url, budget=None, using="default", **extra):
+        with CaptureQueriesContext(connections[using]) as ctx:
+            response = self.client.get(url, **extra)
+
+        if budget is None:
+            budget = get_query_budget(response.resolver_match.func)
+        self.assertIsNotNone(budget, f"{response.resolver_match.view_name} declares no query_budget")
+
+        statements = [query["sql"] for query in ctx.captured_queries]
+        self.assertLessEqual(
+            len(statements), budget,
+            f"{url} ran {len(statements)} queries (budget {budget}):\n" + "\n".join(statements),
+        )
+
+        threshold = getattr(settings, "N_PLUS_ONE_THRESHOLD", 5)
+        repeated = repeated_shapes(statements, threshold)
+        self.assertFalse(repeated, f"{url} repeats SQL (likely N+1): {repeated}")
+        return response
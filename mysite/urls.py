@@ -8,7 +8,9 @@ from django.views.i18n import set_language
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
+from blog.views import sitemap
 from donations.views import stripe_webhook  # <-- import view
+from mysite.views import csrf, pg_statements
 
 @csrf_exempt
 def health_check(request):
@@ -18,15 +20,19 @@ def health_check(request):
 urlpatterns = [
     path("health/", health_check, name="health"),
     path("i18n/setlang/", set_language, name="set_language"),
+    path("sitemap.xml", sitemap, name="sitemap"),
+    path("csrf/", csrf, name="csrf"),
     path("stripe/webhook/", stripe_webhook, name="stripe_webhook"),  # <-- OUTSIDE i18n
 ]
 
 urlpatterns += i18n_patterns(
+    path("admin/pg-statements/", pg_statements, name="pg_statements"),
     path("admin/", admin.site.urls),
     path("", include("home.urls")),
     path("", include("donations.urls")),
     path("", include("blog.urls")),
     path("", include("django_prometheus.urls")),
+    path("api/", include("api.urls")),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/swagger/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     path("api/docs/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
@@ -0,0 +1,42 @@
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from .db.pg_stats import ORDERINGS, PgStatStatementsUnavailable, top_statements
+
+
+@staff_member_required
+def pg_statements(request):
+    """Admin-only report of the slowest statements by total or mean time."""
+    order = request.GET.get("order", "total")
+    if order not in ORDERINGS:
+        order = "total"
+
+    rows, error = [], None
+    try:
+        rows = top_statements(order=order, limit=50)
+    except PgStatStatementsUnavailable as exc:
+        error = str(exc)
+
+    return render(request, "admin/pg_statements.html", {
+        **admin.site.each_context(request),
+        "title": "Top SQL statements",
+        "rows": rows,
+        "order": order,
+        "orderings": sorted(ORDERINGS),
+        "error": error,
+    })
+
+
+@never_cache
+@require_GET
+def csrf(request):
+    """
+    The CSRF token for forms on shared (cookie-free, edge-cached) pages,
+    fetched by their JavaScript on submit; also sets the CSRF cookie.
+    """
+    return JsonResponse({"csrfToken": get_token(request)})
@@ -174,6 +174,30 @@
             }
         }
     });
+
+
+    // Search suggestions from the blog autocomplete endpoint
+    $('input[data-autocomplete-url]').each(function () {
+        var input = $(this);
+        var list = $('#' + input.attr('list'));
+        var timer, last;
+        input.on('input', function () {
+            clearTimeout(timer);
+            var query = $.trim(input.val());
+            if (query.length < 2 || query === last) {
+                return;
+            }
+            timer = setTimeout(function () {
+                last = query;
+                $.getJSON(input.data('autocomplete-url'), {q: query}, function (data) {
+                    list.empty();
+                    $.each(data.results, function (i, item) {
+                        list.append($('<option>').attr('value', item.label));
+                    });
+                });
+            }, 150);
+        });
+    });
     
 })(jQuery);
 